@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Compare computing best-price spreads and weight of money for every runner
+by looping over models with the vectorized columnar view. Timings include
+conversion from the response JSON. ::
+
+    $ python benchmarks/columnar.py --books 40
+"""
+
+from __future__ import print_function
+
+import timeit
+import argparse
+
+from betfair.models import MarketBook
+from betfair.columnar import MarketBookColumns
+
+from payloads import make_market_books
+
+
+def analyze_models(result):
+    spreads, weights = [], []
+    for book in [MarketBook.unserialize(item) for item in result]:
+        for runner in book.runners:
+            back, lay = runner.ex.available_to_back, runner.ex.available_to_lay
+            spreads.append(lay[0].price - back[0].price if back and lay else None)
+            back_size = sum(level.size for level in back)
+            total = back_size + sum(level.size for level in lay)
+            weights.append(back_size / total if total else None)
+    return spreads, weights
+
+
+def analyze_columns(result):
+    columns = MarketBookColumns.unserialize(result)
+    return columns.best_lay_prices() - columns.best_back_prices(), columns.weight_of_money()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    result = make_market_books(args.books)
+    baseline = None
+    for name, func in [('models', analyze_models), ('columnar', analyze_columns)]:
+        best = min(timeit.repeat(lambda: func(result), number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print('{0:<10} {1:9.2f} ms  {2:5.1f}x'.format(name, best * 1000, baseline / best))
+
+
+if __name__ == '__main__':
+    main()
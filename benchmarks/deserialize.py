@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Compare building `MarketBook` models through Schematics with the generated
+`unserialize` functions. ::
+
+    $ python benchmarks/deserialize.py --books 40
+"""
+
+from __future__ import print_function
+
+import timeit
+import argparse
+
+from betfair.models import MarketBook
+
+from payloads import make_market_books
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    books = make_market_books(args.books)
+    converters = [
+        ('schematics', lambda: [MarketBook(**book) for book in books]),
+        ('unserialize', lambda: [MarketBook.unserialize(book) for book in books]),
+    ]
+    baseline = None
+    for name, func in converters:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print('{0:<12} {1:9.2f} ms  {2:5.1f}x'.format(name, best * 1000, baseline / best))
+
+
+if __name__ == '__main__':
+    main()
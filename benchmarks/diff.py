@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Time diffing successive polls of many markets, and rebuilding the later
+polls from the deltas, against comparing the nested models of each book.
+Books merged by a `MarketCache` share unchanged runners, which are skipped. ::
+
+    $ python benchmarks/diff.py --books 500 --changed 0.1
+"""
+
+from __future__ import print_function
+
+import random
+import timeit
+import argparse
+
+from betfair.diff import diff, apply
+from betfair import compact
+from betfair.models import MarketBook
+from betfair.marketcache import MarketCache
+
+from payloads import make_market_books
+from marketcache import make_polls
+
+
+def compare_models(previous, current):
+    return [
+        [old.ex == new.ex for old, new in zip(old_book.runners, new_book.runners)]
+        for old_book, new_book in zip(previous, current)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=500)
+    parser.add_argument('--changed', type=float, default=0.1)
+    args = parser.parse_args()
+    polls = make_polls(make_market_books(args.books), args.changed, 2, random.Random(0))
+    previous, current = [[MarketBook.unserialize(book) for book in poll] for poll in polls]
+    deltas = [diff(old, new) for old, new in zip(previous, current)]
+    compact_previous, compact_current = [
+        [compact.MarketBook.unserialize(book) for book in poll] for poll in polls
+    ]
+    cache = MarketCache()
+    cache.update(polls[0])
+    cached_previous = [cache[book['marketId']] for book in polls[0]]
+    cache.update(polls[1])
+    cached_current = [cache[book['marketId']] for book in polls[1]]
+    cases = [
+        ('compare', lambda: compare_models(previous, current)),
+        ('diff', lambda: [diff(old, new) for old, new in zip(previous, current)]),
+        ('compact', lambda: [
+            diff(old, new) for old, new in zip(compact_previous, compact_current)
+        ]),
+        ('cached', lambda: [diff(old, new) for old, new in zip(cached_previous, cached_current)]),
+        ('apply', lambda: [apply(old, delta) for old, delta in zip(previous, deltas)]),
+    ]
+    baseline = None
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=5))
+        baseline = baseline or best
+        print('{0:<8} {1:9.2f} ms/poll  {2:5.1f}x'.format(name, best * 1000, baseline / best))
+
+
+if __name__ == '__main__':
+    main()
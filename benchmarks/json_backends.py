@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""Compare JSON decoding backends on a `listMarketBook` response. ::
+
+    $ python benchmarks/json_backends.py --books 40
+"""
+
+from __future__ import print_function
+
+import json
+import timeit
+import argparse
+
+from betfair import utils
+
+from payloads import make_market_books
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    body = json.dumps({
+        'jsonrpc': '2.0',
+        'result': make_market_books(args.books),
+        'id': 1,
+    }).encode('utf-8')
+    print('payload: {0} books, {1:.0f} KB'.format(args.books, len(body) / 1024.0))
+    for backend in utils.JSON_BACKENDS:
+        try:
+            loads = utils.get_json_loads(backend)
+        except ImportError:
+            print('{0:<8} not installed'.format(backend))
+            continue
+        best = min(timeit.repeat(lambda: loads(body), number=1, repeat=args.repeat))
+        print('{0:<8} {1:8.2f} ms'.format(backend, best * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Compare scanning `listMarketCatalogue` and `listMarketBook` results with
+full and lazy models, reading only market IDs, statuses and best prices. ::
+
+    $ python benchmarks/lazy.py --markets 1000
+"""
+
+from __future__ import print_function
+
+import timeit
+import argparse
+
+from betfair import utils
+from betfair import models
+
+from payloads import make_market_books
+from payloads import make_market_catalogues
+
+
+def scan_catalogues(result, representation):
+    markets = utils.process_result(result, models.MarketCatalogue, representation)
+    return [(market.market_id, market.event.name) for market in markets]
+
+
+def scan_books(result, representation):
+    books = utils.process_result(result, models.MarketBook, representation)
+    return [
+        (book.market_id, book.status, runner.ex.available_to_back[0].price)
+        for book in books
+        for runner in book.runners
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=1000)
+    parser.add_argument('--books', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    scans = [
+        ('catalogue', scan_catalogues, make_market_catalogues(args.markets)),
+        ('book', scan_books, make_market_books(args.books)),
+    ]
+    for name, scan, result in scans:
+        baseline = None
+        for representation in ('model', 'lazy'):
+            best = min(timeit.repeat(
+                lambda: scan(result, representation), number=1, repeat=args.repeat,
+            ))
+            baseline = baseline or best
+            print('{0:<10} {1:<6} {2:9.2f} ms  {3:5.1f}x'.format(
+                name, representation, best * 1000, baseline / best,
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Compare deserializing every polled book with merging polls into a
+`MarketCache`, when a fraction of runners change between polls. ::
+
+    $ python benchmarks/marketcache.py --books 500 --changed 0.1
+"""
+
+from __future__ import print_function
+
+import copy
+import random
+import timeit
+import argparse
+
+from betfair.models import MarketBook
+from betfair.marketcache import MarketCache
+
+from payloads import make_market_books
+
+
+def make_polls(result, changed, count, rng):
+    polls = []
+    for _ in range(count):
+        result = copy.deepcopy(result)
+        for book in result:
+            for runner in book['runners']:
+                if rng.random() < changed:
+                    level = runner['ex']['availableToBack'][0]
+                    level['size'] = round(level['size'] + 1, 2)
+        polls.append(result)
+    return polls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=500)
+    parser.add_argument('--changed', type=float, default=0.1)
+    parser.add_argument('--polls', type=int, default=5)
+    args = parser.parse_args()
+    polls = make_polls(make_market_books(args.books), args.changed, args.polls, random.Random(0))
+
+    def deserialize():
+        for poll in polls:
+            [MarketBook.unserialize(book) for book in poll]
+
+    cache = MarketCache()
+    cache.update(polls[0])
+
+    def update():
+        for poll in polls:
+            cache.update(poll)
+
+    baseline = None
+    for name, func in [('unserialize', deserialize), ('cache', update)]:
+        best = min(timeit.repeat(func, number=1, repeat=3)) / args.polls
+        baseline = baseline or best
+        print('{0:<12} {1:9.2f} ms/poll  {2:5.1f}x'.format(name, best * 1000, baseline / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Report memory held per `MarketBook` in each result representation,
+decoding the response body inside the measurement so that values shared with
+the discarded JSON are counted. ::
+
+    $ python benchmarks/memory.py --books 200
+"""
+
+from __future__ import print_function
+
+import gc
+import json
+import argparse
+import tracemalloc
+
+from betfair import utils
+from betfair import models
+
+from payloads import make_market_books
+
+try:
+    # Import NumPy outside the measurements
+    from betfair import columnar  # noqa
+except ImportError:
+    columnar = None
+
+
+def measure(body, representation):
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    books = utils.process_result(json.loads(body), models.MarketBook, representation)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del books
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=200)
+    parser.add_argument('--runners', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=10)
+    args = parser.parse_args()
+    body = json.dumps(make_market_books(args.books, args.runners, args.depth))
+    print('{0} books, {1} runners, depth {2}'.format(args.books, args.runners, args.depth))
+    for representation in utils.REPRESENTATIONS:
+        if representation.startswith('columnar') and columnar is None:
+            print('{0:<14} NumPy not installed'.format(representation))
+            continue
+        size = measure(body, representation)
+        print('{0:<14} {1:10.0f} bytes/book'.format(representation, size / float(args.books)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""Compare placing orders with one request each against submitting them to
+an `OrderQueue`, for a burst of orders from many threads. Requests go
+through a simulated client with a fixed latency and a limited number of
+connections. ::
+
+    $ python benchmarks/orderqueue.py --threads 50 --orders 4 --latency 0.02
+"""
+
+from __future__ import print_function
+
+import time
+import argparse
+import threading
+
+from betfair import models
+from betfair.orderqueue import OrderQueue
+
+
+class SimulatedClient(object):
+
+    def __init__(self, latency, connections):
+        self.latency = latency
+        self.connections = threading.Semaphore(connections)
+        self.requests = 0
+
+    def place_orders(self, market_id, instructions, customer_ref=None):
+        with self.connections:
+            self.requests += 1
+            time.sleep(self.latency)
+        return models.PlaceExecutionReport(
+            status='SUCCESS',
+            market_id=market_id,
+            instruction_reports=[
+                models.PlaceInstructionReport(status='SUCCESS', instruction=instruction)
+                for instruction in instructions
+            ],
+        )
+
+
+def make_instruction(selection_id):
+    return models.PlaceInstruction(
+        order_type='LIMIT',
+        selection_id=selection_id,
+        side='BACK',
+        limit_order=models.LimitOrder(size=2.0, price=2.0, persistence_type='LAPSE'),
+    )
+
+
+def run_burst(place, threads, orders):
+    latencies = []
+    lock = threading.Lock()
+
+    def submit(idx):
+        for order in range(orders):
+            start = time.time()
+            place('1.{0}'.format(idx % 5), make_instruction(order))
+            with lock:
+                latencies.append(time.time() - start)
+
+    workers = [threading.Thread(target=submit, args=(idx, )) for idx in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--orders', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--window', type=float, default=0.005)
+    args = parser.parse_args()
+
+    client = SimulatedClient(args.latency, args.connections)
+
+    def place(market_id, instruction):
+        return client.place_orders(market_id, [instruction]).instruction_reports[0]
+
+    queued = SimulatedClient(args.latency, args.connections)
+    queue = OrderQueue(queued, window=args.window, max_workers=args.connections)
+
+    def place_queued(market_id, instruction):
+        return queue.place(market_id, instruction).result()
+
+    for name, func, counter in [('direct', place, client), ('queue', place_queued, queued)]:
+        median, p99 = run_burst(func, args.threads, args.orders)
+        print('{0:<8} {1:5d} requests  p50 {2:7.1f} ms  p99 {3:7.1f} ms'.format(
+            name, counter.requests, median * 1000, p99 * 1000))
+    queue.close()
+
+
+if __name__ == '__main__':
+    main()
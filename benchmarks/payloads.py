@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""Synthetic Betfair API results shaped like real responses."""
+
+import random
+import datetime
+
+from betfair.price import PRICES
+
+
+def make_ladder(rng, start, depth, step):
+    index = PRICES.index(start)
+    return [
+        {'price': float(PRICES[index + step * level]), 'size': round(rng.uniform(2, 500), 2)}
+        for level in range(depth)
+        if 0 <= index + step * level < len(PRICES)
+    ]
+
+
+def make_runner(rng, selection_id, depth):
+    best_back = PRICES[rng.randrange(20, 200)]
+    best_lay = PRICES[PRICES.index(best_back) + 1]
+    return {
+        'selectionId': selection_id,
+        'handicap': 0.0,
+        'status': 'ACTIVE',
+        'lastPriceTraded': float(best_back),
+        'totalMatched': round(rng.uniform(0, 100000), 2),
+        'ex': {
+            'availableToBack': make_ladder(rng, best_back, depth, -1),
+            'availableToLay': make_ladder(rng, best_lay, depth, 1),
+            # Betfair returns traded volume in ascending price order
+            'tradedVolume': make_ladder(rng, best_back, 3 * depth, -1)[::-1],
+        },
+        'sp': {
+            'nearPrice': float(best_back),
+            'farPrice': float(best_lay),
+            'backStakeTaken': make_ladder(rng, best_back, 3, -1),
+            'layLiabilityTaken': make_ladder(rng, best_lay, 3, 1),
+        },
+    }
+
+
+def make_market_book(rng, market_id, runners=20, depth=10):
+    return {
+        'marketId': market_id,
+        'isMarketDataDelayed': False,
+        'status': 'OPEN',
+        'betDelay': 0,
+        'bspReconciled': False,
+        'complete': True,
+        'inplay': False,
+        'numberOfWinners': 1,
+        'numberOfRunners': runners,
+        'numberOfActiveRunners': runners,
+        'lastMatchTime': datetime.datetime(2017, 1, 1, 12).isoformat() + '.000Z',
+        'totalMatched': round(rng.uniform(0, 1e6), 2),
+        'totalAvailable': round(rng.uniform(0, 1e6), 2),
+        'crossMatching': True,
+        'runnersVoidable': False,
+        'version': rng.randrange(1, 1e9),
+        'runners': [make_runner(rng, 1000 + idx, depth) for idx in range(runners)],
+    }
+
+
+def make_market_books(count=40, runners=20, depth=10, seed=0):
+    """Build a `listMarketBook` result with full-depth ladders."""
+    rng = random.Random(seed)
+    return [
+        make_market_book(rng, '1.{0}'.format(100000 + idx), runners, depth)
+        for idx in range(count)
+    ]
+
+
+def make_market_catalogue(rng, market_id, runners=20):
+    start = datetime.datetime(2017, 1, 1, 12) + datetime.timedelta(minutes=rng.randrange(10000))
+    return {
+        'marketId': market_id,
+        'marketName': 'Market {0}'.format(market_id),
+        'marketStartTime': start.isoformat() + '.000Z',
+        'totalMatched': round(rng.uniform(0, 1e6), 2),
+        'description': {
+            'persistenceEnabled': True,
+            'bspMarket': True,
+            'marketTime': start.isoformat() + '.000Z',
+            'suspendTime': start.isoformat() + '.000Z',
+            'bettingType': 'ODDS',
+            'turnInPlayEnabled': True,
+            'marketType': 'WIN',
+            'regulator': 'GIBRALTAR REGULATOR',
+            'marketBaseRate': 5.0,
+            'discountAllowed': True,
+            'wallet': 'UK wallet',
+            'rules': '<br>Rules</br>' * 50,
+            'rulesHasDate': True,
+        },
+        'runners': [
+            {
+                'selectionId': 1000 + idx,
+                'runnerName': 'Runner {0}'.format(idx),
+                'handicap': 0.0,
+                'sortPriority': idx + 1,
+                'metadata': {'AGE': '5', 'WEIGHT_VALUE': '140', 'JOCKEY_NAME': 'Jockey'},
+            }
+            for idx in range(runners)
+        ],
+        'eventType': {'id': '7', 'name': 'Horse Racing'},
+        'competition': {'id': '1', 'name': 'Competition'},
+        'event': {
+            'id': str(rng.randrange(1e8)),
+            'name': 'Event',
+            'countryCode': 'GB',
+            'timezone': 'Europe/London',
+            'venue': 'Venue',
+            'openDate': start.isoformat() + '.000Z',
+        },
+    }
+
+
+def make_market_catalogues(count=1000, runners=20, seed=0):
+    """Build a `listMarketCatalogue` result with all market projections."""
+    rng = random.Random(seed)
+    return [
+        make_market_catalogue(rng, '1.{0}'.format(100000 + idx), runners)
+        for idx in range(count)
+    ]
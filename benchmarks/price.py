@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""Compare the tick ladder functions of `betfair.price` with the previous
+implementations, which converted every price to `Decimal` and searched the
+ladder linearly. ::
+
+    $ python benchmarks/price.py --prices 10000
+"""
+
+from __future__ import print_function
+
+import random
+import timeit
+import argparse
+from decimal import ROUND_HALF_UP
+
+from betfair import price
+from betfair.price import as_dec
+
+
+def legacy_nearest_price(value, cutoffs=price.CUTOFFS):
+    if value <= price.MIN_PRICE:
+        return price.MIN_PRICE
+    if value > price.MAX_PRICE:
+        return price.MAX_PRICE
+    value = as_dec(value)
+    for cutoff, step in cutoffs:
+        if value < cutoff:
+            break
+    step = as_dec(step)
+    return float((value * step).quantize(2, ROUND_HALF_UP) / step)
+
+
+def legacy_ticks_difference(price_1, price_2):
+    return abs(price.PRICES.index(as_dec(price_1)) - price.PRICES.index(as_dec(price_2)))
+
+
+def legacy_price_ticks_away(value, n_ticks):
+    return float(price.PRICES[price.PRICES.index(as_dec(value)) + n_ticks])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--prices', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    approximate = [rng.uniform(price.MIN_PRICE, price.MAX_PRICE) for _ in range(args.prices)]
+    exact = [legacy_nearest_price(value) for value in approximate]
+    pairs = list(zip(exact, reversed(exact)))
+    exact = [value for value in exact if value < 900]
+    cases = [
+        (
+            'nearest_price',
+            lambda: [legacy_nearest_price(value) for value in approximate],
+            lambda: [price.nearest_price(value) for value in approximate],
+        ),
+        (
+            'ticks_difference',
+            lambda: [legacy_ticks_difference(*pair) for pair in pairs],
+            lambda: [price.ticks_difference(*pair) for pair in pairs],
+        ),
+        (
+            'price_ticks_away',
+            lambda: [legacy_price_ticks_away(value, 5) for value in exact],
+            lambda: [price.price_ticks_away(value, 5) for value in exact],
+        ),
+    ]
+    for name, legacy, current in cases:
+        legacy_best = min(timeit.repeat(legacy, number=1, repeat=args.repeat))
+        current_best = min(timeit.repeat(current, number=1, repeat=args.repeat))
+        print('{0:<18} {1:9.2f} ms  {2:9.2f} ms  {3:6.1f}x'.format(
+            name, legacy_best * 1000, current_best * 1000, legacy_best / current_best))
+    for name in ('round_price_up', 'round_price_down'):
+        func = getattr(price, name)
+        best = min(timeit.repeat(
+            lambda: [func(value) for value in approximate], number=1, repeat=args.repeat))
+        print('{0:<18} {1:>12}  {2:9.2f} ms'.format(name, '', best * 1000))
+
+
+if __name__ == '__main__':
+    main()
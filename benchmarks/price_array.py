@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Compare looping over the scalar functions of `betfair.price` with the
+vectorized functions of `betfair.price_array`. ::
+
+    $ python benchmarks/price_array.py --prices 10000
+"""
+
+from __future__ import print_function
+
+import random
+import timeit
+import argparse
+
+import numpy as np
+
+from betfair import price
+from betfair import price_array
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--prices', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    approximate = [rng.uniform(1, 900) for _ in range(args.prices)]
+    exact = [price.nearest_price(value) for value in approximate]
+    shuffled = list(exact)
+    rng.shuffle(shuffled)
+    approximate_array, exact_array = np.array(approximate), np.array(exact)
+    shuffled_array = np.array(shuffled)
+    cases = [
+        (
+            'nearest_price',
+            lambda: [price.nearest_price(value) for value in approximate],
+            lambda: price_array.nearest_price(approximate_array),
+        ),
+        (
+            'ticks_difference',
+            lambda: [price.ticks_difference(*pair) for pair in zip(exact, shuffled)],
+            lambda: price_array.ticks_difference(exact_array, shuffled_array),
+        ),
+        (
+            'price_ticks_away',
+            lambda: [price.price_ticks_away(value, 5) for value in exact],
+            lambda: price_array.price_ticks_away(exact_array, 5),
+        ),
+    ]
+    for name, scalar, vectorized in cases:
+        scalar_best = min(timeit.repeat(scalar, number=1, repeat=args.repeat))
+        vectorized_best = min(timeit.repeat(vectorized, number=1, repeat=args.repeat))
+        print('{0:<18} {1:9.2f} ms  {2:9.2f} ms  {3:6.1f}x'.format(
+            name, scalar_best * 1000, vectorized_best * 1000, scalar_best / vectorized_best))
+
+
+if __name__ == '__main__':
+    main()
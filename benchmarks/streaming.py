@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""Compare buffered and streamed parsing of a large `listMarketCatalogue`
+response: time to the first model, total time and peak memory. The body is
+served from memory in chunks, as by a streamed HTTP response. ::
+
+    $ python benchmarks/streaming.py --markets 1000
+"""
+
+from __future__ import print_function
+
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+
+from betfair import utils
+from betfair import models
+from betfair import streaming
+
+from payloads import make_market_catalogues
+
+
+class Response(object):
+
+    def __init__(self, body):
+        self.body = body
+        self.status_code = 200
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+def buffered(response):
+    body = b''.join(response.iter_content(streaming.CHUNK_SIZE))
+    result = json.loads(body.decode('utf-8'))['result']
+    return iter(utils.process_result(result, models.MarketCatalogue))
+
+
+def streamed(response):
+    return iter(streaming.ResultStream(response, models.MarketCatalogue))
+
+
+def measure(parse, body):
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    markets = parse(Response(body))
+    next(markets)
+    first = time.time() - start
+    for _ in markets:
+        pass
+    total = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=1000)
+    args = parser.parse_args()
+    body = json.dumps({
+        'jsonrpc': '2.0',
+        'result': make_market_catalogues(args.markets),
+        'id': 1,
+    }).encode('utf-8')
+    print('payload: {0} markets, {1:.1f} MB'.format(args.markets, len(body) / 1024.0 ** 2))
+    for name, parse in [('buffered', buffered), ('streamed', streamed)]:
+        first, total, peak = measure(parse, body)
+        print('{0:<10} first {1:8.2f} ms  total {2:8.2f} ms  peak {3:7.1f} MB'.format(
+            name, first * 1000, total * 1000, peak / 1024.0 ** 2,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""Compare first-request latency with and without `Betfair.warm_up`.
+
+Sends an unauthenticated request to the API endpoint, so no credentials are
+needed; the error response is ignored. ::
+
+    $ python benchmarks/warm_up.py --trials 10
+"""
+
+from __future__ import print_function
+
+import time
+import argparse
+
+from betfair import Betfair
+
+
+def first_request_latency(warm):
+    client = Betfair('', '')
+    if warm:
+        client.warm_up()
+    start = time.time()
+    client.session.post(client.api_url, data='{}', headers=client.headers).content
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trials', type=int, default=5)
+    args = parser.parse_args()
+    for warm in (False, True):
+        latencies = sorted(first_request_latency(warm) for _ in range(args.trials))
+        print('{0:<5} median {1:7.1f} ms  max {2:7.1f} ms'.format(
+            'warm' if warm else 'cold',
+            latencies[len(latencies) // 2] * 1000,
+            latencies[-1] * 1000,
+        ))
+
+
+if __name__ == '__main__':
+    main()
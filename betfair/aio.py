@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+"""Asyncio Betfair API client. Requires Python >= 3.5 and aiohttp.
+"""
+
+import os
+import ssl
+import json
+import time
+import asyncio
+import itertools
+
+import aiohttp
+from six.moves import http_client as httplib
+from six.moves import urllib_parse as urllib
+
+from betfair import bulk
+from betfair import utils
+from betfair import exceptions
+from betfair.batch import Batch, resolve
+from betfair.betfair import Betfair
+
+
+# Client options without an asyncio implementation
+UNSUPPORTED_OPTIONS = ('pool_connections', 'coalescer')
+
+
+class Response(object):
+    """Buffered aiohttp response exposing the attributes used by `utils` and
+    `exceptions`, so that error handling matches the synchronous client.
+
+    :param ClientResponse response: aiohttp response
+    :param bytes content: Response body
+    """
+    def __init__(self, response, content):
+        self.raw = response
+        self.status_code = response.status
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+class AsyncBatch(Batch):
+    """Asyncio variant of `Batch`. ::
+
+        async with client.batch() as batch:
+            books = batch.list_market_book(['1.23456789'])
+            funds = batch.get_account_funds()
+        books.result()
+    """
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.execute()
+
+    async def execute(self):
+        calls, self.calls = self.calls, []
+        if not calls:
+            return []
+        try:
+            response = await self.client.post(
+                self.client.api_url,
+                data=self.make_payload(calls),
+                headers=self.client.headers,
+            )
+            data = utils.parse_json(response, self.client.json_loads)
+            utils.check_status_code(response, data=data)
+        except Exception as error:
+            for call in calls:
+                call.future.set_exception(error)
+            raise
+        return resolve(response, data, calls)
+
+
+class AsyncBetfair(Betfair):
+    """Asyncio Betfair API client. Exposes the same methods as `Betfair`, but
+    each request method returns an awaitable.
+
+    :param str app_key: Optional application identifier
+    :param str cert_file: Path to self-signed SSL certificate file(s); may be
+        a *.pem file or a tuple of (*.crt, *.key) files
+    :param str content_type: Optional content type
+    :param str locale: Optional location ("australia", "italy", etc.)
+    :param ClientSession session: Optional aiohttp session; created on first
+        request if not provided
+    :param int timeout: Optional timeout duration (seconds)
+    :param int pool_maxsize: Optional maximum number of connections per host;
+        ignored if `session` is passed
+    :param float keep_alive_idle: Optional idle timeout (seconds) of pooled
+        connections; ignored if `session` is passed
+    :param RetryPolicy retry_policy: Optional policy for retrying transient
+        failures of read-only requests
+    :param BaseCache cache: Optional response cache for navigation and
+        catalogue requests
+
+    Other arguments are as for `Betfair`. `pool_connections` and `coalescer`
+    are not supported, and `SessionKeeper` cannot be used with this client.
+    """
+    is_async = True
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncBetfair, self).__init__(*args, **kwargs)
+        unsupported = [
+            name for name in UNSUPPORTED_OPTIONS if getattr(self, name) is not None
+        ]
+        if unsupported:
+            raise ValueError(
+                'Not supported by the asyncio client: {0}'.format(', '.join(unsupported))
+            )
+
+    def create_session(self):
+        # aiohttp sessions must be created inside a running event loop
+        return None
+
+    def get_session(self):
+        if self.session is None:
+            connector_kwargs = {}
+            if self.pool_maxsize is not None:
+                connector_kwargs['limit_per_host'] = self.pool_maxsize
+            if self.keep_alive_idle:
+                connector_kwargs['keepalive_timeout'] = self.keep_alive_idle
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**connector_kwargs),
+            )
+        return self.session
+
+    async def warm_up(self, connections=1):
+        """Open connections to the API and identity hosts ahead of time and
+        keep them in the session pool. See `Betfair.warm_up`.
+
+        :param int connections: Number of connections per host
+        """
+        session = self.get_session()
+        for url in (self.api_url, self.identity_url):
+            # Responses hold their connections until released, forcing each
+            # request onto a separate connection
+            responses = await asyncio.gather(*(
+                session.head(url, timeout=self.client_timeout) for _ in range(connections)
+            ))
+            for response in responses:
+                response.release()
+
+    @property
+    def client_timeout(self):
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    def get_ssl_context(self):
+        context = ssl.create_default_context()
+        if isinstance(self.cert_file, (list, tuple)):
+            context.load_cert_chain(*self.cert_file)
+        else:
+            context.load_cert_chain(self.cert_file)
+        return context
+
+    async def post(self, url, headers, **kwargs):
+        # Unlike requests, aiohttp rejects headers with `None` values
+        headers = {key: value for key, value in headers.items() if value is not None}
+        async with self.get_session().post(
+                url, headers=headers, timeout=self.client_timeout, **kwargs) as response:
+            content = await response.read()
+        return Response(response, content)
+
+    def batch(self):
+        return AsyncBatch(self)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def make_auth_request(self, method):
+        response = await self.post(
+            os.path.join(self.identity_url, method),
+            headers=self.headers,
+        )
+        data = utils.parse_json(response, self.json_loads)
+        utils.check_status_code(response, data=data)
+        if data.get('status') != 'SUCCESS':
+            raise exceptions.AuthError(response, data)
+
+    async def make_api_request(self, base, method, params, codes=None, model=None,
+                               representation=None, stream=False):
+        if stream:
+            raise ValueError('Streaming is not supported by the asyncio client')
+        payload = utils.make_payload(base, method, params)
+        data = json.dumps(payload, cls=utils.BetfairEncoder)
+        if self.cache is not None and self.cache.allows(method):
+            key = self.get_cache_key(data)
+            found, result = self.cache.lookup(key)
+            if not found:
+                result = await self.fetch_api_result(method, params, data, codes=codes)
+                self.cache.set(key, result, self.cache.ttls[method])
+        else:
+            result = await self.fetch_api_result(method, params, data, codes=codes)
+        return utils.process_result(result, model, representation or self.representation)
+
+    async def fetch_api_result(self, method, params, data, codes=None):
+        if self.retry_policy is not None and self.retry_policy.allows(method, params):
+            return await self.retry_api_request(data, codes=codes)
+        return await self.send_api_request(data, self.headers, codes=codes)
+
+    async def retry_api_request(self, data, codes=None):
+        """Send an API request, retrying transient failures when
+        `RetryPolicy.next_delay` allows.
+        """
+        policy = self.retry_policy
+        start = time.time()
+        retry = 0
+        while True:
+            attempt_start = time.time()
+            try:
+                result = await self.send_api_request(data, self.headers, codes=codes)
+            except Exception as error:
+                delay = policy.next_delay(
+                    retry, start, attempt_start, error, retryable=self.should_retry(error),
+                )
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                retry += 1
+            else:
+                policy.finish(retry, start, attempt_start)
+                return result
+
+    def should_retry(self, error):
+        if isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+            return True
+        return self.retry_policy.should_retry(error)
+
+    async def send_api_request(self, data, headers, codes=None):
+        response = await self.post(self.api_url, data=data, headers=headers)
+        data = utils.parse_json(response, self.json_loads)
+        utils.check_status_code(response, codes=codes, data=data)
+        return utils.result_or_error(response, data=data)
+
+    # Authentication methods
+
+    async def login(self, username, password):
+        """Log in to Betfair. Sets `session_token` if successful.
+
+        :param str username: Username
+        :param str password: Password
+        :raises: BetfairLoginError
+        """
+        response = await self.post(
+            os.path.join(self.identity_url, 'certlogin'),
+            ssl=self.get_ssl_context(),
+            data=urllib.urlencode({
+                'username': username,
+                'password': password,
+            }),
+            headers={
+                'X-Application': self.app_key,
+                'Content-Type': 'application/x-www-form-urlencoded',
+            },
+        )
+        data = utils.parse_json(response, self.json_loads)
+        utils.check_status_code(response, [httplib.OK], data=data)
+        if data.get('loginStatus') != 'SUCCESS':
+            raise exceptions.LoginError(response, data)
+        self.session_token = data['sessionToken']
+
+    @utils.requires_login
+    def keep_alive(self):
+        """Reset session timeout.
+
+        :raises: AuthError
+        """
+        return self.make_auth_request('keepAlive')
+
+    @utils.requires_login
+    async def logout(self):
+        """Log out and clear `session_token`.
+
+        :raises: AuthError
+        """
+        await self.make_auth_request('logout')
+        self.session_token = None
+
+    # Chunked iterators for list methods
+
+    async def iter_list_market_book(self, market_ids, chunk_size=None, **kwargs):
+        """Split call to `list_market_book` into separate requests, sent
+        concurrently. Results are returned in input order. Chunks rejected
+        with `TOO_MUCH_DATA` are split in half and retried.
+
+        :param list market_ids: List of market IDs
+        :param int chunk_size: Optional number of records per chunk; defaults
+            to the largest chunk within the request weight limit for the
+            given `price_projection`
+        :param dict kwargs: Arguments passed to `list_market_book`
+        """
+        if chunk_size is None:
+            chunk_size = utils.get_market_book_chunk_size(kwargs.get('price_projection'))
+        return list(itertools.chain(*(await asyncio.gather(*(
+            self.split_list_market_book(market_chunk, **kwargs)
+            for market_chunk in utils.get_chunks(market_ids, chunk_size)
+        )))))
+
+    async def split_list_market_book(self, market_ids, **kwargs):
+        """Call `list_market_book`, recursively splitting `market_ids` in half
+        while Betfair rejects the request with `TOO_MUCH_DATA`.
+
+        :param list market_ids: List of market IDs
+        :param dict kwargs: Arguments passed to `list_market_book`
+        """
+        try:
+            return await self.list_market_book(market_ids, **kwargs)
+        except exceptions.ApiError as error:
+            if error.message != 'TOO_MUCH_DATA' or len(market_ids) < 2:
+                raise
+        half = len(market_ids) // 2
+        books = await self.split_list_market_book(market_ids[:half], **kwargs)
+        return books + await self.split_list_market_book(market_ids[half:], **kwargs)
+
+    async def iter_list_market_profit_and_loss(
+            self, market_ids, chunk_size, **kwargs):
+        """Split call to `list_market_profit_and_loss` into separate requests,
+        sent concurrently. Results are returned in input order.
+
+        :param list market_ids: List of market IDs
+        :param int chunk_size: Number of records per chunk
+        :param dict kwargs: Arguments passed to `list_market_profit_and_loss`
+        """
+        return list(itertools.chain(*(await asyncio.gather(*(
+            self.list_market_profit_and_loss(market_chunk, **kwargs)
+            for market_chunk in utils.get_chunks(market_ids, chunk_size)
+        )))))
+
+    async def execute_bulk(self, method, market_id, instructions, customer_ref=None,
+                           max_workers=None, executor=None):
+        """Send the parts of a bulk order request concurrently and merge their
+        reports. Errors raised by a part are recorded on that part;
+        `max_workers` and `executor` are ignored.
+        """
+        func = getattr(self, method)
+
+        async def send(part):
+            try:
+                report = await func(market_id, part.instructions, customer_ref=part.customer_ref)
+            except Exception as error:
+                return part._replace(error=error)
+            return part._replace(report=report)
+
+        parts = bulk.split_instructions(method, instructions, customer_ref)
+        results = await asyncio.gather(*(send(part) for part in parts))
+        return bulk.merge_parts(method, market_id, customer_ref, results)
+
+
+async def poll_market_cache(cache, client, market_ids, price_projection=None, **kwargs):
+    """Request market books with `AsyncBetfair.iter_list_market_book` and
+    update a `MarketCache`; see `MarketCache.poll`.
+
+    :param MarketCache cache: Market cache
+    :param AsyncBetfair client: Betfair client
+    :param list market_ids: List of market IDs
+    :param PriceProjection price_projection: Optional price projection
+    :param kwargs: Other arguments of `iter_list_market_book`
+    :returns: List of `RunnerChange`
+    """
+    result = await client.iter_list_market_book(
+        market_ids, price_projection=price_projection, representation='raw', **kwargs
+    )
+    return cache.update(result, price_projection)
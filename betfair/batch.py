@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import json
+import functools
+import collections
+from concurrent import futures
+
+import six
+
+from betfair import utils
+from betfair import exceptions
+
+
+Call = collections.namedtuple(
+    'Call', ['base', 'method', 'params', 'model', 'representation', 'future'],
+)
+
+# Client methods that cannot be deferred to a batch
+UNBATCHABLE = (
+    'login',
+    'keep_alive',
+    'logout',
+    'iter_list_market_book',
+    'split_list_market_book',
+    'iter_list_market_profit_and_loss',
+    'place_orders_bulk',
+    'cancel_orders_bulk',
+    'replace_orders_bulk',
+    'update_orders_bulk',
+    'execute_bulk',
+    'batch',
+)
+
+
+class Batch(object):
+    """Collect API requests and send them to Betfair in a single JSON-RPC batch.
+    Request methods of the wrapped client (`list_market_book`,
+    `get_account_funds`, etc.) are available on the batch, but return
+    `Future` objects that are resolved when the batch is executed. Each
+    future holds either the processed result of its request or the `ApiError`
+    for that request. ::
+
+        with client.batch() as batch:
+            books = batch.list_market_book(['1.23456789'])
+            funds = batch.get_account_funds()
+        books.result()
+
+    :param Betfair client: Betfair client
+    """
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    @property
+    def session_token(self):
+        return self.client.session_token
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name in UNBATCHABLE:
+            raise AttributeError(name)
+        method = getattr(type(self.client), name)
+        return functools.partial(six.get_unbound_function(method), self)
+
+    def __len__(self):
+        return len(self.calls)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def make_api_request(self, base, method, params, codes=None, model=None,
+                         representation=None, stream=False):
+        if stream:
+            raise ValueError('Batched requests cannot be streamed')
+        future = futures.Future()
+        representation = representation or self.client.representation
+        self.calls.append(Call(base, method, params, model, representation, future))
+        return future
+
+    def make_payload(self, calls):
+        return json.dumps(
+            [
+                utils.make_payload(call.base, call.method, call.params, request_id=idx)
+                for idx, call in enumerate(calls, 1)
+            ],
+            cls=utils.BetfairEncoder,
+        )
+
+    def execute(self):
+        """Send all pending requests and resolve their futures.
+
+        :returns: List of futures in request order
+        :raises: ApiError if the batch as a whole failed
+        """
+        calls, self.calls = self.calls, []
+        if not calls:
+            return []
+        try:
+            response = self.client.session.post(
+                self.client.api_url,
+                data=self.make_payload(calls),
+                headers=self.client.headers,
+                timeout=self.client.timeout,
+            )
+            data = utils.parse_json(response, self.client.json_loads)
+            utils.check_status_code(response, data=data)
+        except Exception as error:
+            for call in calls:
+                call.future.set_exception(error)
+            raise
+        return resolve(response, data, calls)
+
+
+def resolve(response, data, calls):
+    """Match batched responses to requests by id and resolve each future.
+
+    :param Response response: HTTP response
+    :param list data: Parsed JSON-RPC response array
+    :param list calls: List of `Call` objects, in request order
+    """
+    # A single (error) object instead of an array applies to every request
+    if isinstance(data, list):
+        parts, default = {part.get('id'): part for part in data}, {}
+    else:
+        parts, default = {}, data
+    for idx, call in enumerate(calls, 1):
+        part = parts.get(idx, default)
+        result = part.get('result')
+        if result is None:
+            call.future.set_exception(exceptions.ApiError(response, part))
+            continue
+        try:
+            call.future.set_result(
+                utils.process_result(result, call.model, call.representation),
+            )
+        except Exception as error:
+            call.future.set_exception(error)
+    return [call.future for call in calls]
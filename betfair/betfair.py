@@ -11,9 +11,14 @@ import requests
 from six.moves import http_client as httplib
 from six.moves import urllib_parse as urllib
 
+from betfair import bulk
 from betfair import utils
 from betfair import models
+from betfair import streaming
 from betfair import exceptions
+from betfair.batch import Batch
+from betfair.retry import IDEMPOTENT_METHODS
+from betfair.keepalive import SESSION_ERRORS
 
 
 IDENTITY_URLS = collections.defaultdict(
@@ -37,16 +42,84 @@ class Betfair(object):
     :param str locale: Optional location ("australia", "italy", etc.)
     :param Session session: Optional Requests session
     :param int timeout: Optional timeout duration (seconds)
+    :param int pool_connections: Optional number of per-host connection pools
+        to keep; ignored if `session` is passed
+    :param int pool_maxsize: Optional maximum number of connections to keep
+        per host; ignored if `session` is passed
+    :param float keep_alive_idle: Optional idle timeout (seconds) of pooled
+        connections; connections idle for longer are replaced rather than
+        reused. Ignored if `session` is passed
+    :param RetryPolicy retry_policy: Optional policy for retrying transient
+        failures of read-only requests
+    :param Coalescer coalescer: Optional coalescer sharing the results of
+        identical concurrent read-only requests
+    :param BaseCache cache: Optional response cache for navigation and
+        catalogue requests
+    :param str json_backend: Optional JSON decoding library ("orjson",
+        "ujson" or "json"); defaults to the fastest installed library
+    :param str representation: Default representation of results ("model",
+        "lazy", "compact", "columnar", "compact_ticks" or "columnar_ticks");
+        may be overridden per call where supported
     """
+    # Whether request methods return awaitables
+    is_async = False
+
     def __init__(self, app_key, cert_file, content_type='application/json', locale=None,
-                 session=None, timeout=None):
+                 session=None, timeout=None, pool_connections=None, pool_maxsize=None,
+                 keep_alive_idle=None, retry_policy=None, coalescer=None,
+                 cache=None, json_backend=None, representation='model'):
         self.app_key = app_key
         self.cert_file = cert_file
         self.content_type = content_type
         self.locale = locale
-        self.session = session or requests.Session()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive_idle = keep_alive_idle
+        self.session = session or self.create_session()
         self.session_token = None
+        self.session_keeper = None
         self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.coalescer = coalescer
+        self.cache = cache
+        self.json_loads = utils.get_json_loads(json_backend)
+        utils.check_representation(representation)
+        self.representation = representation
+
+    def create_session(self):
+        session = requests.Session()
+        pool_kwargs = {
+            key: value for key, value in (
+                ('pool_connections', self.pool_connections),
+                ('pool_maxsize', self.pool_maxsize),
+            )
+            if value is not None
+        }
+        if pool_kwargs or self.keep_alive_idle:
+            adapter = utils.KeepAliveAdapter(keep_alive_idle=self.keep_alive_idle, **pool_kwargs)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        return session
+
+    def warm_up(self, connections=1):
+        """Open connections to the API and identity hosts ahead of time and
+        keep them in the session pool, so that subsequent requests skip DNS,
+        TCP and TLS setup. Login requests use a client certificate and are not
+        covered.
+
+        :param int connections: Number of connections per host; should not
+            exceed `pool_maxsize`
+        """
+        for url in (self.api_url, self.identity_url):
+            # Streamed responses hold their connections until read, forcing
+            # each request onto a separate connection
+            responses = [
+                self.session.head(url, stream=True, timeout=self.timeout)
+                for _ in range(connections)
+            ]
+            # Reading the (empty) bodies releases the connections to the pool
+            for response in responses:
+                response.content
 
     @property
     def identity_url(self):
@@ -71,22 +144,92 @@ class Betfair(object):
             headers=self.headers,
             timeout=self.timeout,
         )
-        utils.check_status_code(response)
-        data = response.json()
+        data = utils.parse_json(response, self.json_loads)
+        utils.check_status_code(response, data=data)
         if data.get('status') != 'SUCCESS':
             raise exceptions.AuthError(response, data)
 
-    def make_api_request(self, base, method, params, codes=None, model=None):
+    def make_api_request(self, base, method, params, codes=None, model=None,
+                         representation=None, stream=False):
         payload = utils.make_payload(base, method, params)
+        data = json.dumps(payload, cls=utils.BetfairEncoder)
+        representation = representation or self.representation
+        if stream:
+            return self.stream_api_request(data, codes=codes, model=model,
+                                           representation=representation)
+        if self.coalescer is not None and method in IDEMPOTENT_METHODS:
+            return self.coalescer.call(
+                (data, model, representation), self.execute_api_request, method, params,
+                data, codes=codes, model=model, representation=representation,
+            )
+        return self.execute_api_request(
+            method, params, data, codes=codes, model=model, representation=representation,
+        )
+
+    def execute_api_request(self, method, params, data, codes=None, model=None,
+                            representation=None):
+        if self.cache is not None and self.cache.allows(method):
+            result = self.cache.call(
+                method, self.get_cache_key(data), self.fetch_api_result, method, params, data,
+                codes=codes,
+            )
+        else:
+            result = self.fetch_api_result(method, params, data, codes=codes)
+        return utils.process_result(result, model, representation)
+
+    def get_cache_key(self, data):
+        """Get the cache key of a serialized request payload. Keys include the
+        API URL and locale, since caches may be shared by clients of different
+        jurisdictions.
+        """
+        return '{0} {1} {2}'.format(self.api_url, self.locale, data)
+
+    def fetch_api_result(self, method, params, data, codes=None):
+        if self.retry_policy is not None and self.retry_policy.allows(method, params):
+            return self.retry_policy.call(self.post_api_request, data, codes=codes)
+        return self.post_api_request(data, codes=codes)
+
+    def post_api_request(self, data, codes=None):
+        headers = self.headers
+        try:
+            return self.send_api_request(data, headers, codes=codes)
+        except exceptions.ApiError as error:
+            if self.session_keeper is None or error.message not in SESSION_ERRORS:
+                raise
+        # Wait for a fresh session token and retry once
+        self.session_keeper.relogin(headers['X-Authentication'])
+        return self.send_api_request(data, self.headers, codes=codes)
+
+    def send_api_request(self, data, headers, codes=None):
+        response = self.session.post(
+            self.api_url,
+            data=data,
+            headers=headers,
+            timeout=self.timeout,
+        )
+        data = utils.parse_json(response, self.json_loads)
+        utils.check_status_code(response, codes=codes, data=data)
+        return utils.result_or_error(response, data=data)
+
+    def stream_api_request(self, data, codes=None, model=None, representation=None):
+        """Send an API request and return a `ResultStream` over the items of
+        its result. Streamed requests are not cached, coalesced or retried.
+        """
         response = self.session.post(
             self.api_url,
-            data=json.dumps(payload, cls=utils.BetfairEncoder),
+            data=data,
             headers=self.headers,
             timeout=self.timeout,
+            stream=True,
         )
         utils.check_status_code(response, codes=codes)
-        result = utils.result_or_error(response)
-        return utils.process_result(result, model)
+        return streaming.ResultStream(response, model, representation)
+
+    def batch(self):
+        """Create a `Batch` that sends several API requests in a single
+        HTTP request.
+        """
+        return Batch(self)
 
     # Authentication methods
 
@@ -110,8 +253,8 @@ class Betfair(object):
             },
             timeout=self.timeout,
         )
-        utils.check_status_code(response, [httplib.OK])
-        data = response.json()
+        data = utils.parse_json(response, self.json_loads)
+        utils.check_status_code(response, [httplib.OK], data=data)
         if data.get('loginStatus') != 'SUCCESS':
             raise exceptions.LoginError(response, data)
         self.session_token = data['sessionToken']
@@ -243,7 +386,7 @@ class Betfair(object):
     @utils.requires_login
     def list_market_catalogue(
             self, filter=None, max_results=100, market_projection=None, locale=None,
-            sort=None):
+            sort=None, representation=None, stream=False):
         """
 
         :param MarketFilter filter:
@@ -251,6 +394,10 @@ class Betfair(object):
         :param list market_projection:
         :param MarketSort sort:
         :param str locale:
+        :param str representation: Optional representation of results,
+            overriding the client default
+        :param bool stream: Return a `ResultStream` yielding markets as the
+            response is read
         """
         filter = filter or models.MarketFilter()
         return self.make_api_request(
@@ -258,12 +405,15 @@ class Betfair(object):
             'listMarketCatalogue',
             utils.get_kwargs(locals()),
             model=models.MarketCatalogue,
+            representation=representation,
+            stream=stream,
         )
 
     @utils.requires_login
     def list_market_book(
             self, market_ids, price_projection=None, order_projection=None,
-            match_projection=None, currency_code=None, locale=None):
+            match_projection=None, currency_code=None, locale=None,
+            representation=None):
         """
 
         :param list market_ids: List of market IDs
@@ -272,12 +422,15 @@ class Betfair(object):
         :param MatchProjection match_projection:
         :param str currency_code:
         :param str locale:
+        :param str representation: Optional representation of results,
+            overriding the client default
         """
         return self.make_api_request(
             'Sports',
             'listMarketBook',
             utils.get_kwargs(locals()),
             model=models.MarketBook,
+            representation=representation,
         )
 
     @utils.requires_login
@@ -302,29 +455,65 @@ class Betfair(object):
 
     # Chunked iterators for list methods
 
-    def iter_list_market_book(self, market_ids, chunk_size, **kwargs):
-        """Split call to `list_market_book` into separate requests.
+    def iter_list_market_book(
+            self, market_ids, chunk_size=None, max_workers=None, executor=None,
+            **kwargs):
+        """Split call to `list_market_book` into separate requests. If
+        `max_workers` or `executor` is given, requests are sent in parallel
+        over the client session; results are still yielded in input order.
+        Chunks rejected with `TOO_MUCH_DATA` are split in half and retried.
 
         :param list market_ids: List of market IDs
-        :param int chunk_size: Number of records per chunk
+        :param int chunk_size: Optional number of records per chunk; defaults
+            to the largest chunk within the request weight limit for the
+            given `price_projection`
+        :param int max_workers: Optional number of parallel requests
+        :param Executor executor: Optional executor for parallel requests
         :param dict kwargs: Arguments passed to `list_market_book`
         """
-        return itertools.chain(*(
-            self.list_market_book(market_chunk, **kwargs)
-            for market_chunk in utils.get_chunks(market_ids, chunk_size)
+        if chunk_size is None:
+            chunk_size = utils.get_market_book_chunk_size(kwargs.get('price_projection'))
+        return itertools.chain.from_iterable(utils.map_chunks(
+            lambda market_chunk: self.split_list_market_book(market_chunk, **kwargs),
+            utils.get_chunks(market_ids, chunk_size),
+            max_workers=max_workers,
+            executor=executor,
         ))
 
+    def split_list_market_book(self, market_ids, **kwargs):
+        """Call `list_market_book`, recursively splitting `market_ids` in half
+        while Betfair rejects the request with `TOO_MUCH_DATA`.
+
+        :param list market_ids: List of market IDs
+        :param dict kwargs: Arguments passed to `list_market_book`
+        """
+        try:
+            return self.list_market_book(market_ids, **kwargs)
+        except exceptions.ApiError as error:
+            if error.message != 'TOO_MUCH_DATA' or len(market_ids) < 2:
+                raise
+        half = len(market_ids) // 2
+        books = self.split_list_market_book(market_ids[:half], **kwargs)
+        return books + self.split_list_market_book(market_ids[half:], **kwargs)
+
     def iter_list_market_profit_and_loss(
-            self, market_ids, chunk_size, **kwargs):
+            self, market_ids, chunk_size, max_workers=None, executor=None,
+            **kwargs):
         """Split call to `list_market_profit_and_loss` into separate requests.
+        If `max_workers` or `executor` is given, requests are sent in parallel
+        over the client session; results are still yielded in input order.
 
         :param list market_ids: List of market IDs
         :param int chunk_size: Number of records per chunk
+        :param int max_workers: Optional number of parallel requests
+        :param Executor executor: Optional executor for parallel requests
         :param dict kwargs: Arguments passed to `list_market_profit_and_loss`
         """
-        return itertools.chain(*(
-            self.list_market_profit_and_loss(market_chunk, **kwargs)
-            for market_chunk in utils.get_chunks(market_ids, chunk_size)
+        return itertools.chain.from_iterable(utils.map_chunks(
+            lambda market_chunk: self.list_market_profit_and_loss(market_chunk, **kwargs),
+            utils.get_chunks(market_ids, chunk_size),
+            max_workers=max_workers,
+            executor=executor,
         ))
 
     # Betting methods
@@ -333,7 +522,7 @@ class Betfair(object):
     def list_current_orders(
             self, bet_ids=None, market_ids=None, order_projection=None,
             date_range=None, order_by=None, sort_dir=None, from_record=None,
-            record_count=None):
+            record_count=None, stream=False):
         """
 
         :param bet_ids:
@@ -344,19 +533,23 @@ class Betfair(object):
         :param sort_dir:
         :param from_record:
         :param record_count:
+        :param bool stream: Return a `ResultStream` yielding orders as the
+            response is read
         """
         return self.make_api_request(
             'Sports',
             'listCurrentOrders',
             utils.get_kwargs(locals()),
             model=models.CurrentOrderSummaryReport,
+            stream=stream,
         )
 
     @utils.requires_login
     def list_cleared_orders(
             self, bet_status, event_type_ids, event_ids, market_ids,
             runner_ids, bet_ids, side, settled_date_range, group_by,
-            include_item_description, locale, from_record, record_count):
+            include_item_description, locale, from_record, record_count,
+            stream=False):
         """
 
         :param bet_status:
@@ -372,12 +565,15 @@ class Betfair(object):
         :param locale:
         :param from_record:
         :param record_count:
+        :param bool stream: Return a `ResultStream` yielding orders as the
+            response is read
         """
         return self.make_api_request(
             'Sports',
             'listClearedOrders',
             utils.get_kwargs(locals()),
             model=models.ClearedOrderSummaryReport,
+            stream=stream,
         )
 
     @utils.requires_login
@@ -443,6 +639,95 @@ class Betfair(object):
             model=models.UpdateExecutionReport,
         )
 
+    # Bulk order methods
+
+    @utils.requires_login
+    def place_orders_bulk(self, market_id, instructions, customer_ref=None, max_workers=None,
+                          executor=None):
+        """Call `place_orders`, splitting `instructions` into requests of up to
+        200 instructions, sent in parallel. Unlike a single request, a bulk
+        request is not atomic: some parts may be placed while others fail.
+
+        :param str market_id: The market id these orders are to be placed on
+        :param list instructions: List of `PlaceInstruction` objects
+        :param str customer_ref: Optional order identifier string; parts after
+            the first are sent with a numbered suffix
+        :param int max_workers: Optional number of parallel requests; defaults
+            to one per part
+        :param Executor executor: Optional executor for parallel requests
+        :returns: `BulkExecutionReport`
+        """
+        return self.execute_bulk(
+            'place_orders', market_id, instructions, customer_ref, max_workers, executor)
+
+    @utils.requires_login
+    def cancel_orders_bulk(self, market_id, instructions, customer_ref=None, max_workers=None,
+                           executor=None):
+        """Call `cancel_orders`, splitting `instructions` into requests of up
+        to 60 instructions, sent in parallel.
+
+        :param str market_id: If not supplied all bets are cancelled
+        :param list instructions: List of `CancelInstruction` objects
+        :param str customer_ref: Optional order identifier string
+        :param int max_workers: Optional number of parallel requests
+        :param Executor executor: Optional executor for parallel requests
+        :returns: `BulkExecutionReport`
+        """
+        return self.execute_bulk(
+            'cancel_orders', market_id, instructions, customer_ref, max_workers, executor)
+
+    @utils.requires_login
+    def replace_orders_bulk(self, market_id, instructions, customer_ref=None, max_workers=None,
+                            executor=None):
+        """Call `replace_orders`, splitting `instructions` into requests of up
+        to 60 instructions, sent in parallel.
+
+        :param str market_id: The market id these orders are to be placed on
+        :param list instructions: List of `ReplaceInstruction` objects
+        :param str customer_ref: Optional order identifier string
+        :param int max_workers: Optional number of parallel requests
+        :param Executor executor: Optional executor for parallel requests
+        :returns: `BulkExecutionReport`
+        """
+        return self.execute_bulk(
+            'replace_orders', market_id, instructions, customer_ref, max_workers, executor)
+
+    @utils.requires_login
+    def update_orders_bulk(self, market_id, instructions, customer_ref=None, max_workers=None,
+                           executor=None):
+        """Call `update_orders`, splitting `instructions` into requests of up
+        to 60 instructions, sent in parallel.
+
+        :param str market_id: The market id these orders are to be placed on
+        :param list instructions: List of `UpdateInstruction` objects
+        :param str customer_ref: Optional order identifier string
+        :param int max_workers: Optional number of parallel requests
+        :param Executor executor: Optional executor for parallel requests
+        :returns: `BulkExecutionReport`
+        """
+        return self.execute_bulk(
+            'update_orders', market_id, instructions, customer_ref, max_workers, executor)
+
+    def execute_bulk(self, method, market_id, instructions, customer_ref=None,
+                     max_workers=None, executor=None):
+        """Send the parts of a bulk order request and merge their reports.
+        Errors raised by a part are recorded on that part.
+        """
+        func = getattr(self, method)
+
+        def send(part):
+            try:
+                report = func(market_id, part.instructions, customer_ref=part.customer_ref)
+            except Exception as error:
+                return part._replace(error=error)
+            return part._replace(report=report)
+
+        parts = bulk.split_instructions(method, instructions, customer_ref)
+        if max_workers is None and len(parts) > 1:
+            max_workers = len(parts)
+        results = utils.map_chunks(send, parts, max_workers=max_workers, executor=executor)
+        return bulk.merge_parts(method, market_id, customer_ref, list(results))
+
     @utils.requires_login
     def get_account_funds(self, wallet=None):
         """Get available to bet amount.
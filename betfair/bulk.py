@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""Splitting of order instructions across requests within Betfair's
+per-request limits, and merging of the execution reports of the parts. Used
+by the bulk order methods of the clients::
+
+    result = client.place_orders_bulk(market_id, instructions)
+    result.report.instruction_reports       # In the order of `instructions`
+    [part.error or part.report.status for part in result.failed_parts]
+"""
+
+from __future__ import absolute_import
+
+import collections
+
+from betfair import utils
+from betfair import models
+
+
+# Execution and instruction report models of each order method
+REPORT_MODELS = {
+    'place_orders': (models.PlaceExecutionReport, models.PlaceInstructionReport),
+    'cancel_orders': (models.CancelExecutionReport, models.CancelInstructionReport),
+    'replace_orders': (models.ReplaceExecutionReport, models.ReplaceInstructionReport),
+    'update_orders': (models.UpdateExecutionReport, models.UpdateInstructionReport),
+}
+
+# Maximum length of the customer reference of an order request
+MAX_CUSTOMER_REF_LENGTH = 32
+
+# Instructions sent in one request, with the index of the first instruction,
+# the customer reference sent, and the execution report or the exception
+# raised by the request
+BulkPart = collections.namedtuple(
+    'BulkPart', ['start', 'instructions', 'customer_ref', 'report', 'error'],
+)
+
+
+class BulkExecutionReport(collections.namedtuple('BulkExecutionReport', ['report', 'parts'])):
+    """Merged execution report of a bulk order request, and its parts."""
+    __slots__ = ()
+
+    @property
+    def failed_parts(self):
+        """Parts whose request raised or was not fully successful."""
+        return [
+            part for part in self.parts
+            if part.error is not None or part.report.status != 'SUCCESS'
+        ]
+
+
+def get_part_customer_ref(customer_ref, index):
+    """Get the customer reference of a part. Betfair rejects requests with
+    the customer reference of a recent request, so parts after the first are
+    given distinct references, truncating `customer_ref` as needed to fit
+    `MAX_CUSTOMER_REF_LENGTH`.
+    """
+    if customer_ref is None or index == 0:
+        return customer_ref
+    suffix = '-{0}'.format(index)
+    return customer_ref[:MAX_CUSTOMER_REF_LENGTH - len(suffix)] + suffix
+
+
+def split_instructions(method, instructions, customer_ref=None):
+    """Split instructions into parts within the limit of order method
+    `method`.
+
+    :param str method: Order method, e.g. "place_orders"
+    :param list instructions: List of instructions; `None` is sent as is
+    :param str customer_ref: Optional customer reference
+    :returns: List of unsent `BulkPart`
+    """
+    if not instructions:
+        return [BulkPart(0, instructions, customer_ref, None, None)]
+    size = utils.MAX_INSTRUCTIONS[method]
+    return [
+        BulkPart(index * size, chunk, get_part_customer_ref(customer_ref, index), None, None)
+        for index, chunk in enumerate(utils.get_chunks(instructions, size))
+    ]
+
+
+def get_instruction_reports(method, part):
+    """Get the instruction reports of a part, with failed reports for
+    instructions of parts that raised or have no report for them.
+    """
+    reports = list(part.report.instruction_reports or []) if part.error is None else []
+    instruction_model = REPORT_MODELS[method][1]
+    for instruction in (part.instructions or [])[len(reports):]:
+        report = instruction_model(status='FAILURE')
+        if 'instruction' in instruction_model._fields:
+            report.instruction = instruction
+        reports.append(report)
+    return reports
+
+
+def merge_status(parts):
+    statuses = set(
+        'FAILURE' if part.error is not None else part.report.status for part in parts
+    )
+    if len(statuses) == 1:
+        status, = statuses
+        codes = set(part.report.error_code if part.error is None else None for part in parts)
+        return status, codes.pop() if len(codes) == 1 else None
+    return 'PROCESSED_WITH_ERRORS', 'PROCESSED_WITH_ERRORS'
+
+
+def merge_parts(method, market_id, customer_ref, parts):
+    """Merge the reports of sent parts into one execution report, with
+    instruction reports in the order of the instructions.
+
+    :param str method: Order method, e.g. "place_orders"
+    :param str market_id: Market ID
+    :param str customer_ref: Customer reference of the bulk request
+    :param list parts: List of sent `BulkPart`
+    :returns: `BulkExecutionReport`
+    """
+    parts = sorted(parts, key=lambda part: part.start)
+    if len(parts) == 1 and parts[0].error is None:
+        return BulkExecutionReport(parts[0].report, parts)
+    status, error_code = merge_status(parts)
+    report = REPORT_MODELS[method][0](
+        customer_ref=customer_ref,
+        status=status,
+        error_code=error_code,
+        market_id=market_id,
+    )
+    report.instruction_reports = [
+        instruction_report
+        for part in parts
+        for instruction_report in get_instruction_reports(method, part)
+    ]
+    return BulkExecutionReport(report, parts)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import json
+import time
+import sqlite3
+import threading
+import contextlib
+import collections
+
+
+# Navigation and catalogue operations that may be cached, with default
+# time-to-live values (seconds). Betting and account operations are never
+# cached.
+DEFAULT_TTLS = {
+    'listEventTypes': 300,
+    'listCompetitions': 300,
+    'listCountries': 300,
+    'listVenues': 300,
+    'listMarketTypes': 300,
+    'listMarketCatalogue': 60,
+}
+
+
+class BaseCache(object):
+    """Response cache for navigation and catalogue requests. Entries hold the
+    raw JSON `result` of a request, keyed by its API URL, locale and serialized
+    payload, so each hit is converted to fresh model instances. Subclasses
+    implement `get` and `set`.
+
+    :param dict ttls: Optional time-to-live (seconds) per Betfair endpoint,
+        overriding `DEFAULT_TTLS`; a TTL of zero disables caching
+    :param int max_size: Maximum number of entries before the least recently
+        used entries are evicted
+    :ivar int hits: Number of requests served from the cache
+    :ivar int misses: Number of cacheable requests sent to Betfair
+    """
+    def __init__(self, ttls=None, max_size=1024):
+        ttls = ttls or {}
+        invalid = set(ttls) - set(DEFAULT_TTLS)
+        if invalid:
+            raise ValueError('Cannot cache endpoints: {0}'.format(', '.join(sorted(invalid))))
+        self.ttls = dict(DEFAULT_TTLS, **ttls)
+        self.max_size = max_size
+        self.stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def allows(self, method):
+        return self.ttls.get(method, 0) > 0
+
+    def call(self, method, key, func, *args, **kwargs):
+        """Get the cached result for `key`, or call `func` and cache its result.
+
+        :param str method: Betfair endpoint
+        :param str key: Cache key of the request
+        :param func: Callable returning the raw request result
+        """
+        found, result = self.lookup(key)
+        if found:
+            return result
+        result = func(*args, **kwargs)
+        self.set(key, result, self.ttls[method])
+        return result
+
+    def lookup(self, key):
+        """Get a live entry, counting the hit or miss.
+
+        :returns: Tuple of (found, result)
+        """
+        found, result = self.get(key)
+        with self.stats_lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found, result
+
+    def get(self, key):
+        """Get a live entry.
+
+        :returns: Tuple of (found, result)
+        """
+        raise NotImplementedError
+
+    def set(self, key, result, ttl):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    """In-process LRU response cache."""
+    def __init__(self, ttls=None, max_size=1024):
+        super(MemoryCache, self).__init__(ttls=ttls, max_size=max_size)
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None or entry[0] <= time.time():
+                return False, None
+            self.entries[key] = entry
+            return True, entry[1]
+
+    def set(self, key, result, ttl):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (time.time() + ttl, result)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SqliteCache(BaseCache):
+    """SQLite-backed LRU response cache, which may be shared by several
+    processes on the same host.
+
+    :param str path: Path to the database file
+    """
+    def __init__(self, path, ttls=None, max_size=1024, timeout=5):
+        super(SqliteCache, self).__init__(ttls=ttls, max_size=max_size)
+        self.path = path
+        self.timeout = timeout
+        with self.connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS betfair_cache ('
+                'key TEXT PRIMARY KEY, result TEXT, expires REAL, accessed REAL)'
+            )
+
+    def __len__(self):
+        with self.connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM betfair_cache').fetchone()[0]
+
+    @contextlib.contextmanager
+    def connect(self):
+        # Connections are not shared between threads
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self.connect() as conn:
+            row = conn.execute(
+                'SELECT result FROM betfair_cache WHERE key = ? AND expires > ?',
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return False, None
+            conn.execute('UPDATE betfair_cache SET accessed = ? WHERE key = ?', (now, key))
+        return True, json.loads(row[0])
+
+    def set(self, key, result, ttl):
+        now = time.time()
+        with self.connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO betfair_cache VALUES (?, ?, ?, ?)',
+                (key, json.dumps(result), now + ttl, now),
+            )
+            conn.execute('DELETE FROM betfair_cache WHERE expires <= ?', (now, ))
+            conn.execute(
+                'DELETE FROM betfair_cache WHERE key IN ('
+                'SELECT key FROM betfair_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_size, ),
+            )
+
+    def clear(self):
+        with self.connect() as conn:
+            conn.execute('DELETE FROM betfair_cache')
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import time
+import threading
+from concurrent import futures
+
+import six
+
+
+class Coalescer(object):
+    """Single-flight request coalescing. Identical calls made while a call is
+    in flight wait for and share its result instead of calling again. With a
+    `freshness` window, identical calls made shortly after a successful call
+    also reuse its result. Shared results are the same objects, so callers
+    must not mutate them.
+
+    :param float freshness: Optional seconds for which a completed result is
+        reused
+    :ivar int hits: Number of calls served without calling through
+    """
+    def __init__(self, freshness=0):
+        self.freshness = freshness
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.recent = {}
+        self.hits = 0
+
+    def call(self, key, func, *args, **kwargs):
+        """Call `func`, or share the result of an identical call.
+
+        :param key: Hashable call identifier
+        :param func: Callable to call through to
+        """
+        owner = False
+        with self.lock:
+            future = self.pending.get(key) or self.get_recent(key)
+            if future is None:
+                future = self.pending[key] = futures.Future()
+                owner = True
+            else:
+                self.hits += 1
+        if not owner:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self.lock:
+                del self.pending[key]
+        future.set_result(result)
+        if self.freshness:
+            with self.lock:
+                self.prune()
+                self.recent[key] = (time.time() + self.freshness, future)
+        return result
+
+    def get_recent(self, key):
+        expires, future = self.recent.get(key, (None, None))
+        if future is not None and expires > time.time():
+            return future
+        return None
+
+    def prune(self):
+        now = time.time()
+        for key, (expires, _) in list(six.iteritems(self.recent)):
+            if expires <= now:
+                del self.recent[key]
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+
+"""Columnar NumPy views of market books, for vectorized analytics across
+runners and markets. Requires NumPy (``pip install betfair.py[numpy]``).
+Select with ``representation='columnar'``::
+
+    books = client.list_market_book(
+        market_ids,
+        price_projection=PriceProjection(price_data=[PriceData.EX_BEST_OFFERS]),
+        representation='columnar',
+    )
+    spreads = books.lay_prices[:, 0] - books.back_prices[:, 0]
+
+With ``representation='columnar_ticks'``, ladder prices are stored as int16
+ladder indexes (see `betfair.price_array.encode_ticks`), so that spreads and
+price moves are integer arithmetic::
+
+    spreads = books.lay_ticks[:, 0] - books.back_ticks[:, 0]
+"""
+
+from __future__ import absolute_import
+
+import six
+import numpy as np
+
+from betfair import models
+from betfair import price_array
+
+
+NAN = float('nan')
+
+# Attributes with one entry per book
+BOOK_ARRAYS = (
+    'market_ids',
+    'market_statuses',
+    'market_inplay',
+    'market_total_matched',
+)
+
+# Attributes with one entry, or one row of ladder levels, per runner
+RUNNER_ARRAYS = (
+    'selection_ids',
+    'handicaps',
+    'statuses',
+    'last_price_traded',
+    'total_matched',
+    'back_prices',
+    'back_sizes',
+    'lay_prices',
+    'lay_sizes',
+)
+
+# Flattened traded volume of all runners
+TRADED_ARRAYS = (
+    'traded_prices',
+    'traded_sizes',
+)
+
+LADDERS = ('back_prices', 'back_sizes', 'lay_prices', 'lay_sizes')
+
+ALL_ARRAYS = BOOK_ARRAYS + RUNNER_ARRAYS + TRADED_ARRAYS + ('runner_offsets', 'traded_offsets')
+
+# Price attributes and the attributes storing their ticks
+TICK_ARRAYS = (
+    ('last_price_traded', 'last_traded_ticks'),
+    ('back_prices', 'back_ticks'),
+    ('lay_prices', 'lay_ticks'),
+    ('traded_prices', 'traded_ticks'),
+)
+
+
+def get_ladders(ladders, depth):
+    """Get NaN-padded arrays of shape (len(ladders), depth) of the prices and
+    sizes of ladders.
+
+    :param list ladders: Lists of `PriceSize` JSON objects
+    :param int depth: Number of levels
+    """
+    prices, sizes = [], []
+    for ladder in ladders:
+        padding = [NAN] * (depth - len(ladder))
+        prices.extend([level['price'] for level in ladder])
+        prices.extend(padding)
+        sizes.extend([level['size'] for level in ladder])
+        sizes.extend(padding)
+    shape = (len(ladders), depth)
+    return (
+        np.array(prices, dtype=np.float64).reshape(shape),
+        np.array(sizes, dtype=np.float64).reshape(shape),
+    )
+
+
+def get_offsets(lengths):
+    """Get offsets into a flattened array from the lengths of its parts."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def pad_ladder(ladder, depth):
+    if ladder.shape[1] == depth:
+        return ladder
+    fill = price_array.NO_TICK if ladder.dtype == price_array.TICK_DTYPE else NAN
+    padding = np.full((ladder.shape[0], depth - ladder.shape[1]), fill, dtype=ladder.dtype)
+    return np.hstack([ladder, padding])
+
+
+class MarketBookColumns(object):
+    """Columnar view of a list of market books. Runners of all books are
+    stacked in order: rows `runner_offsets[i]:runner_offsets[i + 1]` of each
+    runner array belong to book `i`. Ladders are NaN-padded arrays of shape
+    (runners, depth), with the best price in column 0. Traded volume is
+    ragged: entries `traded_offsets[j]:traded_offsets[j + 1]` of the traded
+    arrays belong to runner row `j`. Missing values are NaN.
+
+    Indexing returns the view of a single book; iterating yields the view of
+    each book; adding views concatenates them.
+
+    :ivar market_ids: Market IDs, shape (books, )
+    :ivar market_statuses: Market statuses, shape (books, )
+    :ivar market_inplay: In-play flags, shape (books, )
+    :ivar market_total_matched: Amounts matched per market, shape (books, )
+    :ivar runner_offsets: First runner row of each book, shape (books + 1, )
+    :ivar selection_ids: Selection IDs, shape (runners, )
+    :ivar handicaps: Handicaps, shape (runners, )
+    :ivar statuses: Runner statuses, shape (runners, )
+    :ivar last_price_traded: Last prices traded, shape (runners, )
+    :ivar total_matched: Amounts matched per runner, shape (runners, )
+    :ivar back_prices: Prices available to back, shape (runners, depth)
+    :ivar back_sizes: Sizes available to back, shape (runners, depth)
+    :ivar lay_prices: Prices available to lay, shape (runners, depth)
+    :ivar lay_sizes: Sizes available to lay, shape (runners, depth)
+    :ivar traded_offsets: First traded entry of each runner row, shape
+        (runners + 1, )
+    :ivar traded_prices: Traded prices of all runners
+    :ivar traded_sizes: Traded sizes of all runners
+    """
+    BOOK_ARRAYS = BOOK_ARRAYS
+    RUNNER_ARRAYS = RUNNER_ARRAYS
+    TRADED_ARRAYS = TRADED_ARRAYS
+    LADDERS = LADDERS
+
+    def __init__(self, **arrays):
+        for name, value in six.iteritems(arrays):
+            setattr(self, name, value)
+
+    @classmethod
+    def unserialize(cls, result):
+        """Build columns from `listMarketBook` JSON without creating models.
+
+        :param result: List of market book JSON objects, or a single object
+        """
+        books = [result] if isinstance(result, dict) else result
+        runners = [
+            runner
+            for book in books
+            for runner in book.get('runners') or []
+        ]
+        exchange = [runner.get('ex') or {} for runner in runners]
+        back = [ex.get('availableToBack') or [] for ex in exchange]
+        lay = [ex.get('availableToLay') or [] for ex in exchange]
+        traded = [ex.get('tradedVolume') or [] for ex in exchange]
+        depth = max([len(ladder) for ladder in back + lay] or [0])
+        back_prices, back_sizes = get_ladders(back, depth)
+        lay_prices, lay_sizes = get_ladders(lay, depth)
+        traded_levels = [level for ladder in traded for level in ladder]
+        return cls(
+            market_ids=np.array([book.get('marketId') for book in books], dtype=object),
+            market_statuses=np.array([book.get('status') for book in books], dtype=object),
+            market_inplay=np.array([bool(book.get('inplay')) for book in books], dtype=bool),
+            market_total_matched=np.array(
+                [book.get('totalMatched') for book in books], dtype=np.float64,
+            ),
+            runner_offsets=get_offsets([len(book.get('runners') or []) for book in books]),
+            selection_ids=np.array(
+                [runner.get('selectionId') for runner in runners], dtype=np.int64,
+            ),
+            handicaps=np.array([runner.get('handicap') for runner in runners], dtype=np.float64),
+            statuses=np.array([runner.get('status') for runner in runners], dtype=object),
+            last_price_traded=np.array(
+                [runner.get('lastPriceTraded') for runner in runners], dtype=np.float64,
+            ),
+            total_matched=np.array(
+                [runner.get('totalMatched') for runner in runners], dtype=np.float64,
+            ),
+            back_prices=back_prices,
+            back_sizes=back_sizes,
+            lay_prices=lay_prices,
+            lay_sizes=lay_sizes,
+            traded_offsets=get_offsets([len(ladder) for ladder in traded]),
+            traded_prices=np.array(
+                [level['price'] for level in traded_levels], dtype=np.float64,
+            ),
+            traded_sizes=np.array(
+                [level['size'] for level in traded_levels], dtype=np.float64,
+            ),
+        )
+
+    @classmethod
+    def concatenate(cls, columns):
+        """Concatenate views, padding ladders to the greatest depth.
+
+        :param list columns: List of `MarketBookColumns`
+        """
+        columns = list(columns)
+        depth = max([each.depth for each in columns] or [0])
+        arrays = {}
+        for name in cls.BOOK_ARRAYS + cls.RUNNER_ARRAYS + cls.TRADED_ARRAYS:
+            parts = [getattr(each, name) for each in columns]
+            if name in cls.LADDERS:
+                parts = [pad_ladder(part, depth) for part in parts] or [np.empty((0, depth))]
+            arrays[name] = np.concatenate(parts) if parts else np.array([])
+        for name in ('runner_offsets', 'traded_offsets'):
+            lengths = [np.diff(getattr(each, name)) for each in columns]
+            arrays[name] = get_offsets(np.concatenate(lengths) if lengths else [])
+        return cls(**arrays)
+
+    @property
+    def depth(self):
+        return self.back_sizes.shape[1]
+
+    @property
+    def book_index(self):
+        """Book index of each runner row."""
+        return np.repeat(np.arange(len(self)), np.diff(self.runner_offsets))
+
+    def __len__(self):
+        return len(self.market_ids)
+
+    def __getitem__(self, index):
+        index = range(len(self))[index]
+        start, stop = self.runner_offsets[index], self.runner_offsets[index + 1]
+        traded_start, traded_stop = self.traded_offsets[start], self.traded_offsets[stop]
+        arrays = {
+            'runner_offsets': self.runner_offsets[index:index + 2] - start,
+            'traded_offsets': self.traded_offsets[start:stop + 1] - traded_start,
+        }
+        for name in self.BOOK_ARRAYS:
+            arrays[name] = getattr(self, name)[index:index + 1]
+        for name in self.RUNNER_ARRAYS:
+            arrays[name] = getattr(self, name)[start:stop]
+        for name in self.TRADED_ARRAYS:
+            arrays[name] = getattr(self, name)[traded_start:traded_stop]
+        return type(self)(**arrays)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __add__(self, other):
+        return self.concatenate([self, other])
+
+    def traded_volume(self, row):
+        """Get the traded prices and sizes of a runner row."""
+        start, stop = self.traded_offsets[row], self.traded_offsets[row + 1]
+        return self.traded_prices[start:stop], self.traded_sizes[start:stop]
+
+    def best_back_prices(self):
+        return self.back_prices[:, 0] if self.depth else np.full(len(self.selection_ids), NAN)
+
+    def best_lay_prices(self):
+        return self.lay_prices[:, 0] if self.depth else np.full(len(self.selection_ids), NAN)
+
+    def weight_of_money(self):
+        """Share of available volume on the back side for each runner row, or
+        NaN if no volume is available.
+        """
+        back = np.nansum(self.back_sizes, axis=1)
+        total = back + np.nansum(self.lay_sizes, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return back / total
+
+
+def decoded(name):
+    """Property decoding the prices of tick attribute `name`."""
+    return property(
+        lambda self: price_array.decode_ticks(getattr(self, name)),
+        doc='Prices of `{0}`, with NaN for missing prices'.format(name),
+    )
+
+
+class MarketBookTicks(MarketBookColumns):
+    """Columnar view of a list of market books storing ladder prices as
+    ticks. Tick arrays have dtype `price_array.TICK_DTYPE`, with
+    `price_array.NO_TICK` for missing prices; the price arrays of
+    `MarketBookColumns` are decoded from them on access.
+
+    :ivar last_traded_ticks: Ticks of last prices traded, shape (runners, )
+    :ivar back_ticks: Ticks available to back, shape (runners, depth)
+    :ivar lay_ticks: Ticks available to lay, shape (runners, depth)
+    :ivar traded_ticks: Traded ticks of all runners
+    """
+    RUNNER_ARRAYS = tuple(dict(TICK_ARRAYS).get(name, name) for name in RUNNER_ARRAYS)
+    TRADED_ARRAYS = tuple(dict(TICK_ARRAYS).get(name, name) for name in TRADED_ARRAYS)
+    LADDERS = tuple(dict(TICK_ARRAYS).get(name, name) for name in LADDERS)
+
+    last_price_traded = decoded('last_traded_ticks')
+    back_prices = decoded('back_ticks')
+    lay_prices = decoded('lay_ticks')
+    traded_prices = decoded('traded_ticks')
+
+    @classmethod
+    def unserialize(cls, result):
+        """Build columns from `listMarketBook` JSON without creating models.
+
+        :param result: List of market book JSON objects, or a single object
+        :raises: ValueError if a price is not on the price ladder
+        """
+        return cls.from_columns(MarketBookColumns.unserialize(result))
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Encode the prices of a `MarketBookColumns` view as ticks.
+
+        :param MarketBookColumns columns: Columnar view
+        :raises: ValueError if a price is not on the price ladder
+        """
+        arrays = dict((name, getattr(columns, name)) for name in ALL_ARRAYS)
+        for name, tick_name in TICK_ARRAYS:
+            arrays[tick_name] = price_array.encode_ticks(arrays.pop(name))
+        return cls(**arrays)
+
+    def to_columns(self):
+        """Decode ticks to a `MarketBookColumns` view."""
+        return MarketBookColumns(**dict((name, getattr(self, name)) for name in ALL_ARRAYS))
+
+    def traded_volume(self, row):
+        start, stop = self.traded_offsets[row], self.traded_offsets[row + 1]
+        return (
+            price_array.decode_ticks(self.traded_ticks[start:stop]),
+            self.traded_sizes[start:stop],
+        )
+
+    def best_back_ticks(self):
+        return self.back_ticks[:, 0] if self.depth else np.full(
+            len(self.selection_ids), price_array.NO_TICK, dtype=price_array.TICK_DTYPE)
+
+    def best_lay_ticks(self):
+        return self.lay_ticks[:, 0] if self.depth else np.full(
+            len(self.selection_ids), price_array.NO_TICK, dtype=price_array.TICK_DTYPE)
+
+
+# Columnar classes by the model classes they replace
+COLUMNAR_MODELS = {
+    models.MarketBook: MarketBookColumns,
+}
+TICK_COLUMNAR_MODELS = {
+    models.MarketBook: MarketBookTicks,
+}
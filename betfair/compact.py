@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+"""Compact representations of high-volume market data. Compact classes use
+`__slots__` instead of Schematics models, keep the attribute names of the
+models they mirror, and convert back to full models with `to_model`. Select
+them with ``representation='compact'``::
+
+    client = Betfair('app-key', 'cert.pem', representation='compact')
+    books = client.list_market_book(['1.23456789'])
+    books[0].runners[0].ex.available_to_back[0].price
+    books[0].to_model()
+
+With ``representation='compact_ticks'``, prices on the price ladder are
+stored as shared `Tick` instances, so that ladder arithmetic is integer-only;
+ticks are converted back to prices when serialized::
+
+    books = client.list_market_book(['1.23456789'], representation='compact_ticks')
+    back = books[0].runners[0].ex.available_to_back[0].price   # Tick(2.5)
+    lay = books[0].runners[0].ex.available_to_lay[0].price     # Tick(2.54)
+    lay - back                              # 2 ticks
+    back.price                              # 2.5
+"""
+
+from __future__ import absolute_import
+
+import six
+from schematics.types import compound
+
+from betfair import price
+from betfair import models
+from betfair.meta.types import PriceType
+from betfair.meta.compiler import uses
+from betfair.meta.compiler import ModelCompiler
+
+
+# Compact classes by the model classes they mirror
+COMPACT_MODELS = {}
+# Compact classes storing ladder prices as ticks, by the model classes they
+# mirror
+TICK_MODELS = {}
+
+
+def to_model(value):
+    """Convert compact instances, or lists of them, to full models, and ticks
+    to prices.
+    """
+    if isinstance(value, CompactModel):
+        return value.to_model()
+    if isinstance(value, list):
+        return [to_model(item) for item in value]
+    return price.from_tick(value)
+
+
+def from_model(value, registry=COMPACT_MODELS):
+    """Convert models, or lists of them, to compact instances where a compact
+    class exists.
+
+    :param registry: Compact classes by model class
+    """
+    compact = registry.get(type(value))
+    if compact is not None:
+        return compact.from_model(value)
+    if isinstance(value, list):
+        return [from_model(item, registry) for item in value]
+    return value
+
+
+class CompactCompiler(ModelCompiler):
+
+    def __init__(self, cls, model=None):
+        super(CompactCompiler, self).__init__(cls, model)
+        self.registry = TICK_MODELS if cls.ticks else COMPACT_MODELS
+
+    def convert(self, field, value):
+        if self.cls.ticks and uses(field, PriceType):
+            return '{0}({1})'.format(self.bind('to_tick', price.to_tick), value)
+        return super(CompactCompiler, self).convert(field, value)
+
+    def nested(self, field):
+        if uses(field, compound.ModelType) and field.model_class in self.registry:
+            return self.registry[field.model_class].unserialize
+        return super(CompactCompiler, self).nested(field)
+
+    def build(self, values):
+        lines = ['instance = new(cls)']
+        lines.extend('instance.{0} = {1}'.format(name, value) for name, value in values)
+        lines.append('return instance')
+        return lines
+
+    def fallback(self):
+        return 'cls.from_model(model(**data))'
+
+
+class CompactModelMeta(type):
+    """Define `__slots__` for the fields of `model`, register the class, and
+    generate its `unserialize` function.
+    """
+    def __new__(meta, name, bases, attrs):
+        model = attrs.get('model')
+        if model is not None:
+            attrs['__slots__'] = tuple(model._fields)
+        cls = super(CompactModelMeta, meta).__new__(meta, name, bases, attrs)
+        if model is not None:
+            (TICK_MODELS if cls.ticks else COMPACT_MODELS)[model] = cls
+            cls.unserialize = staticmethod(CompactCompiler(cls, model).compile())
+        return cls
+
+
+class CompactModel(six.with_metaclass(CompactModelMeta, object)):
+    """Base class for compact models.
+
+    :cvar model: Model class mirrored by this class
+    :cvar bool ticks: Store ladder prices as `Tick` instances
+    """
+    __slots__ = ()
+    model = None
+    ticks = False
+
+    def __init__(self, **data):
+        for name in self.__slots__:
+            setattr(self, name, data.get(name))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{0}({1})'.format(
+            type(self).__name__,
+            ', '.join(
+                '{0}={1!r}'.format(name, getattr(self, name))
+                for name in self.__slots__
+                if getattr(self, name) is not None
+            ),
+        )
+
+    def to_model(self):
+        """Convert to an instance of the full model."""
+        return self.model(**{
+            name: to_model(getattr(self, name))
+            for name in self.__slots__
+        })
+
+    @classmethod
+    def from_model(cls, instance):
+        """Convert an instance of the full model.
+
+        :param BetfairModel instance: Model instance
+        """
+        compact = object.__new__(cls)
+        registry = TICK_MODELS if cls.ticks else COMPACT_MODELS
+        for name in cls.__slots__:
+            value = from_model(getattr(instance, name), registry)
+            if cls.ticks and value is not None and uses(cls.model._fields[name], PriceType):
+                value = price.to_tick(value)
+            setattr(compact, name, value)
+        return compact
+
+
+class PriceSize(CompactModel):
+    model = models.PriceSize
+
+
+class StartingPrices(CompactModel):
+    model = models.StartingPrices
+
+
+class ExchangePrices(CompactModel):
+    model = models.ExchangePrices
+
+
+class Order(CompactModel):
+    model = models.Order
+
+
+class Match(CompactModel):
+    model = models.Match
+
+
+class Runner(CompactModel):
+    model = models.Runner
+
+
+class MarketBook(CompactModel):
+    model = models.MarketBook
+
+
+class TickPriceSize(CompactModel):
+    model = models.PriceSize
+    ticks = True
+
+
+class TickStartingPrices(CompactModel):
+    model = models.StartingPrices
+    ticks = True
+
+
+class TickExchangePrices(CompactModel):
+    model = models.ExchangePrices
+    ticks = True
+
+
+class TickOrder(CompactModel):
+    model = models.Order
+    ticks = True
+
+
+class TickMatch(CompactModel):
+    model = models.Match
+    ticks = True
+
+
+class TickRunner(CompactModel):
+    model = models.Runner
+    ticks = True
+
+
+class TickMarketBook(CompactModel):
+    model = models.MarketBook
+    ticks = True
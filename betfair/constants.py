@@ -29,6 +29,20 @@ PriceData = Enum(
     ]
 )
 
+MarketDataField = Enum(
+    'MarketDataField', [
+        'EX_BEST_OFFERS_DISP',
+        'EX_BEST_OFFERS',
+        'EX_ALL_OFFERS',
+        'EX_TRADED',
+        'EX_TRADED_VOL',
+        'EX_LTP',
+        'EX_MARKET_DEF',
+        'SP_TRADED',
+        'SP_PROJECTED',
+    ]
+)
+
 MatchProjection = Enum(
     'MatchProjection', [
         'NO_ROLLUP',
@@ -62,6 +76,7 @@ RunnerStatus = Enum(
         'REMOVED_VACANT',
         'REMOVED',
         'HIDDEN',
+        'PLACED',
     ]
 )
 
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+"""Differences between successive snapshots of a market book. `diff`
+describes what changed between two polls of a market as a compact
+`MarketBookDelta`, and `apply` rebuilds the later snapshot from the earlier
+one and the delta, so book histories can be stored as one snapshot and a
+series of deltas::
+
+    delta = diff(previous, current)
+    for runner in delta.runners:
+        if runner.best_back_moved:
+            ...
+    assert apply(previous, delta) == current
+
+Both full models and compact instances are supported. Unchanged runners,
+prices and orders are shared between snapshots rather than copied.
+
+Deltas record changed levels rather than level order: `apply` assumes
+ladders are sorted as Betfair returns them, with back prices descending and
+lay prices and traded volume ascending.
+"""
+
+from __future__ import absolute_import
+
+import operator
+import collections
+
+from betfair import models
+from betfair import compact
+from betfair.meta.models import BetfairModel
+
+
+# Changed book fields, changed runners, runners added with their instances,
+# keys of removed runners, and the order of runner keys if it changed
+MarketBookDelta = collections.namedtuple(
+    'MarketBookDelta', ['market_id', 'fields', 'runners', 'added', 'removed', 'order'],
+)
+
+# Changed runner fields other than ladders, changed ladder levels, and
+# whether the best prices moved. Back and lay levels are pairs of price and
+# new size, with a size of zero for removed levels; traded levels are triples
+# of price, new size and traded volume added.
+RunnerDelta = collections.namedtuple(
+    'RunnerDelta', [
+        'selection_id', 'handicap', 'fields', 'back', 'lay', 'traded',
+        'best_back_moved', 'best_lay_moved',
+    ],
+)
+
+BOOK_FIELDS = tuple(name for name in models.MarketBook._fields if name != 'runners')
+RUNNER_FIELDS = tuple(name for name in models.Runner._fields if name != 'ex')
+LADDERS = ('available_to_back', 'available_to_lay', 'traded_volume')
+
+
+def get_values(instance):
+    """Get the field values of a model or compact instance by name. Model
+    values are read from their data dictionary, bypassing field descriptors.
+    """
+    if isinstance(instance, BetfairModel):
+        return instance._data
+    return dict((name, getattr(instance, name)) for name in instance.__slots__)
+
+
+def equal(value, other):
+    """Compare values, recursing into models and lists of models without
+    the overhead of `Model.__eq__`.
+    """
+    if value is other:
+        return True
+    if type(value) is not type(other):
+        return value == other
+    if isinstance(value, list):
+        if value and isinstance(value[0], BetfairModel):
+            # Compares flat models such as `PriceSize` without recursion
+            return [item._data for item in value] == [
+                item._data if isinstance(item, BetfairModel) else item for item in other
+            ]
+        return value == other
+    if isinstance(value, BetfairModel):
+        data, other_data = value._data, other._data
+        return all(equal(data.get(name), other_data.get(name)) for name in value._fields)
+    return value == other
+
+
+def diff_values(previous, current, names):
+    """Get the values of fields `names` of `current` that differ from
+    `previous`, where both are field values by name.
+    """
+    return dict(
+        (name, current.get(name))
+        for name in names
+        if not equal(previous.get(name), current.get(name))
+    )
+
+
+get_price_size = operator.itemgetter('price', 'size')
+
+
+def runner_key(runner):
+    return runner.selection_id, runner.handicap
+
+
+def get_levels(ladder):
+    if not ladder:
+        return []
+    if isinstance(ladder[0], BetfairModel):
+        return [get_price_size(level._data) for level in ladder]
+    return [(level.price, level.size) for level in ladder]
+
+
+def same_levels(previous, current):
+    """Check whether two ladders have the same levels. Model ladders are
+    compared by their data dictionaries, which is cheaper than extracting
+    their levels.
+    """
+    if previous is current:
+        return True
+    if previous and current and isinstance(previous[0], BetfairModel):
+        return [level._data for level in previous] == [level._data for level in current]
+    return get_levels(previous) == get_levels(current)
+
+
+def get_best_price(ladder):
+    return ladder[0].price if ladder else None
+
+
+def diff_levels(previous, current):
+    """Get the levels of ladder `current` that differ from `previous`, with
+    a size of zero for levels that were removed.
+    """
+    sizes = dict(previous)
+    changes = [(price, size) for price, size in current if sizes.pop(price, None) != size]
+    changes.extend((price, 0) for price in sizes)
+    return changes
+
+
+def diff_runner(previous, current):
+    """Get the `RunnerDelta` between two states of a runner, or `None` if
+    they are equal.
+    """
+    if previous is current:
+        return None
+    old_values, new_values = get_values(previous), get_values(current)
+    fields = diff_values(old_values, new_values, RUNNER_FIELDS)
+    ex, previous_ex = new_values.get('ex'), old_values.get('ex')
+    old_ladders = get_values(previous_ex) if previous_ex is not None else {}
+    new_ladders = get_values(ex) if ex is not None else {}
+    old_back, new_back = old_ladders.get('available_to_back'), new_ladders.get('available_to_back')
+    old_lay, new_lay = old_ladders.get('available_to_lay'), new_ladders.get('available_to_lay')
+    back, lay, traded = [], [], []
+    if ex is not previous_ex and (ex is None or previous_ex is None or any(
+        (new_ladders.get(name) is None) != (old_ladders.get(name) is None)
+        for name in LADDERS
+    )):
+        fields['ex'] = ex
+    elif ex is not previous_ex:
+        if not same_levels(old_back, new_back):
+            back = diff_levels(get_levels(old_back), get_levels(new_back))
+        if not same_levels(old_lay, new_lay):
+            lay = diff_levels(get_levels(old_lay), get_levels(new_lay))
+        old_traded, new_traded = old_ladders.get('traded_volume'), new_ladders.get('traded_volume')
+        if not same_levels(old_traded, new_traded):
+            old_traded = get_levels(old_traded)
+            sizes = dict(old_traded)
+            traded = [
+                (price, size, size - sizes.get(price, 0))
+                for price, size in diff_levels(old_traded, get_levels(new_traded))
+            ]
+    if not (fields or back or lay or traded):
+        return None
+    return RunnerDelta(
+        current.selection_id, current.handicap, fields, back, lay, traded,
+        get_best_price(old_back) != get_best_price(new_back),
+        get_best_price(old_lay) != get_best_price(new_lay),
+    )
+
+
+def diff(previous, current):
+    """Get the changes between two snapshots of a market book. Ladders are
+    expected in Betfair order: back prices descending, lay prices and traded
+    volume ascending.
+
+    :param previous: Earlier `MarketBook`, or its compact representation
+    :param current: Later `MarketBook` of the same market
+    :returns: `MarketBookDelta`, or `None` if the snapshots are equal
+    """
+    if previous.market_id != current.market_id:
+        raise ValueError('Cannot compare books of markets {0} and {1}'.format(
+            previous.market_id, current.market_id))
+    fields = diff_values(get_values(previous), get_values(current), BOOK_FIELDS)
+    previous_runners = collections.OrderedDict(
+        (runner_key(runner), runner) for runner in previous.runners or ()
+    )
+    previous_keys = list(previous_runners)
+    runners, added, keys = [], [], []
+    for runner in current.runners or ():
+        key = runner_key(runner)
+        keys.append(key)
+        previous_runner = previous_runners.pop(key, None)
+        if previous_runner is None:
+            added.append(runner)
+            continue
+        delta = diff_runner(previous_runner, runner)
+        if delta is not None:
+            runners.append(delta)
+    removed = list(previous_runners)
+    order = keys if keys != previous_keys else None
+    if (previous.runners is None) != (current.runners is None):
+        fields['runners'] = current.runners
+    if not (fields or runners or added or removed or order):
+        return None
+    return MarketBookDelta(current.market_id, fields, runners, added, removed, order)
+
+
+def replace(instance, **values):
+    """Copy a model or compact instance, replacing the values of fields."""
+    new = object.__new__(type(instance))
+    if isinstance(instance, BetfairModel):
+        new._initial = {}
+        new._data = dict(instance._data, **values)
+    elif isinstance(instance, compact.CompactModel):
+        for name in instance.__slots__:
+            setattr(new, name, values[name] if name in values else getattr(instance, name))
+    else:
+        raise TypeError('Cannot copy {0!r}'.format(instance))
+    return new
+
+
+def get_price_size_class(instance):
+    if isinstance(instance, compact.CompactModel):
+        registry = compact.TICK_MODELS if instance.ticks else compact.COMPACT_MODELS
+        return registry[models.PriceSize]
+    return models.PriceSize
+
+
+def apply_levels(ladder, changes, cls, reverse=False):
+    """Apply changed levels to a ladder, keeping unchanged levels. Levels are
+    sorted by price, descending if `reverse`.
+    """
+    levels = collections.OrderedDict((level.price, level) for level in ladder or ())
+    for change in changes:
+        price, size = change[0], change[1]
+        if size == 0:
+            levels.pop(price, None)
+        else:
+            levels[price] = cls.unserialize({'price': price, 'size': size})
+    return sorted(levels.values(), key=lambda level: level.price, reverse=reverse)
+
+
+def apply_runner(runner, delta):
+    values = dict(delta.fields)
+    if 'ex' not in values and (delta.back or delta.lay or delta.traded):
+        ex = runner.ex
+        cls = get_price_size_class(ex)
+        changes = {}
+        if delta.back:
+            changes['available_to_back'] = apply_levels(
+                ex.available_to_back, delta.back, cls, reverse=True)
+        if delta.lay:
+            changes['available_to_lay'] = apply_levels(ex.available_to_lay, delta.lay, cls)
+        if delta.traded:
+            changes['traded_volume'] = apply_levels(ex.traded_volume, delta.traded, cls)
+        values['ex'] = replace(ex, **changes)
+    return replace(runner, **values)
+
+
+def apply(book, delta):
+    """Rebuild the later snapshot of a market book from the earlier snapshot
+    and their delta. The earlier snapshot is not modified. Changed ladders
+    are sorted in Betfair order: back prices descending, lay prices and
+    traded volume ascending.
+
+    :param book: Earlier `MarketBook`, or its compact representation
+    :param MarketBookDelta delta: Delta from `diff`, or `None`
+    """
+    if delta is None:
+        return book
+    if book.market_id != delta.market_id:
+        raise ValueError('Cannot apply delta of market {0} to market {1}'.format(
+            delta.market_id, book.market_id))
+    runners = collections.OrderedDict((runner_key(runner), runner) for runner in book.runners or ())
+    for key in delta.removed:
+        runners.pop(key, None)
+    for runner in delta.added:
+        runners[runner_key(runner)] = runner
+    for runner_delta in delta.runners:
+        key = (runner_delta.selection_id, runner_delta.handicap)
+        runners[key] = apply_runner(runners[key], runner_delta)
+    keys = delta.order if delta.order is not None else list(runners)
+    values = dict(delta.fields)
+    if 'runners' not in values:
+        values['runners'] = [runners[key] for key in keys]
+    return replace(book, **values)
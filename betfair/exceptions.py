@@ -40,3 +40,21 @@ class ApiError(BetfairError):
             self.message = 'UNKNOWN'
             self.details = None
         super(ApiError, self).__init__(self.message)
+
+
+class StreamError(BetfairError):
+
+    def __init__(self, data):
+        self.data = data
+        self.message = data.get('errorCode', 'UNKNOWN')
+        self.details = data.get('errorMessage')
+        self.connection_closed = data.get('connectionClosed', False)
+        super(StreamError, self).__init__(self.message)
+
+
+class ExecutionError(BetfairError):
+
+    def __init__(self, report):
+        self.report = report
+        self.message = report.error_code or report.status or 'UNKNOWN'
+        super(ExecutionError, self).__init__(self.message)
@@ -0,0 +1,959 @@
+# -*- coding: utf-8 -*-
+
+"""Client for the Betfair Exchange Stream API. A `MarketStream` subscribes to
+market changes over a persistent connection and applies them to a local
+price ladder for each runner, which can be read as market books at any
+time, and an `OrderStream` keeps the current orders of the account::
+
+    stream = MarketStream(client)
+    stream.subscribe(
+        MarketFilter(event_type_ids=['7'], market_type_codes=['WIN']),
+        fields=[MarketDataField.EX_BEST_OFFERS, MarketDataField.EX_MARKET_DEF],
+        ladder_levels=3,
+    )
+    stream.add_listener(lambda market_ids: print(stream.get_market_book(market_ids[0])))
+    stream.start()
+    ...
+    stream.stop()
+
+    orders = OrderStream(client)
+    orders.add_order_listener(lambda change: print(change.event, change.order.bet_id))
+    orders.subscribe()
+    orders.start()
+"""
+
+from __future__ import absolute_import
+
+import ssl
+import json
+import time
+import datetime
+import socket
+import logging
+import itertools
+import threading
+import collections
+
+from betfair import utils
+from betfair import models
+from betfair import constants
+from betfair import exceptions
+
+
+logger = logging.getLogger(__name__)
+
+STREAM_HOST = 'stream-api.betfair.com'
+INTEGRATION_STREAM_HOST = 'stream-api-integration.betfair.com'
+STREAM_PORT = 443
+CRLF = b'\r\n'
+
+# Seconds without any message, including heartbeats, before the connection
+# is considered dead; Betfair sends heartbeats at least every five seconds
+DEFAULT_TIMEOUT = 15
+DEFAULT_RETRY_DELAY = 2
+
+# Status error codes after which reconnecting may succeed
+RETRY_ERRORS = (
+    'TIMEOUT',
+    'UNEXPECTED_ERROR',
+    'CONNECTION_FAILED',
+)
+
+# Stream filter keys of the `MarketFilter` fields supported by market
+# subscriptions
+MARKET_FILTER_KEYS = {
+    'market_ids': 'marketIds',
+    'event_type_ids': 'eventTypeIds',
+    'event_ids': 'eventIds',
+    'venues': 'venues',
+    'market_countries': 'countryCodes',
+    'market_type_codes': 'marketTypes',
+    'market_betting_types': 'bettingTypes',
+    'turn_in_play_enabled': 'turnInPlayEnabled',
+    'bsp_only': 'bspMarket',
+}
+
+DEFAULT_MARKET_FIELDS = (
+    constants.MarketDataField.EX_BEST_OFFERS,
+    constants.MarketDataField.EX_TRADED,
+    constants.MarketDataField.EX_LTP,
+    constants.MarketDataField.EX_MARKET_DEF,
+)
+
+# Representations that can be built for a single market
+STREAM_REPRESENTATIONS = ('model', 'lazy', 'compact', 'compact_ticks')
+
+# Runner ladders keyed by price, and by level; levels of the first ladder
+# received of each side are used for the book
+PRICE_LADDERS = ('atb', 'atl', 'trd', 'spb', 'spl')
+LEVEL_LADDERS = ('batb', 'batl', 'bdatb', 'bdatl')
+BACK_LADDERS = ('bdatb', 'batb', 'atb')
+LAY_LADDERS = ('bdatl', 'batl', 'atl')
+
+# Market book keys of market definition keys
+DEFINITION_KEYS = {
+    'status': 'status',
+    'betDelay': 'betDelay',
+    'bspReconciled': 'bspReconciled',
+    'complete': 'complete',
+    'inPlay': 'inplay',
+    'numberOfWinners': 'numberOfWinners',
+    'numberOfActiveRunners': 'numberOfActiveRunners',
+    'crossMatching': 'crossMatching',
+    'runnersVoidable': 'runnersVoidable',
+    'version': 'version',
+}
+
+
+def get_stream_filter(market_filter=None):
+    """Get the stream market filter of a `MarketFilter`. Dictionaries are
+    taken to be stream filters already.
+
+    :param MarketFilter market_filter: Optional market filter
+    :raises: ValueError if the filter uses fields not supported by streams
+    """
+    if market_filter is None:
+        return {}
+    if isinstance(market_filter, dict):
+        return market_filter
+    stream_filter = {}
+    for name in market_filter._fields:
+        value = getattr(market_filter, name)
+        if value is None:
+            continue
+        if name not in MARKET_FILTER_KEYS:
+            raise ValueError('Market subscriptions cannot filter on {0}'.format(name))
+        stream_filter[MARKET_FILTER_KEYS[name]] = value
+    return stream_filter
+
+
+def call_listener(listener, *args):
+    """Call a listener, logging rather than raising its errors, so that a
+    failing listener does not stop the reading thread.
+    """
+    try:
+        listener(*args)
+    except Exception:
+        logger.exception('Error in stream listener %r', listener)
+
+
+class BaseStream(object):
+    """Connection to the Exchange Stream API, which exchanges CRLF-delimited
+    JSON messages over TLS. Subclasses define the subscription and change
+    message ops, and apply change messages to their caches.
+
+    Messages are read and applied from a background thread between `start`
+    and `stop`, or one at a time with `receive`. After a connection error or
+    a read timeout, the stream reconnects and resubscribes from the last
+    clock values received, so the server sends only changes since then.
+
+    :param Betfair client: Logged-in Betfair client
+    :param str host: Stream host
+    :param int port: Stream port
+    :param bool secure: Connect over TLS
+    :param float timeout: Seconds without messages before reconnecting
+    :param bool reconnect: Reconnect after connection errors
+    :param float retry_delay: Seconds to wait before reconnecting
+    """
+    subscription_op = None
+    change_op = None
+
+    def __init__(self, client, host=STREAM_HOST, port=STREAM_PORT, secure=True,
+                 timeout=DEFAULT_TIMEOUT, reconnect=True, retry_delay=DEFAULT_RETRY_DELAY):
+        self.client = client
+        self.host = host
+        self.port = port
+        self.secure = secure
+        self.timeout = timeout
+        self.reconnect = reconnect
+        self.retry_delay = retry_delay
+        self.loads = getattr(client, 'json_loads', json.loads)
+        self.lock = threading.RLock()
+        self.send_lock = threading.Lock()
+        self.statuses = threading.Condition()
+        self.listeners = []
+        self.sock = None
+        self.reader = None
+        self.connection_id = None
+        self.message_ids = itertools.count(1)
+        self.responses = {}
+        self.subscription = None
+        self.initial_clk = None
+        self.clk = None
+        self.heartbeat_ms = None
+        self.conflate_ms = None
+        self.status = None
+        self.publish_time = None
+        self.pending = []
+        self.stopped = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def connected(self):
+        return self.sock is not None
+
+    def add_listener(self, listener):
+        """Call `listener` with the list of changed keys after each complete
+        change message.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def connect(self):
+        """Connect and authenticate with the client's app key and session
+        token.
+
+        :raises: StreamError if authentication fails
+        """
+        if not self.client.session_token:
+            raise exceptions.NotLoggedIn()
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        if self.secure:
+            context = ssl.create_default_context()
+            sock = context.wrap_socket(sock, server_hostname=self.host)
+        self.sock, self.reader = sock, sock.makefile('rb')
+        try:
+            self.dispatch(self.read())
+            self.request({
+                'op': 'authentication',
+                'appKey': self.client.app_key,
+                'session': self.client.session_token,
+            })
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        sock, reader = self.sock, self.reader
+        self.sock = self.reader = None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+            reader.close()
+            sock.close()
+
+    def send(self, message):
+        """Send a request, adding a message ID.
+
+        :returns: Message ID
+        """
+        with self.send_lock:
+            if self.sock is None:
+                raise socket.error('Stream is not connected')
+            message = dict(message, id=next(self.message_ids))
+            data = json.dumps(message, cls=utils.BetfairEncoder).encode('utf-8')
+            self.sock.sendall(data + CRLF)
+        return message['id']
+
+    def read(self):
+        reader = self.reader
+        if reader is None:
+            raise socket.error('Stream is not connected')
+        try:
+            line = reader.readline()
+        except ValueError:
+            # The connection was closed by another thread
+            raise socket.error('Stream connection closed')
+        if not line:
+            raise socket.error('Stream connection closed')
+        return self.loads(line)
+
+    def receive(self):
+        """Read and apply one message."""
+        self.dispatch(self.read())
+
+    def request(self, message):
+        """Send a request and wait for its status. Messages received before
+        the status are applied. When the background thread is reading, the
+        status is received by that thread.
+
+        :returns: Status message
+        :raises: StreamError if the request failed
+        """
+        message_id = self.send(message)
+        thread = self.thread
+        if thread is None or thread is threading.current_thread():
+            while message_id not in self.responses:
+                self.receive()
+        else:
+            deadline = time.time() + (self.timeout or DEFAULT_TIMEOUT)
+            with self.statuses:
+                while message_id not in self.responses and thread.is_alive():
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.statuses.wait(remaining)
+        status = self.responses.pop(message_id, None)
+        if status is None:
+            raise socket.error('No response to request {0}'.format(message_id))
+        if status.get('statusCode') != 'SUCCESS':
+            raise exceptions.StreamError(status)
+        return status
+
+    def heartbeat(self):
+        """Check that the connection is alive."""
+        return self.request({'op': 'heartbeat'})
+
+    def dispatch(self, message):
+        op = message.get('op')
+        if op == self.change_op:
+            self.on_change(message)
+        elif op == 'status':
+            self.on_status(message)
+        elif op == 'connection':
+            self.connection_id = message.get('connectionId')
+
+    def on_status(self, message):
+        if message.get('id') is not None:
+            with self.statuses:
+                self.responses[message['id']] = message
+                self.statuses.notify_all()
+        elif message.get('statusCode') != 'SUCCESS':
+            raise exceptions.StreamError(message)
+
+    def on_change(self, message):
+        with self.lock:
+            if 'initialClk' in message:
+                self.initial_clk = message['initialClk']
+            if 'clk' in message:
+                self.clk = message['clk']
+            self.heartbeat_ms = message.get('heartbeatMs', self.heartbeat_ms)
+            self.conflate_ms = message.get('conflateMs', self.conflate_ms)
+            self.status = message.get('status')
+            self.publish_time = message.get('pt', self.publish_time)
+            if message.get('ct') == 'HEARTBEAT':
+                return
+            self.pending.extend(self.apply(message))
+            # Segmented images are applied as they arrive, but listeners are
+            # only called once the last segment has been applied
+            if message.get('segmentType') in ('SEG_START', 'SEG'):
+                return
+            changed = list(collections.OrderedDict.fromkeys(self.pending))
+            self.pending = []
+        if changed:
+            self.notify(changed)
+
+    def notify(self, changed):
+        for listener in list(self.listeners):
+            call_listener(listener, changed)
+
+    def apply(self, message):
+        """Apply a change message to the cache.
+
+        :returns: List of changed keys
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Clear the cache and clock values before a new subscription."""
+        with self.lock:
+            self.initial_clk = self.clk = None
+            self.pending = []
+
+    def subscribe_message(self, message):
+        """Send a subscription, replacing any previous subscription, and keep
+        it for resubscribing after reconnecting.
+        """
+        if self.sock is None:
+            self.connect()
+        self.reset()
+        self.subscription = dict(message, op=self.subscription_op)
+        return self.request(self.subscription)
+
+    def resubscribe(self):
+        """Repeat the subscription with the last clock values, so that only
+        changes since then are sent.
+        """
+        message = dict(self.subscription)
+        with self.lock:
+            if self.initial_clk is not None:
+                message['initialClk'] = self.initial_clk
+            if self.clk is not None:
+                message['clk'] = self.clk
+        return self.request(message)
+
+    def start(self):
+        """Connect if needed, and read messages from a background thread."""
+        if self.sock is None:
+            self.connect()
+        self.stopped.clear()
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='betfair-stream')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop reading messages and close the connection."""
+        self.stopped.set()
+        self.close()
+        thread, self.thread = self.thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        with self.statuses:
+            self.statuses.notify_all()
+
+    def should_retry(self, error):
+        if isinstance(error, exceptions.StreamError):
+            return self.reconnect and error.message in RETRY_ERRORS
+        return self.reconnect and not isinstance(error, exceptions.BetfairError)
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                if self.sock is None:
+                    self.connect()
+                    if self.subscription is not None:
+                        self.resubscribe()
+                self.receive()
+            except (socket.error, exceptions.BetfairError) as error:
+                self.close()
+                if self.stopped.is_set():
+                    break
+                if not self.should_retry(error):
+                    logger.error('Stream stopped after error: %r', error)
+                    self.error = error
+                    break
+                logger.warning('Reconnecting to stream after error: %r', error)
+                self.stopped.wait(self.retry_delay)
+            except Exception as error:
+                logger.exception('Stream stopped after unexpected error')
+                self.error = error
+                self.close()
+                break
+        # Set when stopping after an error, so that callers waiting on the
+        # stream are released
+        self.stopped.set()
+        with self.statuses:
+            self.statuses.notify_all()
+
+
+class RunnerLadder(object):
+    """Prices of a runner, as received from the stream. Ladders are kept as
+    dictionaries of sizes by price or of price and size pairs by level.
+    """
+    __slots__ = ('selection_id', 'handicap', 'ltp', 'tv', 'spn', 'spf', 'prices', 'levels')
+
+    def __init__(self, selection_id, handicap):
+        self.selection_id = selection_id
+        self.handicap = handicap
+        self.ltp = self.tv = self.spn = self.spf = None
+        self.prices = {}
+        self.levels = {}
+
+    def update(self, change):
+        for name in PRICE_LADDERS:
+            if name in change:
+                ladder = self.prices.setdefault(name, {})
+                for price, size in change[name]:
+                    if size:
+                        ladder[price] = size
+                    else:
+                        ladder.pop(price, None)
+        for name in LEVEL_LADDERS:
+            if name in change:
+                ladder = self.levels.setdefault(name, {})
+                for level, price, size in change[name]:
+                    if size:
+                        ladder[level] = (price, size)
+                    else:
+                        ladder.pop(level, None)
+        self.ltp = change.get('ltp', self.ltp)
+        self.tv = change.get('tv', self.tv)
+        self.spn = change.get('spn', self.spn)
+        self.spf = change.get('spf', self.spf)
+
+    def get_levels(self, names, reverse):
+        for name in names:
+            if name in self.levels:
+                ladder = self.levels[name]
+                return [ladder[level] for level in sorted(ladder)]
+            if name in self.prices:
+                return sorted(self.prices[name].items(), reverse=reverse)
+        return None
+
+    def serialize(self, definition=None):
+        """Get the runner as `listMarketBook` runner JSON.
+
+        :param dict definition: Runner definition from the market definition
+        """
+        definition = definition or {}
+        raw = {
+            'selectionId': self.selection_id,
+            'handicap': self.handicap,
+            'status': definition.get('status', 'ACTIVE'),
+            'adjustmentFactor': definition.get('adjustmentFactor'),
+            'removalDate': definition.get('removalDate'),
+            'lastPriceTraded': self.ltp,
+            'totalMatched': self.tv,
+        }
+        back = self.get_levels(BACK_LADDERS, True)
+        lay = self.get_levels(LAY_LADDERS, False)
+        traded = self.get_levels(('trd', ), False)
+        if back is not None or lay is not None or traded is not None:
+            raw['ex'] = {
+                'availableToBack': serialize_levels(back),
+                'availableToLay': serialize_levels(lay),
+                'tradedVolume': serialize_levels(traded),
+            }
+        sp_back = self.get_levels(('spb', ), True)
+        sp_lay = self.get_levels(('spl', ), False)
+        bsp = definition.get('bsp')
+        if any(value is not None for value in (self.spn, self.spf, sp_back, sp_lay, bsp)):
+            raw['sp'] = {
+                'nearPrice': self.spn,
+                'farPrice': self.spf,
+                'backStakeTaken': serialize_levels(sp_back),
+                'layLiabilityTaken': serialize_levels(sp_lay),
+                'actualSP': bsp,
+            }
+        return raw
+
+
+def serialize_levels(levels):
+    return [{'price': price, 'size': size} for price, size in levels or ()]
+
+
+class MarketState(object):
+    """Market definition, total matched, and runner ladders of a market."""
+
+    def __init__(self, market_id):
+        self.market_id = market_id
+        self.definition = None
+        self.tv = None
+        self.conflated = False
+        self.runners = collections.OrderedDict()
+        self.book = None
+
+    def update(self, change):
+        if change.get('img'):
+            self.definition, self.tv = None, None
+            self.runners.clear()
+        if change.get('marketDefinition') is not None:
+            self.definition = change['marketDefinition']
+        self.tv = change.get('tv', self.tv)
+        self.conflated = bool(change.get('con'))
+        for runner_change in change.get('rc') or ():
+            key = (runner_change['id'], runner_change.get('hc', 0.0))
+            runner = self.runners.get(key)
+            if runner is None:
+                runner = self.runners[key] = RunnerLadder(*key)
+            runner.update(runner_change)
+        self.book = None
+
+    def get_runner_definitions(self):
+        definitions = collections.OrderedDict()
+        runners = (self.definition or {}).get('runners') or []
+        for definition in sorted(runners, key=lambda runner: runner.get('sortPriority', 0)):
+            definitions[(definition['id'], definition.get('hc', 0.0))] = definition
+        return definitions
+
+    def serialize(self):
+        """Get the market as `listMarketBook` JSON. Runners are ordered by
+        their sort priority in the market definition, followed by runners
+        missing from the definition.
+        """
+        raw = {
+            'marketId': self.market_id,
+            'isMarketDataDelayed': False,
+            'totalMatched': self.tv,
+        }
+        definition = self.definition or {}
+        for key, book_key in DEFINITION_KEYS.items():
+            if key in definition:
+                raw[book_key] = definition[key]
+        definitions = self.get_runner_definitions()
+        if self.definition is not None:
+            raw['numberOfRunners'] = len(definitions)
+        keys = list(definitions)
+        keys.extend(key for key in self.runners if key not in definitions)
+        raw['runners'] = [
+            (self.runners.get(key) or RunnerLadder(*key)).serialize(definitions.get(key))
+            for key in keys
+        ]
+        return raw
+
+
+class MarketStream(BaseStream):
+    """Market subscription with a local cache of market definitions and
+    runner ladders, built from the images and deltas of `mcm` change
+    messages. Listeners are called with the list of changed market IDs.
+
+    :param Betfair client: Logged-in Betfair client
+    :param str representation: Representation of market books ("model",
+        "lazy", "compact" or "compact_ticks")
+    :param kwargs: Connection options of `BaseStream`
+    """
+    subscription_op = 'marketSubscription'
+    change_op = 'mcm'
+
+    def __init__(self, client, representation='model', **kwargs):
+        super(MarketStream, self).__init__(client, **kwargs)
+        utils.check_representation(representation)
+        if representation not in STREAM_REPRESENTATIONS:
+            raise ValueError('Cannot stream representation: {0}'.format(representation))
+        self.representation = representation
+        self.markets = collections.OrderedDict()
+
+    def __contains__(self, market_id):
+        return market_id in self.markets
+
+    def __len__(self):
+        return len(self.markets)
+
+    def subscribe(self, market_filter=None, fields=DEFAULT_MARKET_FIELDS, ladder_levels=None,
+                  conflate_ms=None, heartbeat_ms=None, segmentation=True):
+        """Subscribe to changes of markets, replacing any previous
+        subscription, connecting first if needed.
+
+        :param MarketFilter market_filter: Markets to subscribe to; only
+            market IDs, event type IDs, event IDs, venues, countries, market
+            types, betting types, in-play and BSP filters are supported
+        :param list fields: List of `MarketDataField` values
+        :param int ladder_levels: Depth of best offer ladders, from 1 to 10
+        :param int conflate_ms: Interval at which changes are conflated
+        :param int heartbeat_ms: Interval of heartbeats without changes
+        :param bool segmentation: Allow images to be split into segments
+        :returns: Status message
+        """
+        data_filter = {'fields': list(fields)}
+        if ladder_levels is not None:
+            data_filter['ladderLevels'] = ladder_levels
+        message = {
+            'marketFilter': get_stream_filter(market_filter),
+            'marketDataFilter': data_filter,
+            'segmentationEnabled': segmentation,
+        }
+        if conflate_ms is not None:
+            message['conflateMs'] = conflate_ms
+        if heartbeat_ms is not None:
+            message['heartbeatMs'] = heartbeat_ms
+        return self.subscribe_message(message)
+
+    def reset(self):
+        with self.lock:
+            super(MarketStream, self).reset()
+            self.markets.clear()
+
+    def apply(self, message):
+        changed = []
+        for change in message.get('mc') or ():
+            market_id = change['id']
+            market = self.markets.get(market_id)
+            if market is None:
+                market = self.markets[market_id] = MarketState(market_id)
+            market.update(change)
+            changed.append(market_id)
+        return changed
+
+    def remove(self, market_id):
+        """Remove a market from the cache, e.g. once it has closed."""
+        with self.lock:
+            self.markets.pop(market_id, None)
+
+    def get_market_book(self, market_id):
+        """Get the current book of a market. Books are built once per change
+        of their market.
+
+        :param str market_id: Market ID
+        :returns: `MarketBook` in the stream's representation
+        :raises: KeyError if the market is not cached
+        """
+        with self.lock:
+            market = self.markets[market_id]
+            if market.book is None:
+                market.book = utils.process_result(
+                    market.serialize(), models.MarketBook, self.representation,
+                )
+            return market.book
+
+    def market_books(self):
+        """Get the current books of all cached markets."""
+        with self.lock:
+            return [self.get_market_book(market_id) for market_id in self.markets]
+
+
+# Current order JSON keys and values of order change keys and values
+ORDER_SIDES = {'B': 'BACK', 'L': 'LAY'}
+ORDER_STATUSES = {'E': 'EXECUTABLE', 'EC': 'EXECUTION_COMPLETE'}
+PERSISTENCE_TYPES = {'L': 'LAPSE', 'P': 'PERSIST', 'MOC': 'MARKET_ON_CLOSE'}
+ORDER_TYPES = {'L': 'LIMIT', 'LOC': 'LIMIT_ON_CLOSE', 'MOC': 'MARKET_ON_CLOSE'}
+ORDER_SIZES = {
+    'avp': 'averagePriceMatched',
+    'sm': 'sizeMatched',
+    'sr': 'sizeRemaining',
+    'sl': 'sizeLapsed',
+    'sc': 'sizeCancelled',
+    'sv': 'sizeVoided',
+    'rac': 'regulatorAuthCode',
+    'rc': 'regulatorCode',
+}
+
+# Order events, with the order change keys of the sizes they increase
+ORDER_EVENTS = collections.OrderedDict([
+    ('fill', 'sm'),
+    ('lapse', 'sl'),
+    ('cancel', 'sc'),
+])
+
+# Order with the event that changed it, the size filled, lapsed or
+# cancelled, and its previous instance
+OrderChange = collections.namedtuple(
+    'OrderChange', ['event', 'order', 'size', 'previous'],
+)
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def format_timestamp(milliseconds):
+    """Format a stream timestamp in milliseconds as an API timestamp."""
+    if milliseconds is None:
+        return None
+    value = EPOCH + datetime.timedelta(milliseconds=milliseconds)
+    return value.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def serialize_order(market_id, selection_id, handicap, change):
+    """Get an unmatched order change as `listCurrentOrders` JSON."""
+    raw = {
+        'betId': change['id'],
+        'marketId': market_id,
+        'selectionId': selection_id,
+        'handicap': handicap,
+        'priceSize': {'price': change.get('p'), 'size': change.get('s')},
+        'bspLiability': change.get('bsp') or 0.0,
+        'side': ORDER_SIDES.get(change.get('side')),
+        'status': ORDER_STATUSES.get(change.get('status')),
+        'persistenceType': PERSISTENCE_TYPES.get(change.get('pt')),
+        'orderType': ORDER_TYPES.get(change.get('ot')),
+        'placedDate': format_timestamp(change.get('pd')),
+        'matchedDate': format_timestamp(change.get('md')),
+    }
+    for key, name in ORDER_SIZES.items():
+        raw[name] = change.get(key)
+    return raw
+
+
+class SelectionOrders(object):
+    """Orders and matched amounts of a selection, as received from the
+    stream. Orders are kept as their change JSON and instances by bet ID.
+    """
+
+    def __init__(self):
+        self.changes = collections.OrderedDict()
+        self.orders = collections.OrderedDict()
+        self.matched_backs = {}
+        self.matched_lays = {}
+
+    def clear(self):
+        self.changes.clear()
+        self.orders.clear()
+        self.matched_backs.clear()
+        self.matched_lays.clear()
+
+
+def update_matched(matched, changes):
+    for price, size in changes or ():
+        if size:
+            matched[price] = size
+        else:
+            matched.pop(price, None)
+
+
+class OrderStream(BaseStream):
+    """Order subscription with a local cache of the current orders of the
+    account by market and selection, built from `ocm` change messages.
+    Listeners are called with the list of changed market IDs, and order
+    listeners with an `OrderChange` for each fill, lapse or cancellation.
+
+    :param Betfair client: Logged-in Betfair client
+    :param str representation: Representation of orders ("model" or "lazy")
+    :param kwargs: Connection options of `BaseStream`
+    """
+    subscription_op = 'orderSubscription'
+    change_op = 'ocm'
+
+    def __init__(self, client, representation='model', **kwargs):
+        super(OrderStream, self).__init__(client, **kwargs)
+        utils.check_representation(representation)
+        if representation not in ('model', 'lazy'):
+            raise ValueError('Cannot stream representation: {0}'.format(representation))
+        self.representation = representation
+        self.order_listeners = []
+        self.events = []
+        # `SelectionOrders` by selection key by market ID, and selection
+        # keys by bet ID
+        self.markets = collections.OrderedDict()
+        self.bets = {}
+
+    def __contains__(self, bet_id):
+        return bet_id in self.bets
+
+    def __len__(self):
+        return len(self.bets)
+
+    def add_order_listener(self, listener, events=tuple(ORDER_EVENTS)):
+        """Call `listener` with an `OrderChange` for each of `events` once
+        the message containing it has been applied.
+
+        :param listener: Callable
+        :param tuple events: Events to listen to: "fill", "lapse" and
+            "cancel"
+        """
+        for event in events:
+            if event not in ORDER_EVENTS:
+                raise ValueError('Unknown order event: {0}'.format(event))
+        self.order_listeners.append((listener, frozenset(events)))
+
+    def remove_order_listener(self, listener):
+        self.order_listeners = [
+            (other, events) for other, events in self.order_listeners if other != listener
+        ]
+
+    def subscribe(self, include_overall_position=True, customer_strategy_refs=None,
+                  partition_matched_by_strategy_ref=False, conflate_ms=None,
+                  heartbeat_ms=None, segmentation=True):
+        """Subscribe to changes of the account's orders, replacing any
+        previous subscription, connecting first if needed.
+
+        :param bool include_overall_position: Include orders and matches not
+            placed under a strategy reference
+        :param list customer_strategy_refs: Only include orders placed under
+            these strategy references
+        :param bool partition_matched_by_strategy_ref: Include matches by
+            strategy reference
+        :param int conflate_ms: Interval at which changes are conflated
+        :param int heartbeat_ms: Interval of heartbeats without changes
+        :param bool segmentation: Allow images to be split into segments
+        :returns: Status message
+        """
+        order_filter = {
+            'includeOverallPosition': include_overall_position,
+            'partitionMatchedByStrategyRef': partition_matched_by_strategy_ref,
+        }
+        if customer_strategy_refs is not None:
+            order_filter['customerStrategyRefs'] = list(customer_strategy_refs)
+        message = {'orderFilter': order_filter, 'segmentationEnabled': segmentation}
+        if conflate_ms is not None:
+            message['conflateMs'] = conflate_ms
+        if heartbeat_ms is not None:
+            message['heartbeatMs'] = heartbeat_ms
+        return self.subscribe_message(message)
+
+    def reset(self):
+        with self.lock:
+            super(OrderStream, self).reset()
+            self.markets.clear()
+            self.bets.clear()
+            self.events = []
+
+    def apply(self, message):
+        changed = []
+        for change in message.get('oc') or ():
+            market_id = change['id']
+            changed.append(market_id)
+            if change.get('fullImage'):
+                self.remove(market_id)
+            selections = self.markets.setdefault(market_id, collections.OrderedDict())
+            for selection_change in change.get('orc') or ():
+                self.apply_selection(market_id, selections, selection_change)
+            if change.get('closed'):
+                self.remove(market_id)
+        return changed
+
+    def apply_selection(self, market_id, selections, change):
+        key = (change['id'], change.get('hc', 0.0))
+        selection = selections.get(key)
+        if selection is None:
+            selection = selections[key] = SelectionOrders()
+        if change.get('fullImage'):
+            for bet_id in selection.orders:
+                self.bets.pop(bet_id, None)
+            selection.clear()
+        update_matched(selection.matched_backs, change.get('mb'))
+        update_matched(selection.matched_lays, change.get('ml'))
+        for order_change in change.get('uo') or ():
+            bet_id = order_change['id']
+            previous_change = selection.changes.get(bet_id)
+            if order_change == previous_change:
+                continue
+            previous = selection.orders.get(bet_id)
+            order = utils.process_result(
+                serialize_order(market_id, key[0], key[1], order_change),
+                models.CurrentOrderSummary,
+                self.representation,
+            )
+            selection.changes[bet_id] = order_change
+            selection.orders[bet_id] = order
+            self.bets[bet_id] = (market_id, key)
+            for event, size_key in ORDER_EVENTS.items():
+                size = (order_change.get(size_key) or 0) - (
+                    (previous_change or {}).get(size_key) or 0
+                )
+                if size > 0:
+                    self.events.append(OrderChange(event, order, size, previous))
+
+    def notify(self, changed):
+        events, self.events = self.events, []
+        for change in events:
+            for listener, listened in list(self.order_listeners):
+                if change.event in listened:
+                    call_listener(listener, change)
+        super(OrderStream, self).notify(changed)
+
+    def remove(self, market_id):
+        """Remove the orders of a market from the cache."""
+        with self.lock:
+            for selection in (self.markets.pop(market_id, None) or {}).values():
+                for bet_id in selection.orders:
+                    self.bets.pop(bet_id, None)
+
+    def get_order(self, bet_id):
+        """Get the current state of an order.
+
+        :param str bet_id: Bet ID
+        :returns: `CurrentOrderSummary`
+        :raises: KeyError if the order is not cached
+        """
+        with self.lock:
+            market_id, key = self.bets[bet_id]
+            return self.markets[market_id][key].orders[bet_id]
+
+    def get_orders(self, market_id=None, selection_id=None, handicap=None):
+        """Get current orders, optionally of one market or selection.
+
+        :param str market_id: Optional market ID
+        :param int selection_id: Optional selection ID; requires `market_id`
+        :param float handicap: Optional handicap of `selection_id`
+        :returns: List of `CurrentOrderSummary`
+        """
+        with self.lock:
+            market_ids = list(self.markets) if market_id is None else [market_id]
+            orders = []
+            for each in market_ids:
+                for key, selection in (self.markets.get(each) or {}).items():
+                    if selection_id is not None and key[0] != selection_id:
+                        continue
+                    if handicap is not None and key[1] != handicap:
+                        continue
+                    orders.extend(selection.orders.values())
+            return orders
+
+    def get_matched(self, market_id, selection_id, handicap=0.0):
+        """Get the matched backs and lays of a selection.
+
+        :returns: Pair of dictionaries of matched size by price
+        """
+        with self.lock:
+            selection = self.markets[market_id][(selection_id, handicap)]
+            return dict(selection.matched_backs), dict(selection.matched_lays)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from betfair import exceptions
+
+
+logger = logging.getLogger(__name__)
+
+# Betfair sessions expire after several hours of inactivity
+DEFAULT_INTERVAL = 20 * 60
+
+# API error codes indicating that the session token is no longer valid
+SESSION_ERRORS = (
+    'INVALID_SESSION_INFORMATION',
+    'NO_SESSION',
+)
+
+
+class SessionKeeper(object):
+    """Keep a client session alive from a background thread, and log in again
+    with stored credentials once the session has expired. While a keeper is
+    running, API requests rejected with an invalid session wait for the new
+    session token and are retried once. ::
+
+        keeper = SessionKeeper(client, 'username', 'password')
+        keeper.start()
+        ...
+        keeper.stop()
+
+    :param Betfair client: Betfair client; must support certificate login
+    :param str username: Username
+    :param str password: Password
+    :param int interval: Seconds between keep-alive requests
+    """
+    def __init__(self, client, username, password, interval=DEFAULT_INTERVAL):
+        if getattr(client, 'is_async', False):
+            raise ValueError('SessionKeeper does not support asyncio clients')
+        self.client = client
+        self.username = username
+        self.password = password
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Log in if needed, register with the client, and start sending
+        keep-alive requests.
+        """
+        if not self.client.session_token:
+            self.relogin(None)
+        self.client.session_keeper = self
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='betfair-session-keeper')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop sending keep-alive requests and unregister from the client."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.client.session_keeper is self:
+            self.client.session_keeper = None
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Failed to refresh Betfair session')
+
+    def refresh(self):
+        """Reset the session timeout, logging in again if the session has
+        already expired.
+        """
+        token = self.client.session_token
+        try:
+            self.client.keep_alive()
+        except (exceptions.NotLoggedIn, exceptions.AuthError):
+            self.relogin(token)
+
+    def relogin(self, stale_token):
+        """Log in again, unless another thread has already replaced
+        `stale_token`. Concurrent callers block until the new token is set.
+
+        :param str stale_token: Session token that was rejected
+        :returns: The current session token
+        :raises: LoginError
+        """
+        with self.lock:
+            if self.client.session_token == stale_token:
+                self.client.login(self.username, self.password)
+            return self.client.session_token
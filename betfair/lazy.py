@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""Lazy representations of Betfair models. A lazy instance wraps the raw
+response JSON and converts each field when it is first accessed, caching the
+result; nested models and lists of models are lazy in turn. Conversion
+errors are raised on access, and validation is deferred until `validate` is
+called. Select with ``representation='lazy'``::
+
+    markets = client.list_market_catalogue(
+        market_filter, market_projection=list(MarketProjection),
+        representation='lazy',
+    )
+    [market.market_id for market in markets]
+"""
+
+from __future__ import absolute_import
+
+import threading
+
+from schematics.types import compound
+
+from betfair.meta.models import BetfairModel
+from betfair.meta.compiler import uses
+from betfair.meta.compiler import ModelCompiler
+
+
+# Lazy classes by the model classes they wrap
+LAZY_MODELS = {}
+lock = threading.RLock()
+
+
+def get_lazy_class(model):
+    """Get the lazy class wrapping `model`, generating it on first use.
+
+    :param model: Betfair model class
+    """
+    try:
+        return LAZY_MODELS[model]
+    except KeyError:
+        pass
+    with lock:
+        if model not in LAZY_MODELS:
+            name = getattr(model, '__qualname__', model.__name__)
+            cls = LAZY_MODELS[model] = type(str(name), (LazyModel, ), {'model': model})
+            compiler = LazyCompiler(cls, model)
+            for field_name in model._fields:
+                setattr(cls, field_name, LazyField(field_name, compiler.compile_field(field_name)))
+        return LAZY_MODELS[model]
+
+
+class LazyCompiler(ModelCompiler):
+
+    def nested(self, field):
+        if uses(field, compound.ModelType) and issubclass(field.model_class, BetfairModel):
+            return get_lazy_class(field.model_class).unserialize
+        return super(LazyCompiler, self).nested(field)
+
+
+class LazyField(object):
+    """Descriptor converting a field on first access. The converted value is
+    stored in the instance dictionary, which takes precedence on later
+    accesses.
+    """
+    def __init__(self, name, convert):
+        self.name = name
+        self.convert = convert
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.convert(instance._raw)
+        return value
+
+
+class LazyModel(object):
+    """Base class for lazy models.
+
+    :cvar model: Model class wrapped by this class
+    """
+    model = None
+
+    def __init__(self, **data):
+        self._raw = data
+
+    @classmethod
+    def unserialize(cls, data):
+        """Wrap API data without converting it.
+
+        :param dict data: Model JSON
+        """
+        instance = cls.__new__(cls)
+        instance._raw = data
+        return instance
+
+    def __repr__(self):
+        return '<Lazy {0}>'.format(type(self).__name__)
+
+    def to_model(self):
+        """Convert to an instance of the full model, including fields that
+        have been assigned or modified since unserializing.
+        """
+        model = self.model.unserialize(self._raw)
+        for name, value in vars(self).items():
+            if name in self.model._fields:
+                setattr(model, name, to_native(value))
+        return model
+
+    def validate(self):
+        self.to_model().validate()
+
+    def serialize(self):
+        return self.to_model().serialize()
+
+
+def to_native(value):
+    """Convert lazy models in `value`, which may be a list or dictionary, to
+    full models.
+    """
+    if isinstance(value, LazyModel):
+        return value.to_model()
+    if isinstance(value, list):
+        return [to_native(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_native(item) for key, item in value.items()}
+    return value
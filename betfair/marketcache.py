@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""Local cache of market books, updated incrementally from `listMarketBook`
+results. ::
+
+    cache = MarketCache()
+    cache.add_listener(lambda change: print(change.selection_id, change.runner))
+    cache.poll(client, market_ids, price_projection=PriceProjection(
+        price_data=[PriceData.EX_BEST_OFFERS],
+    ))
+    cache.poll(client, market_ids, price_projection=PriceProjection(
+        price_data=[PriceData.SP_AVAILABLE],
+    ))
+    cache[market_ids[0]]                    # <MarketBook> with both projections
+"""
+
+from __future__ import absolute_import
+
+import threading
+import collections
+
+from betfair import utils
+from betfair import models
+from betfair import constants
+
+
+# Keys of `ExchangePrices` and `StartingPrices` JSON returned for each type
+# of price data
+PRICE_DATA_KEYS = {
+    constants.PriceData.EX_BEST_OFFERS: ('ex', ('availableToBack', 'availableToLay')),
+    constants.PriceData.EX_ALL_OFFERS: ('ex', ('availableToBack', 'availableToLay')),
+    constants.PriceData.EX_TRADED: ('ex', ('tradedVolume', )),
+    constants.PriceData.SP_AVAILABLE: ('sp', ('backStakeTaken', 'layLiabilityTaken')),
+    constants.PriceData.SP_TRADED: ('sp', ('nearPrice', 'farPrice', 'actualSP')),
+}
+PRICE_KEYS = ('ex', 'sp')
+
+# Last runner JSON received with the keys it covered, merged runner JSON,
+# and runner
+RunnerState = collections.namedtuple(
+    'RunnerState', ['update', 'price_keys', 'merged', 'runner'],
+)
+
+# Runner whose state changed, with its previous instance or `None` if new
+RunnerChange = collections.namedtuple(
+    'RunnerChange', ['market_id', 'selection_id', 'handicap', 'runner', 'previous'],
+)
+
+
+def get_price_keys(price_projection=None):
+    """Get the `ex` and `sp` keys returned for a price projection, or `None`
+    if unknown.
+
+    :param PriceProjection price_projection: Optional price projection
+    """
+    if price_projection is None:
+        return None
+    keys = dict((name, set()) for name in PRICE_KEYS)
+    for value in price_projection.price_data or []:
+        name, fields = PRICE_DATA_KEYS[constants.PriceData[getattr(value, 'name', value)]]
+        keys[name].update(fields)
+    return keys
+
+
+def merge_runner(cached, update, price_keys=None):
+    """Merge runner JSON from a new result into the cached runner JSON.
+    Members of the update replace cached members. Within `ex` and `sp`, if
+    the keys covered by the request are known, covered keys missing from the
+    update are removed and other keys are kept; otherwise members of the
+    update replace cached members.
+
+    :param dict cached: Cached runner JSON
+    :param dict update: Runner JSON from the new result
+    :param dict price_keys: Optional keys covered by the request, from
+        `get_price_keys`
+    """
+    merged = dict(cached)
+    for key, value in update.items():
+        if key not in PRICE_KEYS:
+            merged[key] = value
+    for name in PRICE_KEYS:
+        prices = dict(cached.get(name) or {})
+        prices.update(update.get(name) or {})
+        if price_keys is not None:
+            for key in price_keys[name]:
+                if key not in (update.get(name) or {}):
+                    prices.pop(key, None)
+        if prices:
+            merged[name] = prices
+        else:
+            merged.pop(name, None)
+    return merged
+
+
+def is_stale(cached, update):
+    """Check whether book JSON `update` is older than the cached book JSON,
+    e.g. when responses to concurrent requests arrive out of order.
+    """
+    version, cached_version = update.get('version'), cached.get('version')
+    if version is not None and cached_version is not None and version != cached_version:
+        return version < cached_version
+    match_time, cached_match_time = update.get('lastMatchTime'), cached.get('lastMatchTime')
+    return bool(match_time and cached_match_time and match_time < cached_match_time)
+
+
+class MarketCache(object):
+    """Latest market book of each market, merged from `listMarketBook`
+    results. Results of requests with different price projections are merged
+    into one book per market, and stale results are ignored. Runners whose
+    JSON is unchanged keep their previous instances, so only changed runners
+    are deserialized; listeners are called with a `RunnerChange` for each
+    changed runner.
+
+    :param str representation: Representation of books and runners ("model",
+        "lazy" or "compact")
+    """
+    def __init__(self, representation='model'):
+        utils.check_representation(representation)
+        if representation not in ('model', 'lazy', 'compact'):
+            raise ValueError('Cannot cache representation: {0}'.format(representation))
+        self.representation = representation
+        self.lock = threading.RLock()
+        self.listeners = []
+        # Books, book JSON without runners, and `RunnerState` by runner key,
+        # by market ID
+        self.books = {}
+        self.raw_books = {}
+        self.raw_runners = {}
+
+    def __getitem__(self, market_id):
+        return self.books[market_id]
+
+    def __contains__(self, market_id):
+        return market_id in self.books
+
+    def __len__(self):
+        return len(self.books)
+
+    def get(self, market_id, default=None):
+        return self.books.get(market_id, default)
+
+    def add_listener(self, listener):
+        """Call `listener` with a `RunnerChange` for each changed runner."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def remove(self, market_id):
+        """Remove a market, e.g. once it has closed."""
+        with self.lock:
+            self.books.pop(market_id, None)
+            self.raw_books.pop(market_id, None)
+            self.raw_runners.pop(market_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.books.clear()
+            self.raw_books.clear()
+            self.raw_runners.clear()
+
+    def poll(self, client, market_ids, price_projection=None, **kwargs):
+        """Request market books with `iter_list_market_book`, in chunks within
+        the request weight limit, and update the cache. With an `AsyncBetfair`
+        client, returns a coroutine instead.
+
+        :param Betfair client: Betfair client
+        :param list market_ids: List of market IDs
+        :param PriceProjection price_projection: Optional price projection
+        :param kwargs: Other arguments of `iter_list_market_book`
+        :returns: List of `RunnerChange`
+        """
+        if client.is_async:
+            # aiohttp is an optional dependency
+            from betfair.aio import poll_market_cache
+            return poll_market_cache(self, client, market_ids, price_projection, **kwargs)
+        result = client.iter_list_market_book(
+            market_ids, price_projection=price_projection, representation='raw', **kwargs
+        )
+        return self.update(list(result), price_projection)
+
+    def update(self, result, price_projection=None):
+        """Merge `listMarketBook` JSON into the cache.
+
+        :param result: List of market book JSON objects, or a single object
+        :param PriceProjection price_projection: Optional price projection of
+            the request; when given, prices it covers but are missing from the
+            result are cleared
+        :returns: List of `RunnerChange`
+        """
+        price_keys = get_price_keys(price_projection)
+        changes = []
+        with self.lock:
+            for raw in ([result] if isinstance(result, dict) else result):
+                changes.extend(self.update_book(raw, price_keys))
+        for change in changes:
+            for listener in list(self.listeners):
+                listener(change)
+        return changes
+
+    def update_book(self, raw, price_keys):
+        market_id = raw['marketId']
+        cached = self.raw_books.get(market_id)
+        if cached is not None and is_stale(cached, raw):
+            return []
+        raw_book = dict(raw)
+        raw_book.pop('runners', None)
+        cached_runners = self.raw_runners.get(market_id, {})
+        runners, changes = collections.OrderedDict(), []
+        for raw_runner in raw.get('runners') or []:
+            key = (raw_runner.get('selectionId'), raw_runner.get('handicap'))
+            state = cached_runners.get(key)
+            if state is None:
+                previous_raw, previous = {}, None
+            else:
+                # Merging the same update with the same projection is a no-op
+                if state.update == raw_runner and state.price_keys == price_keys:
+                    runners[key] = state
+                    continue
+                previous_raw, previous = state.merged, state.runner
+            merged = merge_runner(previous_raw, raw_runner, price_keys)
+            if previous is not None and merged == previous_raw:
+                runners[key] = RunnerState(raw_runner, price_keys, previous_raw, previous)
+                continue
+            runner = utils.process_result(merged, models.Runner, self.representation)
+            runners[key] = RunnerState(raw_runner, price_keys, merged, runner)
+            changes.append(RunnerChange(market_id, key[0], key[1], runner, previous))
+        if changes or list(runners) != list(cached_runners) or raw_book != cached:
+            book = utils.process_result(raw_book, models.MarketBook, self.representation)
+            book.runners = [state.runner for state in runners.values()]
+            self.books[market_id] = book
+        self.raw_books[market_id] = raw_book
+        self.raw_runners[market_id] = runners
+        return changes
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""Generate straight-line conversion functions for Betfair models.
+
+Importing a model through Schematics walks the generic type machinery for
+every field of every nested instance. For each model class, `compile_model`
+instead emits a function that resolves input keys, type conversions and
+nested models ahead of time. The generated function builds the same instance
+as `Model(**data)`; on any input it does not handle directly, it falls back
+to `Model(**data)`, so errors are raised exactly as before.
+"""
+
+from __future__ import absolute_import
+
+import six
+from schematics import types
+from schematics.types import compound
+
+from betfair.meta.types import EnumType
+from betfair.meta.types import PriceType
+
+
+MISSING = object()
+
+
+def uses(field, base):
+    """Check whether `field` converts values exactly like `base`."""
+    return isinstance(field, base) and type(field).to_native is base.to_native
+
+
+class ModelCompiler(object):
+    """Generate the `unserialize` function of a model class. Subclasses may
+    build other classes from the fields of a model by overriding `nested`
+    and `build`.
+
+    :param cls: Class to build
+    :param model: Model class defining the fields; defaults to `cls`
+    """
+    def __init__(self, cls, model=None):
+        self.cls = cls
+        self.model = model or cls
+        self.namespace = {
+            'cls': cls,
+            'model': self.model,
+            'new': object.__new__,
+            'text_type': six.text_type,
+            'MISSING': MISSING,
+        }
+        self.depth = 0
+
+    def bind(self, prefix, value):
+        name = '{0}{1}'.format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def convert(self, field, value):
+        """Get an expression converting the non-`None` value `value`."""
+        to_native = self.bind('to_native', field.to_native)
+        if uses(field, PriceType):
+            return '{0} if type({0}) is float else {1}({0})'.format(value, to_native)
+        if uses(field, types.StringType):
+            return '{0} if type({0}) is text_type else {1}({0})'.format(value, to_native)
+        if uses(field, types.NumberType):
+            return '{0}({1})'.format(self.bind('number', field.number_class), value)
+        if uses(field, types.BooleanType):
+            return '{0} if {0} is True or {0} is False else {1}({0})'.format(value, to_native)
+        if isinstance(field, EnumType):
+            names = dict(
+                (name, member.name)
+                for name, member in six.iteritems(field.enum.__members__)
+            )
+            return '{0}[{1}]'.format(self.bind('names', names), value)
+        nested = self.nested(field)
+        if nested is not None:
+            unserialize = self.bind('unserialize', nested)
+            return '{0}({1}) if type({1}) is dict else {2}({1})'.format(
+                unserialize, value, to_native)
+        if uses(field, compound.ListType):
+            self.depth += 1
+            item = 'item{0}'.format(self.depth)
+            expression = '[{0} for {1} in {2}] if type({2}) is list else {3}({2})'.format(
+                self.convert(field.field, item), item, value, to_native)
+            self.depth -= 1
+            return expression
+        return '{0}({1})'.format(to_native, value)
+
+    def nested(self, field):
+        """Get the function converting values of a `ModelType` field, if any."""
+        if uses(field, compound.ModelType):
+            return getattr(field.model_class, 'unserialize', None)
+        return None
+
+    def build(self, values):
+        """Get statements building and returning the instance.
+
+        :param list values: Pairs of field names and variable names
+        """
+        return [
+            'instance = new(cls)',
+            'instance._initial = {}',
+            'instance._data = {' + ', '.join(
+                '{0!r}: {1}'.format(name, value) for name, value in values
+            ) + '}',
+            'return instance',
+        ]
+
+    def fallback(self):
+        """Get an expression building the instance through Schematics."""
+        return 'cls(**data)'
+
+    def lookup(self, name, field):
+        """Get statements reading the raw value of field `name`. As in
+        Schematics, the last of the trial keys present in the input wins.
+        """
+        keys = []
+        trial_keys = field.deserialize_from or []
+        if isinstance(trial_keys, six.string_types):
+            trial_keys = [trial_keys]
+        for key in list(trial_keys) + [field.serialized_name or name, name]:
+            if key and key in keys:
+                keys.remove(key)
+            if key:
+                keys.append(key)
+        keys.reverse()
+        if len(keys) == 1:
+            return ['value = data.get({0!r})'.format(keys[0])]
+        lines = ['value = data.get({0!r}, MISSING)'.format(keys[0])]
+        for key in keys[1:-1]:
+            lines.append('if value is MISSING: value = data.get({0!r}, MISSING)'.format(key))
+        lines.append('if value is MISSING: value = data.get({0!r})'.format(keys[-1]))
+        return lines
+
+    def default(self, field):
+        """Get an expression for the value of a missing field."""
+        if field._default is None:
+            return 'None'
+        # Defaults may be callable, so are converted on each call
+        return '{0}({1}.default)'.format(
+            self.bind('to_native', field.to_native), self.bind('field', field))
+
+    def define(self, name, lines, label):
+        """Compile the function `name` defined by `lines` and return it."""
+        source = '\n'.join(lines)
+        namespace = dict(self.namespace)
+        filename = '<{0} {1}>'.format(label, getattr(self.cls, '__qualname__', self.cls.__name__))
+        six.exec_(compile(source, filename, 'exec'), namespace)
+        function = namespace[name]
+        function.source = source
+        return function
+
+    def compile(self):
+        body = []
+        values = []
+        for index, (name, field) in enumerate(six.iteritems(self.model._fields)):
+            body.extend(self.lookup(name, field))
+            body.append('value{0} = ({1}) if value is not None else {2}'.format(
+                index, self.convert(field, 'value'), self.default(field)))
+            values.append((name, 'value{0}'.format(index)))
+        lines = ['def unserialize(data):', '    try:']
+        lines.extend('        ' + line for line in body or ['pass'])
+        lines.extend(['    except Exception:', '        return ' + self.fallback()])
+        lines.extend('    ' + line for line in self.build(values))
+        return self.define('unserialize', lines, 'unserialize')
+
+    def compile_field(self, name):
+        """Generate a function converting the value of field `name` alone.
+        Values that cannot be converted raise `ConversionError`.
+        """
+        field = self.model._fields[name]
+        lines = ['def convert(data):']
+        lines.extend('    ' + line for line in self.lookup(name, field))
+        lines.extend([
+            '    if value is None:',
+            '        return ' + self.default(field),
+            '    try:',
+            '        return ' + self.convert(field, 'value'),
+            '    except Exception:',
+            '        return {0}(value)'.format(self.bind('to_native', field.to_native)),
+        ])
+        return self.define('convert', lines, 'convert ' + name)
+
+
+def compile_model(cls):
+    """Generate a function converting API data to an instance of `cls`.
+
+    :param cls: Betfair model class
+    """
+    return ModelCompiler(cls).compile()
@@ -1,9 +1,22 @@
 # -*- coding: utf-8 -*-
 
+import re
+import datetime
+
+import six
 from schematics import types
 from schematics.exceptions import ConversionError
 from schematics.exceptions import ValidationError
 
+from betfair.price import Tick
+
+
+# Timestamps matching one of `DateTimeType.DEFAULT_FORMATS`
+DATETIME_PATTERN = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})'
+    r'(?:\.([0-9]{1,6})Z?)?\Z'
+)
+
 
 class DateTimeType(types.DateTimeType):
 
@@ -13,6 +26,33 @@ class DateTimeType(types.DateTimeType):
         '%Y-%m-%dT%H:%M:%S',
     )
 
+    def to_native(self, value, context=None):
+        # Parse Betfair timestamps without trying each format with `strptime`
+        if self.formats == self.DEFAULT_FORMATS and isinstance(value, six.string_types):
+            match = DATETIME_PATTERN.match(value)
+            if match:
+                parts = match.groups()
+                try:
+                    return datetime.datetime(
+                        *[int(part) for part in parts[:6]],
+                        microsecond=int((parts[6] or '').ljust(6, '0'))
+                    )
+                except ValueError:
+                    pass
+        return super(DateTimeType, self).to_native(value, context=context)
+
+
+class PriceType(types.FloatType):
+    """Float type for prices on the Betfair price ladder. Prices may also be
+    given as `Tick` instances, which are converted to their prices so that
+    comparisons and arithmetic on model prices are in price space.
+    """
+
+    def to_native(self, value, context=None):
+        if isinstance(value, Tick):
+            return value.price
+        return super(PriceType, self).to_native(value, context=context)
+
 
 class EnumType(types.BaseType):
 
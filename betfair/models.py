@@ -12,6 +12,7 @@ from schematics.types.compound import ListType
 from schematics.types.compound import ModelType
 
 from betfair.meta.types import EnumType
+from betfair.meta.types import PriceType
 from betfair.meta.types import DateTimeType
 from betfair.meta.models import BetfairModel
 
@@ -100,7 +101,7 @@ class MarketFilter(BetfairModel):
 
 
 class PriceSize(BetfairModel):
-    price = FloatType(required=True)
+    price = PriceType(required=True)
     size = FloatType(required=True)
 
 
@@ -124,7 +125,7 @@ class Order(BetfairModel):
     status = EnumType(constants.OrderStatus, required=True)
     persistence_type = EnumType(constants.PersistenceType, required=True)
     side = EnumType(constants.Side, required=True)
-    price = FloatType(required=True)
+    price = PriceType(required=True)
     size = FloatType(required=True)
     bsp_liability = BooleanType(required=True)
     placed_date = DateTimeType(required=True)
@@ -140,7 +141,7 @@ class Match(BetfairModel):
     bet_id = StringType()
     match_id = StringType()
     side = EnumType(constants.Side, required=True)
-    price = FloatType(required=True)
+    price = PriceType(required=True)
     size = FloatType(required=True)
     match_date = DateTimeType()
 
@@ -150,7 +151,7 @@ class Runner(BetfairModel):
     handicap = FloatType(required=True)
     status = EnumType(constants.RunnerStatus, required=True)
     adjustment_factor = FloatType()
-    last_price_traded = FloatType()
+    last_price_traded = PriceType()
     total_matched = FloatType()
     removal_date = DateTimeType()
     sp = ModelType(StartingPrices)
@@ -208,13 +209,13 @@ class PriceProjection(BetfairModel):
 
 class LimitOrder(BetfairModel):
     size = FloatType(required=True)
-    price = FloatType(required=True)
+    price = PriceType(required=True)
     persistence_type = EnumType(constants.PersistenceType, required=True)
 
 
 class LimitOnCloseOrder(BetfairModel):
     liability = FloatType(required=True)
-    price = FloatType(required=True)
+    price = PriceType(required=True)
 
 
 class MarketOnCloseOrder(BetfairModel):
@@ -282,7 +283,7 @@ class CancelInstruction(BetfairModel):
 
 class ReplaceInstruction(BetfairModel):
     bet_id = StringType(required=True)
-    new_price = FloatType(required=True)
+    new_price = PriceType(required=True)
 
 
 class UpdateInstruction(BetfairModel):
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+
+"""Local store of the account's orders, kept up to date from the execution
+reports of order requests made through an `OrderManager`, and reconciled
+with cheap `listCurrentOrders` requests for known bets only::
+
+    manager = OrderManager(client)
+    manager.place_orders(market_id, [instruction])
+    manager.get_open_orders(market_id)          # [<ManagedOrder>]
+    manager.get_exposure(market_id, selection_id).worst_case
+    manager.start(interval=30)                  # reconcile in the background
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+import collections
+
+from betfair import utils
+from betfair import models
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 30
+
+# Bet IDs per `listCurrentOrders` request when reconciling
+MAX_BET_IDS = 250
+
+EXECUTABLE = 'EXECUTABLE'
+EXECUTION_COMPLETE = 'EXECUTION_COMPLETE'
+
+
+class Exposure(collections.namedtuple(
+        'Exposure', ['if_win', 'if_lose', 'unmatched_back', 'unmatched_lay_liability'])):
+    """Profit of matched bets on a selection if it wins and if it loses, and
+    the stake of unmatched backs and liability of unmatched lays.
+    """
+    __slots__ = ()
+
+    @property
+    def worst_case(self):
+        """Profit if the selection has its worst outcome and all unmatched
+        bets against that outcome are matched.
+        """
+        return min(
+            self.if_win - self.unmatched_lay_liability,
+            self.if_lose - self.unmatched_back,
+        )
+
+
+NO_EXPOSURE = Exposure(0.0, 0.0, 0.0, 0.0)
+
+
+class ManagedOrder(object):
+    """Current state of an order in the store."""
+    __slots__ = (
+        'bet_id', 'market_id', 'selection_id', 'handicap', 'side', 'order_type',
+        'persistence_type', 'price', 'size', 'bsp_liability', 'status', 'placed_date',
+        'average_price_matched', 'size_matched', 'size_remaining', 'size_lapsed',
+        'size_cancelled', 'size_voided', 'customer_ref',
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def __repr__(self):
+        return '<ManagedOrder {0} {1} {2}@{3} {4}>'.format(
+            self.bet_id, self.side, self.size, self.price, self.status)
+
+    @property
+    def key(self):
+        return self.market_id, self.selection_id, self.handicap
+
+    @property
+    def is_open(self):
+        return self.status == EXECUTABLE
+
+    def get_exposure(self):
+        """Get the contribution of the order to the exposure of its
+        selection.
+        """
+        matched = self.size_matched or 0.0
+        profit = matched * ((self.average_price_matched or 1.0) - 1)
+        remaining = (self.size_remaining or 0.0) if self.is_open else 0.0
+        # Starting price orders are exposed by their liability until matched
+        liability = (self.bsp_liability or 0.0) if self.is_open and not matched else 0.0
+        if self.side == 'BACK':
+            return Exposure(profit, -matched, remaining + liability, 0.0)
+        return Exposure(-profit, matched, 0.0, remaining * ((self.price or 1.0) - 1) + liability)
+
+
+def add_exposures(exposure, other, sign=1):
+    return Exposure(*[value + sign * other_value for value, other_value in zip(exposure, other)])
+
+
+class OrderManager(object):
+    """Store of orders by bet ID, market and selection. Orders are added and
+    updated from the instruction reports of the order methods, which call
+    through to the client, or of reports passed to `apply`. Open orders and
+    selection exposures are kept up to date incrementally, so they are read
+    without API calls or scanning the store.
+
+    :param Betfair client: Betfair client
+    """
+    def __init__(self, client):
+        self.client = client
+        self.lock = threading.RLock()
+        self.orders = {}
+        # Orders and open orders by bet ID by selection key, and selection
+        # keys by market ID
+        self.selections = {}
+        self.open_orders = {}
+        self.markets = collections.defaultdict(collections.OrderedDict)
+        self.exposures = {}
+        # Bet IDs whose state is unknown until the next reconciliation
+        self.stale = set()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def __contains__(self, bet_id):
+        return bet_id in self.orders
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def place_orders(self, market_id, instructions, customer_ref=None):
+        """Place orders and add them to the store; arguments are those of
+        `Betfair.place_orders`.
+        """
+        report = self.client.place_orders(market_id, instructions, customer_ref=customer_ref)
+        self.apply(report)
+        return report
+
+    def cancel_orders(self, market_id=None, instructions=None, customer_ref=None):
+        """Cancel orders and update the store; arguments are those of
+        `Betfair.cancel_orders`.
+        """
+        report = self.client.cancel_orders(market_id, instructions, customer_ref=customer_ref)
+        self.apply(report)
+        if not instructions:
+            # Cancelling all orders reports no instructions, so the cancelled
+            # orders are only known after reconciling
+            with self.lock:
+                self.stale.update(order.bet_id for order in self.get_open_orders(market_id))
+        return report
+
+    def replace_orders(self, market_id, instructions, customer_ref=None):
+        """Replace orders and update the store; arguments are those of
+        `Betfair.replace_orders`.
+        """
+        report = self.client.replace_orders(market_id, instructions, customer_ref=customer_ref)
+        self.apply(report)
+        return report
+
+    def update_orders(self, market_id, instructions, customer_ref=None):
+        """Update orders and the store; arguments are those of
+        `Betfair.update_orders`.
+        """
+        report = self.client.update_orders(market_id, instructions, customer_ref=customer_ref)
+        self.apply(report)
+        return report
+
+    def apply(self, report):
+        """Apply the instruction reports of an execution report to the store.
+        Failed instructions leave the store unchanged.
+
+        :param report: `PlaceExecutionReport`, `CancelExecutionReport`,
+            `ReplaceExecutionReport` or `UpdateExecutionReport`
+        """
+        appliers = {
+            models.PlaceExecutionReport: self.apply_place,
+            models.CancelExecutionReport: self.apply_cancel,
+            models.ReplaceExecutionReport: self.apply_replace,
+            models.UpdateExecutionReport: self.apply_update,
+        }
+        for cls, applier in appliers.items():
+            if isinstance(report, cls):
+                break
+        else:
+            raise TypeError('Cannot apply {0!r}'.format(report))
+        with self.lock:
+            for instruction_report in report.instruction_reports or ():
+                applier(report.market_id, instruction_report, report.customer_ref)
+
+    def apply_place(self, market_id, report, customer_ref=None):
+        if report is None or report.status != 'SUCCESS' or report.bet_id is None:
+            return
+        instruction = report.instruction
+        limit_order = instruction.limit_order
+        size = limit_order.size if limit_order is not None else None
+        matched = report.size_matched or 0.0
+        bsp_order = instruction.limit_on_close_order or instruction.market_on_close_order
+        order = ManagedOrder(
+            bet_id=report.bet_id,
+            market_id=market_id,
+            selection_id=instruction.selection_id,
+            handicap=instruction.handicap or 0.0,
+            side=instruction.side,
+            order_type=instruction.order_type,
+            persistence_type=(
+                limit_order.persistence_type if limit_order is not None else 'MARKET_ON_CLOSE'
+            ),
+            price=(
+                limit_order.price if limit_order is not None
+                else getattr(instruction.limit_on_close_order, 'price', None)
+            ),
+            size=size,
+            bsp_liability=bsp_order.liability if bsp_order is not None else 0.0,
+            placed_date=report.placed_date,
+            average_price_matched=report.average_price_matched,
+            size_matched=matched,
+            size_remaining=max(size - matched, 0.0) if size is not None else 0.0,
+            size_lapsed=0.0,
+            size_cancelled=0.0,
+            size_voided=0.0,
+            customer_ref=customer_ref,
+        )
+        if size is not None and order.size_remaining == 0:
+            order.status = EXECUTION_COMPLETE
+        else:
+            order.status = EXECUTABLE
+        self.store(order)
+
+    def apply_cancel(self, market_id, report, customer_ref=None):
+        if report is None or report.instruction is None:
+            return
+        order = self.orders.get(report.instruction.bet_id)
+        if order is None:
+            return
+        if report.status != 'SUCCESS':
+            # e.g. the order was matched or lapsed before it was cancelled
+            self.stale.add(order.bet_id)
+            return
+        self.update(order, lambda order: self.cancel(order, report.size_cancelled or 0.0))
+
+    @staticmethod
+    def cancel(order, size_cancelled):
+        order.size_cancelled = (order.size_cancelled or 0.0) + size_cancelled
+        order.size_remaining = max((order.size_remaining or 0.0) - size_cancelled, 0.0)
+        if order.size_remaining == 0:
+            order.status = EXECUTION_COMPLETE
+
+    def apply_replace(self, market_id, report, customer_ref=None):
+        self.apply_cancel(market_id, report.cancel_instruction_report, customer_ref)
+        self.apply_place(market_id, report.place_instruction_report, customer_ref)
+
+    def apply_update(self, market_id, report, customer_ref=None):
+        order = self.orders.get(report.instruction.bet_id)
+        if order is None or report.status != 'SUCCESS':
+            return
+        order.persistence_type = report.instruction.new_persistence_type
+
+    def apply_current_order(self, summary):
+        """Replace the state of an order with a `CurrentOrderSummary`, e.g.
+        from `list_current_orders` or an `OrderStream`.
+        """
+        with self.lock:
+            values = dict(
+                bet_id=summary.bet_id,
+                market_id=summary.market_id,
+                selection_id=summary.selection_id,
+                handicap=summary.handicap,
+                side=summary.side,
+                order_type=summary.order_type,
+                persistence_type=summary.persistence_type,
+                price=summary.price_size.price,
+                size=summary.price_size.size,
+                bsp_liability=summary.bsp_liability,
+                status=summary.status,
+                placed_date=summary.placed_date,
+                average_price_matched=summary.average_price_matched,
+                size_matched=summary.size_matched,
+                size_remaining=summary.size_remaining,
+                size_lapsed=summary.size_lapsed,
+                size_cancelled=summary.size_cancelled,
+                size_voided=summary.size_voided,
+            )
+            previous = self.orders.get(summary.bet_id)
+            if previous is not None:
+                values['customer_ref'] = previous.customer_ref
+            self.store(ManagedOrder(**values))
+            self.stale.discard(summary.bet_id)
+
+    def store(self, order):
+        previous = self.orders.get(order.bet_id)
+        if previous is not None:
+            self.unindex(previous)
+        self.orders[order.bet_id] = order
+        self.index(order)
+
+    def update(self, order, func):
+        self.unindex(order)
+        func(order)
+        self.index(order)
+
+    def index(self, order):
+        key = order.key
+        self.selections.setdefault(key, collections.OrderedDict())[order.bet_id] = order
+        self.markets[order.market_id][key] = True
+        if order.is_open:
+            self.open_orders.setdefault(key, collections.OrderedDict())[order.bet_id] = order
+        self.exposures[key] = add_exposures(
+            self.exposures.get(key, NO_EXPOSURE), order.get_exposure())
+
+    def unindex(self, order):
+        key = order.key
+        self.selections[key].pop(order.bet_id, None)
+        self.open_orders.get(key, {}).pop(order.bet_id, None)
+        self.exposures[key] = add_exposures(self.exposures[key], order.get_exposure(), -1)
+
+    def remove(self, market_id):
+        """Remove the orders of a market, e.g. once it has been settled."""
+        with self.lock:
+            for key in self.markets.pop(market_id, {}):
+                for bet_id in self.selections.pop(key, {}):
+                    self.orders.pop(bet_id, None)
+                    self.stale.discard(bet_id)
+                self.open_orders.pop(key, None)
+                self.exposures.pop(key, None)
+
+    def get_order(self, bet_id):
+        """Get an order by bet ID.
+
+        :raises: KeyError if the order is not in the store
+        """
+        return self.orders[bet_id]
+
+    def get_orders(self, market_id, selection_id=None, handicap=0.0):
+        """Get the orders of a market or selection, in the order they were
+        added.
+        """
+        with self.lock:
+            return self.collect(self.selections, market_id, selection_id, handicap)
+
+    def get_open_orders(self, market_id=None, selection_id=None, handicap=0.0):
+        """Get the executable orders of all markets, a market or a
+        selection.
+        """
+        with self.lock:
+            if market_id is None:
+                return [order for orders in self.open_orders.values() for order in orders.values()]
+            return self.collect(self.open_orders, market_id, selection_id, handicap)
+
+    def collect(self, index, market_id, selection_id, handicap):
+        if selection_id is not None:
+            keys = [(market_id, selection_id, handicap)]
+        else:
+            keys = list(self.markets.get(market_id, ()))
+        return [order for key in keys for order in index.get(key, {}).values()]
+
+    def get_exposure(self, market_id, selection_id, handicap=0.0):
+        """Get the `Exposure` of a selection.
+
+        :param str market_id: Market ID
+        :param int selection_id: Selection ID
+        :param float handicap: Handicap
+        """
+        return self.exposures.get((market_id, selection_id, handicap), NO_EXPOSURE)
+
+    def get_market_exposure(self, market_id):
+        """Get the worst profit over the outcomes of a market with a single
+        winner, including unmatched bets against each outcome.
+        """
+        with self.lock:
+            exposures = [self.exposures[key] for key in self.markets.get(market_id, ())]
+        if_lose = sum(exposure.if_lose for exposure in exposures)
+        unmatched_back = sum(exposure.unmatched_back for exposure in exposures)
+        # Each selection winning, with lays on it and backs on the others
+        # matched
+        outcomes = [
+            sum([
+                exposure.if_win - exposure.unmatched_lay_liability,
+                if_lose - exposure.if_lose,
+                exposure.unmatched_back - unmatched_back,
+            ])
+            for exposure in exposures
+        ]
+        # No selection with orders wins
+        outcomes.append(if_lose - unmatched_back)
+        return min(outcomes)
+
+    def reconcile(self, bet_ids=None):
+        """Replace the state of orders with their current state from
+        `list_current_orders`, filtered by bet ID. Orders missing from the
+        results are no longer current, and are marked complete.
+
+        :param list bet_ids: Bet IDs to reconcile; defaults to open orders
+            and orders whose state is unknown
+        :returns: Number of orders reconciled
+        """
+        with self.lock:
+            if bet_ids is None:
+                bet_ids = set(self.stale)
+                bet_ids.update(order.bet_id for order in self.get_open_orders())
+            bet_ids = sorted(bet_ids)
+        for chunk in utils.get_chunks(bet_ids, MAX_BET_IDS):
+            report = self.client.list_current_orders(bet_ids=chunk)
+            found = set()
+            for summary in report.current_orders:
+                self.apply_current_order(summary)
+                found.add(summary.bet_id)
+            with self.lock:
+                for bet_id in chunk:
+                    order = self.orders.get(bet_id)
+                    if bet_id not in found and order is not None and order.is_open:
+                        self.update(order, self.complete)
+                    self.stale.discard(bet_id)
+        return len(bet_ids)
+
+    @staticmethod
+    def complete(order):
+        order.status = EXECUTION_COMPLETE
+        order.size_remaining = 0.0
+
+    def start(self, interval=DEFAULT_INTERVAL):
+        """Reconcile open orders every `interval` seconds from a background
+        thread.
+        """
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.run, args=(interval, ), name='betfair-order-manager',
+        )
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self, interval):
+        while not self.stopped.wait(interval):
+            try:
+                self.reconcile()
+            except Exception:
+                logger.exception('Failed to reconcile orders')
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""Micro-batching of order instructions. Instructions submitted to an
+`OrderQueue` from any number of threads are gathered per market and method
+for a short window, then sent in one request; each caller gets a future
+resolved with the report of its own instruction::
+
+    queue = OrderQueue(client, window=0.005)
+    future = queue.place(market_id, instruction)
+    future.result()                         # <PlaceInstructionReport>
+    queue.close()
+"""
+
+from __future__ import absolute_import
+
+import time
+import threading
+import collections
+from concurrent import futures
+
+from betfair import utils
+from betfair import exceptions
+
+
+DEFAULT_WINDOW = 0.005
+
+# Instructions waiting to be sent for a market and method, with their
+# futures and the time by which they are sent
+Pending = collections.namedtuple('Pending', ['instructions', 'futures', 'deadline'])
+
+
+class OrderQueue(object):
+    """Gather order instructions per market and method, and send them in a
+    single request once `window` seconds have passed since the first of them
+    was submitted, or as soon as `max_instructions` are waiting.
+
+    Betfair processes the instructions of a request together: a request
+    rejected as a whole, e.g. because the market is suspended, fails the
+    instructions of every caller in the batch. Each future then holds the
+    failed report of its instruction, or `ExecutionError` if the response
+    has no report for it, or the exception raised by the request.
+
+    :param client: Betfair client, or another object with the same order
+        methods, such as an `OrderManager`
+    :param float window: Seconds to wait for more instructions
+    :param int max_instructions: Number of instructions that triggers a
+        request; defaults to the Betfair limit of each method
+    :param int max_workers: Number of threads sending requests
+    :param Executor executor: Optional executor sending requests; takes
+        precedence over `max_workers`
+    """
+    def __init__(self, client, window=DEFAULT_WINDOW, max_instructions=None, max_workers=4,
+                 executor=None):
+        self.client = client
+        self.window = window
+        self.max_instructions = max_instructions
+        self.owned = executor is None
+        self.executor = executor or futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Condition()
+        self.pending = collections.OrderedDict()
+        self.closed = False
+        self.thread = None
+        self.requests = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def place(self, market_id, instruction):
+        """Queue a `PlaceInstruction`.
+
+        :returns: Future resolved with a `PlaceInstructionReport`
+        """
+        return self.submit('place_orders', market_id, instruction)
+
+    def cancel(self, market_id, instruction):
+        """Queue a `CancelInstruction`.
+
+        :returns: Future resolved with a `CancelInstructionReport`
+        """
+        return self.submit('cancel_orders', market_id, instruction)
+
+    def replace(self, market_id, instruction):
+        """Queue a `ReplaceInstruction`.
+
+        :returns: Future resolved with a `ReplaceInstructionReport`
+        """
+        return self.submit('replace_orders', market_id, instruction)
+
+    def update(self, market_id, instruction):
+        """Queue an `UpdateInstruction`.
+
+        :returns: Future resolved with an `UpdateInstructionReport`
+        """
+        return self.submit('update_orders', market_id, instruction)
+
+    def get_max_instructions(self, method):
+        limit = utils.MAX_INSTRUCTIONS[method]
+        return min(self.max_instructions, limit) if self.max_instructions else limit
+
+    def submit(self, method, market_id, instruction):
+        """Queue an instruction for order method `method`.
+
+        :returns: Future resolved with the instruction report
+        """
+        future = futures.Future()
+        key = (method, market_id)
+        with self.lock:
+            if self.closed:
+                raise RuntimeError('Cannot submit instructions to a closed queue')
+            pending = self.pending.get(key)
+            if pending is None:
+                pending = self.pending[key] = Pending([], [], time.time() + self.window)
+                self.lock.notify()
+            pending.instructions.append(instruction)
+            pending.futures.append(future)
+            if len(pending.instructions) >= self.get_max_instructions(method):
+                self.send(key, self.pending.pop(key))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='betfair-order-queue')
+                self.thread.daemon = True
+                self.thread.start()
+        return future
+
+    def flush(self):
+        """Send all waiting instructions now."""
+        with self.lock:
+            while self.pending:
+                self.send(*self.pending.popitem(last=False))
+
+    def close(self):
+        """Send waiting instructions and stop accepting new ones. Futures of
+        sent instructions are still resolved.
+        """
+        with self.lock:
+            self.closed = True
+            self.flush()
+            self.lock.notify()
+        if self.thread is not None:
+            self.thread.join()
+        if self.owned:
+            self.executor.shutdown(wait=True)
+
+    def run(self):
+        with self.lock:
+            while not self.closed:
+                now = time.time()
+                for key, pending in list(self.pending.items()):
+                    if pending.deadline <= now:
+                        self.send(key, self.pending.pop(key))
+                deadlines = [pending.deadline for pending in self.pending.values()]
+                self.lock.wait(min(deadlines) - now if deadlines else None)
+
+    def send(self, key, pending):
+        self.requests += 1
+        self.executor.submit(self.execute, key, pending)
+
+    def execute(self, key, pending):
+        method, market_id = key
+        try:
+            report = getattr(self.client, method)(market_id, pending.instructions)
+        except Exception as error:
+            for future in pending.futures:
+                future.set_exception(error)
+            return
+        instruction_reports = report.instruction_reports or []
+        for index, future in enumerate(pending.futures):
+            if index < len(instruction_reports):
+                future.set_result(instruction_reports[index])
+            else:
+                future.set_exception(exceptions.ExecutionError(report))
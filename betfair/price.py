@@ -2,6 +2,7 @@
 
 from __future__ import division
 
+import bisect
 from decimal import Decimal, ROUND_HALF_UP
 
 
@@ -45,6 +46,125 @@ def make_prices(min_price, cutoffs):
 
 PRICES = make_prices(MIN_PRICE, CUTOFFS)
 
+# Ladder prices as floats and as integer hundredths, with hash indexes
+FLOAT_PRICES = [float(price) for price in PRICES]
+TICKS = [int(price * 100) for price in PRICES]
+PRICE_INDEX = {price: index for index, price in enumerate(FLOAT_PRICES)}
+TICK_INDEX = {tick: index for index, tick in enumerate(TICKS)}
+
+# Tick sizes in hundredths below each cutoff
+TICK_SIZES = tuple(
+    (cutoff, int(as_dec(100) / as_dec(step)), step)
+    for cutoff, step in CUTOFFS
+)
+
+
+def price_to_tick(price):
+    """Returns the index of a Betfair price on the price ladder.
+
+    :param float price: An exact, valid Betfair price, or a `Tick`
+    :returns: The index of the price in `PRICES`
+    :rtype: int
+    :raises: ValueError if price is not a valid Betfair price
+    """
+    if isinstance(price, Tick):
+        return int(price)
+    try:
+        return PRICE_INDEX[price]
+    except (KeyError, TypeError):
+        pass
+    hundredths = as_dec(price) * 100
+    if hundredths == hundredths.to_integral_value():
+        index = TICK_INDEX.get(int(hundredths))
+        if index is not None:
+            return index
+    raise ValueError('{0!r} is not a valid Betfair price'.format(price))
+
+
+def tick_to_price(tick):
+    """Returns the Betfair price at an index of the price ladder.
+
+    :param int tick: Index of the price in `PRICES`
+    :rtype: float
+    :raises: IndexError if there is no such price
+    """
+    if not 0 <= tick < len(FLOAT_PRICES):
+        raise IndexError('Tick {0} is outside the price ladder'.format(tick))
+    return FLOAT_PRICES[tick]
+
+
+class Tick(int):
+    """Betfair price encoded as its index on the price ladder. Ticks are
+    integers, so differences between ticks are numbers of ticks; they are
+    converted back to prices when serialized to JSON. Use `Tick.from_price`
+    to get the shared instance for a price.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_price(cls, price):
+        """Returns the tick of a Betfair price.
+
+        :param float price: An exact, valid Betfair price
+        :raises: ValueError if price is not a valid Betfair price
+        """
+        return LADDER_TICKS[price_to_tick(price)]
+
+    @property
+    def price(self):
+        return FLOAT_PRICES[self]
+
+    def __repr__(self):
+        return 'Tick({0!r})'.format(self.price)
+
+
+# Shared tick instances by ladder index and by price
+LADDER_TICKS = [Tick(index) for index in range(len(PRICES))]
+TICKS_BY_PRICE = dict(zip(FLOAT_PRICES, LADDER_TICKS))
+
+
+def to_tick(price):
+    """Returns the tick of price if it is a Betfair price, else price as a
+    float.
+
+    :param float price: Any price
+    """
+    if isinstance(price, Tick):
+        return price
+    tick = TICKS_BY_PRICE.get(price)
+    return tick if tick is not None else float(price)
+
+
+def from_tick(value):
+    """Returns the price of a tick, or value itself if it is not a tick."""
+    return value.price if isinstance(value, Tick) else value
+
+
+def round_price_up(price):
+    """Returns the lowest Betfair price greater than or equal to price.
+
+    :param float price: Any price up to `MAX_PRICE`
+    :rtype: float
+    :raises: ValueError if price is greater than `MAX_PRICE`
+    """
+    index = bisect.bisect_left(FLOAT_PRICES, price)
+    if index == len(FLOAT_PRICES):
+        raise ValueError('No Betfair price is greater than or equal to {0!r}'.format(price))
+    return FLOAT_PRICES[index]
+
+
+def round_price_down(price):
+    """Returns the highest Betfair price less than or equal to price.
+
+    :param float price: Any price from `MIN_PRICE`
+    :rtype: float
+    :raises: ValueError if price is less than `MIN_PRICE`
+    """
+    index = bisect.bisect_right(FLOAT_PRICES, price)
+    if index == 0:
+        raise ValueError('No Betfair price is less than or equal to {0!r}'.format(price))
+    return FLOAT_PRICES[index - 1]
+
 
 def nearest_price(price, cutoffs=CUTOFFS):
     """Returns the nearest Betfair odds value to price.
@@ -62,6 +182,17 @@ def nearest_price(price, cutoffs=CUTOFFS):
     if price > MAX_PRICE:
         return MAX_PRICE
 
+    if cutoffs is CUTOFFS and type(price) in (float, int):
+        for cutoff, size, step in TICK_SIZES:
+            if price < cutoff:
+                break
+        scaled = price * step + 0.5
+        ticks = int(scaled)
+        # Ties are rounded half up on the decimal value of price, which float
+        # arithmetic cannot tell apart from nearby values
+        if 1e-6 < scaled - ticks < 1 - 1e-6:
+            return ticks * size / 100
+
     price = as_dec(price)
     for cutoff, step in cutoffs:
         if price < cutoff:
@@ -79,9 +210,7 @@ def ticks_difference(price_1, price_2):
     :returns: The absolute value of the difference between the prices in "ticks"
     :rtype: int
     """
-    price_1_index = PRICES.index(as_dec(price_1))
-    price_2_index = PRICES.index(as_dec(price_2))
-    return abs(price_1_index - price_2_index)
+    return abs(price_to_tick(price_1) - price_to_tick(price_2))
 
 
 def price_ticks_away(price, n_ticks):
@@ -95,5 +224,4 @@ def price_ticks_away(price, n_ticks):
     :returns: An exact, valid Betfair price
     :rtype: float
     """
-    price_index = PRICES.index(as_dec(price))
-    return float(PRICES[price_index + n_ticks])
+    return tick_to_price(price_to_tick(price) + n_ticks)
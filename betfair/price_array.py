@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""Vectorized versions of the functions in `betfair.price`, taking and
+returning NumPy arrays. Results match the scalar functions element by
+element. Requires NumPy (``pip install betfair.py[numpy]``)::
+
+    prices = nearest_price(model_prices)
+    ticks = ticks_difference(prices, best_back_prices)
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import numpy as np
+
+from betfair import price
+from betfair.price import CUTOFFS, MIN_PRICE, MAX_PRICE
+
+
+# Ladder prices in ascending order
+LADDER = np.array(price.FLOAT_PRICES, dtype=np.float64)
+
+# Tick encoding: ladder indexes as small integers, with a sentinel for
+# missing prices; indexing `TICK_PRICES` with ticks maps the sentinel to NaN
+TICK_DTYPE = np.int16
+NO_TICK = -1
+TICK_PRICES = np.append(LADDER, np.nan)
+
+# Prices this close to a tie are rounded by `price.nearest_price`
+TIE_TOLERANCE = 1e-6
+
+
+def get_tick_sizes(cutoffs):
+    """Get arrays of the cutoffs, steps and tick sizes in hundredths of
+    `cutoffs`, and whether each tick size is a whole number of hundredths.
+    """
+    bounds = np.array([cutoff for cutoff, _ in cutoffs], dtype=np.float64)
+    steps = np.array([step for _, step in cutoffs], dtype=np.float64)
+    sizes = [price.as_dec(100) / price.as_dec(step) for _, step in cutoffs]
+    whole = np.array([size == size.to_integral_value() for size in sizes], dtype=bool)
+    return bounds, steps, np.array([float(size) for size in sizes]), whole
+
+
+TICK_SIZES = get_tick_sizes(CUTOFFS)
+
+
+def clamp_price(prices):
+    """Returns prices limited to the range from `MIN_PRICE` to `MAX_PRICE`.
+
+    :param prices: Array of prices
+    :rtype: numpy.ndarray
+    """
+    return np.clip(np.asarray(prices, dtype=np.float64), MIN_PRICE, MAX_PRICE)
+
+
+def nearest_price(prices, cutoffs=CUTOFFS):
+    """Returns the nearest Betfair price to each of prices; see
+    `price.nearest_price` for rounding rules. NaN values are kept.
+
+    :param prices: Array of approximate prices
+    :param tuple cutoffs: Optional tuple of (cutoff, step) pairs
+    :rtype: numpy.ndarray
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    bounds, steps, sizes, whole = TICK_SIZES if cutoffs is CUTOFFS else get_tick_sizes(cutoffs)
+    # As in the scalar function, prices above the last cutoff use its step
+    index = np.minimum(np.searchsorted(bounds, prices, side='right'), len(bounds) - 1)
+    scaled = prices * steps[index] + 0.5
+    ticks = np.floor(scaled)
+    fraction = scaled - ticks
+    with np.errstate(invalid='ignore'):
+        result = ticks * sizes[index] / 100
+        exact = (fraction > TIE_TOLERANCE) & (fraction < 1 - TIE_TOLERANCE) & whole[index]
+        inside = (prices > MIN_PRICE) & (prices <= MAX_PRICE)
+    result = np.where(prices <= MIN_PRICE, MIN_PRICE, result)
+    result = np.where(prices > MAX_PRICE, MAX_PRICE, result)
+    for position in np.flatnonzero(inside & ~exact):
+        result.flat[position] = price.nearest_price(float(prices.flat[position]), cutoffs)
+    return result
+
+
+def price_to_tick(prices):
+    """Returns the index of each of prices on the price ladder.
+
+    :param prices: Array of exact, valid Betfair prices
+    :rtype: numpy.ndarray
+    :raises: ValueError if any price is not a valid Betfair price
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    ticks = np.minimum(np.searchsorted(LADDER, prices), len(LADDER) - 1)
+    invalid = LADDER[ticks] != prices
+    if invalid.any():
+        raise ValueError('{0!r} is not a valid Betfair price'.format(prices[invalid][0]))
+    return ticks
+
+
+def tick_to_price(ticks):
+    """Returns the Betfair price at each of ticks.
+
+    :param ticks: Array of indexes of the price ladder
+    :rtype: numpy.ndarray
+    :raises: IndexError if any tick is outside the price ladder
+    """
+    ticks = np.asarray(ticks)
+    outside = (ticks < 0) | (ticks >= len(LADDER))
+    if outside.any():
+        raise IndexError('Tick {0} is outside the price ladder'.format(ticks[outside][0]))
+    return LADDER[ticks]
+
+
+def encode_ticks(prices):
+    """Returns the ticks of prices as `TICK_DTYPE` integers, with `NO_TICK`
+    for NaN values.
+
+    :param prices: Array of exact, valid Betfair prices or NaN
+    :rtype: numpy.ndarray
+    :raises: ValueError if any price is not a valid Betfair price
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    ticks = np.full(prices.shape, NO_TICK, dtype=TICK_DTYPE)
+    known = ~np.isnan(prices)
+    ticks[known] = price_to_tick(prices[known])
+    return ticks
+
+
+def decode_ticks(ticks):
+    """Returns the prices of ticks, with NaN for `NO_TICK`.
+
+    :param ticks: Array of ticks from `encode_ticks`
+    :rtype: numpy.ndarray
+    """
+    return TICK_PRICES[np.asarray(ticks)]
+
+
+def round_price_up(prices):
+    """Returns the lowest Betfair price greater than or equal to each of
+    prices.
+
+    :param prices: Array of prices up to `MAX_PRICE`
+    :rtype: numpy.ndarray
+    :raises: ValueError if any price is greater than `MAX_PRICE`
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    ticks = np.searchsorted(LADDER, prices, side='left')
+    outside = ticks == len(LADDER)
+    if outside.any():
+        raise ValueError(
+            'No Betfair price is greater than or equal to {0!r}'.format(prices[outside][0]))
+    return LADDER[ticks]
+
+
+def round_price_down(prices):
+    """Returns the highest Betfair price less than or equal to each of prices.
+
+    :param prices: Array of prices from `MIN_PRICE`
+    :rtype: numpy.ndarray
+    :raises: ValueError if any price is less than `MIN_PRICE`
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    ticks = np.searchsorted(LADDER, prices, side='right')
+    outside = ticks == 0
+    if outside.any():
+        raise ValueError(
+            'No Betfair price is less than or equal to {0!r}'.format(prices[outside][0]))
+    return LADDER[ticks - 1]
+
+
+def ticks_difference(prices_1, prices_2):
+    """Returns the absolute difference in ticks between pairs of Betfair
+    prices. Arrays are broadcast against each other.
+
+    :param prices_1: Array of exact, valid Betfair prices
+    :param prices_2: Array of exact, valid Betfair prices
+    :rtype: numpy.ndarray
+    """
+    return np.abs(price_to_tick(prices_1) - price_to_tick(prices_2))
+
+
+def price_ticks_away(prices, n_ticks, clamp=False):
+    """Returns the Betfair prices that are n_ticks ticks away from prices.
+    Arrays are broadcast against each other.
+
+    :param prices: Array of exact, valid Betfair prices
+    :param n_ticks: Number of ticks, or array of numbers of ticks
+    :param bool clamp: Stop at the ends of the ladder instead of raising
+        `IndexError`
+    :rtype: numpy.ndarray
+    """
+    ticks = price_to_tick(prices) + np.asarray(n_ticks, dtype=np.int64)
+    if clamp:
+        ticks = np.clip(ticks, 0, len(LADDER) - 1)
+    return tick_to_price(ticks)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import time
+import random
+import threading
+
+import requests
+
+from betfair import exceptions
+
+
+# Read-only operations, which are always safe to retry
+IDEMPOTENT_METHODS = frozenset([
+    'listEventTypes',
+    'listCompetitions',
+    'listTimeRanges',
+    'listEvents',
+    'listMarketTypes',
+    'listCountries',
+    'listVenues',
+    'listMarketCatalogue',
+    'listMarketBook',
+    'listMarketProfitAndLoss',
+    'listCurrentOrders',
+    'listClearedOrders',
+    'getAccountFunds',
+    'getAccountStatement',
+    'getAccountDetails',
+    'listCurrencyRates',
+])
+
+# Order operations, which are only retried when they carry a `customer_ref`
+# that Betfair can use to de-duplicate them
+ORDER_METHODS = frozenset([
+    'placeOrders',
+    'cancelOrders',
+    'replaceOrders',
+    'updateOrders',
+])
+
+# Transient API error codes
+RETRY_ERRORS = frozenset([
+    'TOO_MANY_REQUESTS',
+    'SERVICE_BUSY',
+    'TIMEOUT_ERROR',
+])
+
+
+class RetryStats(object):
+    """Thread-safe counters describing retries made under a `RetryPolicy`.
+
+    :ivar int calls: Number of calls that were retried at least once
+    :ivar int retries: Total number of retries
+    :ivar float retry_time: Total seconds spent on failed attempts and backoff
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.retries = 0
+        self.retry_time = 0.0
+
+    def record(self, retries, retry_time):
+        with self.lock:
+            self.calls += 1
+            self.retries += retries
+            self.retry_time += retry_time
+
+
+class RetryPolicy(object):
+    """Retry transient failures of read-only API requests with exponential
+    backoff and jitter. Requests are retried after HTTP 5xx responses,
+    timeouts, connection errors and `RETRY_ERRORS` API errors.
+
+    :param int max_retries: Maximum number of retries per call
+    :param float backoff: Delay (seconds) before the first retry; doubles for
+        each subsequent retry
+    :param float max_backoff: Maximum delay (seconds) between retries
+    :param float jitter: Fraction of each delay that is randomized, from 0
+        (no jitter) to 1 (full jitter)
+    :param float budget: Optional maximum seconds per call, including retries;
+        no retry is made that would exceed it
+    """
+    def __init__(self, max_retries=3, backoff=0.1, max_backoff=2.0, jitter=0.5,
+                 budget=None):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.budget = budget
+        self.stats = RetryStats()
+
+    def allows(self, method, params):
+        """Check whether a request may be retried.
+
+        :param str method: Betfair endpoint
+        :param dict params: Request parameters
+        """
+        if method in IDEMPOTENT_METHODS:
+            return True
+        return method in ORDER_METHODS and params.get('customer_ref') is not None
+
+    def should_retry(self, error):
+        if isinstance(error, exceptions.ApiError):
+            return error.status_code >= 500 or error.message in RETRY_ERRORS
+        return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+    def get_delay(self, retry):
+        """Get the delay before a retry.
+
+        :param int retry: Zero-based retry number
+        """
+        delay = min(self.backoff * 2 ** retry, self.max_backoff)
+        return delay * (1 - self.jitter * random.random())
+
+    def call(self, func, *args, **kwargs):
+        """Call `func`, retrying transient failures.
+
+        :raises: The last error if retries are exhausted
+        """
+        start = time.time()
+        retry = 0
+        while True:
+            attempt_start = time.time()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                delay = self.next_delay(retry, start, attempt_start, error)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                retry += 1
+            else:
+                self.finish(retry, start, attempt_start)
+                return result
+
+    def next_delay(self, retry, start, attempt_start, error, retryable=None):
+        """Decide whether to retry after a failed attempt. Stops, recording
+        the retries made, when `error` is not transient or retries or the
+        budget are exhausted.
+
+        :param int retry: Zero-based number of the failed retry
+        :param float start: Time of the first attempt
+        :param float attempt_start: Time of the failed attempt
+        :param Exception error: Error raised by the attempt
+        :param bool retryable: Whether `error` is transient; defaults to
+            `should_retry(error)`
+        :returns: Delay (seconds) before the next attempt, or `None` to stop
+        """
+        if retryable is None:
+            retryable = self.should_retry(error)
+        if retry >= self.max_retries or not retryable:
+            self.finish(retry, start, attempt_start)
+            return None
+        delay = self.get_delay(retry)
+        if self.budget is not None and time.time() + delay - start > self.budget:
+            self.finish(retry, start, attempt_start)
+            return None
+        return delay
+
+    def finish(self, retries, start, attempt_start):
+        if retries:
+            self.stats.record(retries, attempt_start - start)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""Incremental parsing of large list responses. Instead of buffering and
+parsing the whole body, a `ResultStream` reads the body in chunks and yields
+each item of the result array as soon as its JSON object is complete::
+
+    markets = client.list_market_catalogue(
+        market_filter, max_results=1000, stream=True,
+    )
+    for market in markets:
+        ...
+"""
+
+from __future__ import absolute_import
+
+import re
+import json
+import codecs
+
+from betfair import utils
+from betfair import models
+from betfair import exceptions
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Report models whose list field is streamed, by model class
+STREAMED_FIELDS = {
+    models.CurrentOrderSummaryReport: 'current_orders',
+    models.ClearedOrderSummaryReport: 'cleared_orders',
+}
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+decoder = json.JSONDecoder()
+
+
+class JsonReader(object):
+    """Read JSON values from an iterable of byte chunks, buffering only the
+    unread part of the input.
+
+    :param chunks: Iterable of bytes
+    """
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = u''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk to the buffer.
+
+        :returns: False if the input is exhausted
+        """
+        if self.eof:
+            return False
+        try:
+            text = self.decoder.decode(next(self.chunks))
+        except StopIteration:
+            self.eof = True
+            text = self.decoder.decode(b'', True)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and get the next character, or an empty string at
+        the end of the input.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return u''
+
+    def expect(self, chars):
+        """Consume the next character, which must be one of `chars`."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError('Expected one of {0!r} at {1!r}'.format(
+                chars, self.buffer[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # Incomplete value; fail only at the end of the input
+                if not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """Iterate over the keys of an object. The caller must consume the
+        value of each key before advancing.
+        """
+        self.expect(u'{')
+        if self.peek() == u'}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(u':')
+            yield key
+            if self.expect(u',}') == u'}':
+                return
+
+    def items(self):
+        """Iterate over the values of an array."""
+        self.expect(u'[')
+        if self.peek() == u']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(u',]') == u']':
+                return
+
+    def stream(self, path, rest):
+        """Iterate over the values of the array at `path`, storing the other
+        members of the enclosing objects in `rest`. The array itself is stored
+        as an empty list.
+
+        :param tuple path: Keys of the array
+        :param dict rest: Object receiving the other members
+        """
+        for key in self.members():
+            if key == path[0] and len(path) == 1 and self.peek() == u'[':
+                rest[key] = []
+                for item in self.items():
+                    yield item
+            elif key == path[0] and len(path) > 1 and self.peek() == u'{':
+                rest[key] = {}
+                for item in self.stream(path[1:], rest[key]):
+                    yield item
+            else:
+                rest[key] = self.value()
+
+
+class ResultStream(object):
+    """Iterable over the models in the result array of a streamed response.
+    The body is read as the stream is iterated, so a stream can be iterated
+    only once; close the stream to release its connection early. Error
+    envelopes raise `ApiError` when reached.
+
+    :param Response response: Streamed HTTP response
+    :param model: Result model class
+    :param str representation: Optional representation of models
+    :ivar result: For paged order reports, the report without its list of
+        orders, once the stream has been exhausted
+    """
+    def __init__(self, response, model, representation=None):
+        self.response = response
+        self.model = model
+        self.representation = representation
+        self.result = None
+        self.consumed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.response.close()
+
+    def __iter__(self):
+        if self.consumed:
+            raise RuntimeError('Stream has already been read')
+        self.consumed = True
+        name = STREAMED_FIELDS.get(self.model)
+        if name is None:
+            path, item_model = ('result', ), self.model
+        else:
+            field = self.model._fields[name]
+            path, item_model = ('result', field.serialized_name), field.field.model_class
+        envelope = {}
+        reader = JsonReader(self.response.iter_content(CHUNK_SIZE))
+        try:
+            for item in reader.stream(path, envelope):
+                yield utils.process_result(item, item_model, self.representation)
+        finally:
+            self.close()
+        if 'result' not in envelope:
+            raise exceptions.ApiError(self.response, envelope)
+        if name is not None:
+            self.result = utils.process_result(
+                envelope['result'], self.model, self.representation,
+            )
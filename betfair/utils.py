@@ -4,13 +4,23 @@ from __future__ import absolute_import
 
 import six
 import json
+import time
 import datetime
+import importlib
 import collections
+from fractions import Fraction
 
 import enum
 import decorator
+from concurrent import futures
 from six.moves import http_client as httplib
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
+from betfair import lazy
+from betfair import price
+from betfair import compact
+from betfair import constants
 from betfair import exceptions
 from betfair.meta import utils
 from betfair.meta.models import BetfairModel
@@ -28,22 +38,148 @@ def get_chunks(sequence, chunk_size):
     ]
 
 
+# Betfair market data request limits; see
+# https://docs.developer.betfair.com/display/1smk3cen4v3lu3yomq5qye0ni/Market+Data+Request+Limits
+MAX_DATA_WEIGHT = 200
+NO_PROJECTION_WEIGHT = 2
+PRICE_DATA_WEIGHTS = {
+    constants.PriceData.SP_AVAILABLE: 3,
+    constants.PriceData.SP_TRADED: 7,
+    constants.PriceData.EX_BEST_OFFERS: 5,
+    constants.PriceData.EX_ALL_OFFERS: 17,
+    constants.PriceData.EX_TRADED: 17,
+}
+# Requesting traded volume with either offer projection is discounted
+EX_TRADED_DISCOUNT = 2
+DEFAULT_BEST_PRICES_DEPTH = 3
+
+
+def get_price_projection_weight(price_projection=None):
+    """Get the per-market data weight of a `listMarketBook` request. Weights
+    are exact, so may be fractional when `best_prices_depth` is overridden.
+
+    :param PriceProjection price_projection: Optional price projection
+    """
+    price_data = set(
+        constants.PriceData[getattr(value, 'name', value)]
+        for value in (price_projection and price_projection.price_data) or []
+    )
+    if not price_data:
+        return NO_PROJECTION_WEIGHT
+    # All offers supersede best offers
+    if constants.PriceData.EX_ALL_OFFERS in price_data:
+        price_data.discard(constants.PriceData.EX_BEST_OFFERS)
+    weight = sum(PRICE_DATA_WEIGHTS[value] for value in price_data)
+    if constants.PriceData.EX_BEST_OFFERS in price_data:
+        overrides = price_projection.ex_best_offers_overrides
+        depth = (overrides and overrides.best_prices_depth) or DEFAULT_BEST_PRICES_DEPTH
+        best_weight = PRICE_DATA_WEIGHTS[constants.PriceData.EX_BEST_OFFERS]
+        weight += Fraction(best_weight * depth, DEFAULT_BEST_PRICES_DEPTH) - best_weight
+    if constants.PriceData.EX_TRADED in price_data and price_data & set([
+            constants.PriceData.EX_BEST_OFFERS, constants.PriceData.EX_ALL_OFFERS]):
+        weight -= EX_TRADED_DISCOUNT
+    return weight
+
+
+def get_market_book_chunk_size(price_projection=None):
+    """Get the largest number of markets per `listMarketBook` request that
+    stays within `MAX_DATA_WEIGHT`.
+
+    :param PriceProjection price_projection: Optional price projection
+    """
+    return max(int(MAX_DATA_WEIGHT // get_price_projection_weight(price_projection)), 1)
+
+
+# Betfair limits on the number of instructions in each order request
+MAX_INSTRUCTIONS = {
+    'place_orders': 200,
+    'cancel_orders': 60,
+    'replace_orders': 60,
+    'update_orders': 60,
+}
+
+
+def map_chunks(func, chunks, max_workers=None, executor=None):
+    """Apply `func` to each chunk, optionally in parallel. Results are
+    returned in input order; when running in parallel, each result is yielded
+    as soon as it and all preceding results are ready.
+
+    :param func: Callable applied to each chunk
+    :param list chunks: List of chunks
+    :param int max_workers: Optional number of worker threads
+    :param Executor executor: Optional executor; takes precedence over
+        `max_workers`
+    """
+    if executor is None and not max_workers:
+        return [func(chunk) for chunk in chunks]
+    owned = executor is None
+    if owned:
+        executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        jobs = [executor.submit(func, chunk) for chunk in chunks]
+    finally:
+        # Pending jobs still run to completion after shutdown
+        if owned:
+            executor.shutdown(wait=False)
+    return (job.result() for job in jobs)
+
+
+# Method arguments that are handled by the client and not sent to Betfair
+CLIENT_KWARGS = ('self', 'representation', 'stream')
+
+
 def get_kwargs(kwargs):
-    """Get all keys and values from dictionary where key is not `self`.
+    """Get all keys and values from dictionary where key is not `self` or
+    another client-side option.
 
     :param dict kwargs: Input parameters
     """
     return {
         key: value for key, value in six.iteritems(kwargs)
-        if key != 'self'
+        if key not in CLIENT_KWARGS
     }
 
 
-def check_status_code(response, codes=None):
+# JSON decoders in order of preference; the first installed is the default
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
+
+
+def get_json_loads(backend=None):
+    """Get a JSON decoding function. Requests are always encoded with
+    `BetfairEncoder`, since the C-backed libraries cannot override how enums
+    are serialized.
+
+    :param str backend: Optional module name ("orjson", "ujson" or "json");
+        defaults to the first installed module in `JSON_BACKENDS`
+    :raises: ImportError if `backend` is not installed
+    """
+    for name in ([backend] if backend else JSON_BACKENDS):
+        try:
+            return importlib.import_module(name).loads
+        except ImportError:
+            if backend:
+                raise
+
+
+def parse_json(response, loads=json.loads):
+    """Parse the body of a response, returning an empty dictionary for
+    non-JSON bodies (e.g. error pages from proxies and load balancers).
+
+    :param Response response: HTTP response
+    :param loads: JSON decoding function
+    """
+    try:
+        return loads(response.content)
+    except ValueError:
+        return {}
+
+
+def check_status_code(response, codes=None, data=None):
     """Check HTTP status code and raise exception if incorrect.
 
     :param Response response: HTTP response
     :param codes: List of accepted codes or callable
+    :param data: Optional parsed response body
     :raises: ApiError if code invalid
     """
     codes = codes or [httplib.OK]
@@ -53,38 +189,88 @@ def check_status_code(response, codes=None):
         else lambda resp: resp.status_code in codes
     )
     if not checker(response):
-        raise exceptions.ApiError(response, response.json())
+        raise exceptions.ApiError(response, parse_json(response) if data is None else data)
 
 
-def result_or_error(response):
+def result_or_error(response, data=None):
     """Get `result` field from Betfair response or raise exception if not
     found.
 
     :param Response response:
+    :param data: Optional parsed response body
     :raises: ApiError if no results passed
     """
-    data = response.json()
+    data = response.json() if data is None else data
     result = data.get('result')
     if result is not None:
         return result
     raise exceptions.ApiError(response, data)
 
 
-def process_result(result, model=None):
+# Representations of API results: full Schematics models, lazily converted
+# models, or compact `__slots__` classes or NumPy columns for market data
+# where available, optionally with ladder prices encoded as ticks; or the
+# raw response JSON
+REPRESENTATIONS = (
+    'model', 'lazy', 'compact', 'columnar', 'compact_ticks', 'columnar_ticks', 'raw',
+)
+
+
+def check_representation(representation):
+    if representation is not None and representation not in REPRESENTATIONS:
+        raise ValueError('Unknown representation: {0}'.format(representation))
+
+
+def process_result(result, model=None, representation=None):
     """Cast response JSON to Betfair model(s).
 
     :param result: Betfair response JSON
     :param BetfairModel model: Deserialization format; if `None`, return raw
         JSON
+    :param str representation: Optional representation; one of
+        `REPRESENTATIONS`, defaulting to "model"
     """
-    if model is None:
+    check_representation(representation)
+    if model is None or representation == 'raw':
         return result
+    if representation == 'lazy':
+        model = lazy.get_lazy_class(model)
+    if representation == 'compact':
+        model = compact.COMPACT_MODELS.get(model, model)
+    if representation == 'compact_ticks':
+        model = compact.TICK_MODELS.get(model, model)
+    if representation in ('columnar', 'columnar_ticks'):
+        # NumPy is an optional dependency
+        from betfair import columnar
+        registry = (
+            columnar.TICK_COLUMNAR_MODELS
+            if representation == 'columnar_ticks'
+            else columnar.COLUMNAR_MODELS
+        )
+        if model in registry:
+            return registry[model].unserialize(result)
     if isinstance(result, collections.Sequence):
-        return [model(**item) for item in result]
-    return model(**result)
+        return [model.unserialize(item) for item in result]
+    return model.unserialize(result)
+
+
+def encode_ticks(value):
+    """Replace `Tick` instances in JSON data with their prices."""
+    if isinstance(value, price.Tick):
+        return value.price
+    if isinstance(value, dict):
+        return {key: encode_ticks(item) for key, item in six.iteritems(value)}
+    if isinstance(value, (list, tuple)):
+        return [encode_ticks(item) for item in value]
+    return value
 
 
 class BetfairEncoder(json.JSONEncoder):
+    """Encode request payloads. Ticks are integers, which the encoder would
+    write as is, so they are replaced with their prices before encoding.
+    """
+    def iterencode(self, o, _one_shot=False):
+        return super(BetfairEncoder, self).iterencode(encode_ticks(o), _one_shot)
 
     def default(self, o):
         if isinstance(o, datetime.datetime):
@@ -97,22 +283,84 @@ class BetfairEncoder(json.JSONEncoder):
         return super(BetfairEncoder, self).default(o)
 
 
-def make_payload(base, method, params):
+def make_payload(base, method, params, request_id=1):
     """Build Betfair JSON-RPC payload.
 
     :param str base: Betfair base ("Sports" or "Account")
     :param str method: Betfair endpoint
     :param dict params: Request parameters
+    :param int request_id: JSON-RPC request identifier
     """
     payload = {
         'jsonrpc': '2.0',
-        'method': '{base}APING/v1.0/{method}'.format(**locals()),
+        'method': '{base}APING/v1.0/{method}'.format(base=base, method=method),
         'params': utils.serialize_dict(params),
-        'id': 1,
+        'id': request_id,
     }
     return payload
 
 
+class IdleTimeoutMixin(object):
+    """Connection pool mixin closing pooled connections that have been idle
+    for longer than `idle_timeout` seconds when they are checked out, so that
+    the request opens a fresh connection instead of reusing one the server
+    or an intermediate network device may have dropped.
+    """
+    idle_timeout = None
+
+    def _get_conn(self, timeout=None):
+        conn = super(IdleTimeoutMixin, self)._get_conn(timeout=timeout)
+        last_used = getattr(conn, 'last_used', None)
+        if last_used is not None and time.time() - last_used > self.idle_timeout:
+            conn.close()
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.last_used = time.time()
+        return super(IdleTimeoutMixin, self)._put_conn(conn)
+
+
+def get_idle_timeout_pool_classes(idle_timeout):
+    """Get connection pool classes by scheme closing connections idle for
+    longer than `idle_timeout` seconds.
+
+    :param float idle_timeout: Idle time (seconds) after which pooled
+        connections are not reused
+    """
+    return {
+        scheme: type(
+            'IdleTimeout' + pool_class.__name__,
+            (IdleTimeoutMixin, pool_class),
+            {'idle_timeout': idle_timeout},
+        )
+        for scheme, pool_class in (('http', HTTPConnectionPool), ('https', HTTPSConnectionPool))
+    }
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTP adapter that optionally limits how long pooled connections are
+    kept alive: connections idle for longer than `keep_alive_idle` seconds are
+    closed and replaced when next used.
+
+    :param float keep_alive_idle: Optional idle timeout (seconds) of pooled
+        connections
+    :param kwargs: Arguments passed to `HTTPAdapter`
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ['keep_alive_idle']
+
+    def __init__(self, keep_alive_idle=None, **kwargs):
+        self.keep_alive_idle = keep_alive_idle
+        super(KeepAliveAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(KeepAliveAdapter, self).init_poolmanager(*args, **kwargs)
+        if self.keep_alive_idle:
+            self.poolmanager.pool_classes_by_scheme = get_idle_timeout_pool_classes(
+                self.keep_alive_idle,
+            )
+
+
 @decorator.decorator
 def requires_login(func, *args, **kwargs):
     """Decorator to check that the user is logged in. Raises `BetfairError`
@@ -16,7 +16,12 @@ INSTALL_REQUIRES = [
     'inflection>=0.3.0',
     'schematics>=1.0.4,<2.0.0',
     'python-dateutil>=2.4.2',
+    'futures>=3.0.0; python_version < "3"',
 ]
+EXTRAS_REQUIRE = {
+    'async': ['aiohttp>=3.0.0'],
+    'numpy': ['numpy>=1.8.0'],
+}
 TEST_REQUIRES = [
     'pytest',
     'responses',
@@ -77,6 +82,7 @@ setup(
     package_dir={'betfair': 'betfair'},
     include_package_data=True,
     install_requires=INSTALL_REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
     zip_safe=False,
     classifiers=[
         'Development Status :: 4 - Beta',
@@ -3,11 +3,16 @@
 import pytest
 
 import os
+import sys
 
 from betfair import betfair
 from tests.utils import response_fixture_factory
 
 
+# The asyncio client uses `async def` syntax
+collect_ignore = ['test_aio.py'] if sys.version_info < (3, 5) else []
+
+
 @pytest.fixture
 def client():
     return betfair.Betfair(app_key='test', cert_file='path/to/cert')
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import json
+import asyncio
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from betfair import models
+from betfair import betfair
+from betfair import constants
+from betfair import exceptions
+from betfair.aio import AsyncBetfair
+from betfair.cache import MemoryCache
+from betfair.retry import RetryPolicy
+from betfair.keepalive import SessionKeeper
+from betfair.marketcache import MarketCache
+
+
+class StubServer(object):
+    """Local Betfair stand-in. Maps JSON-RPC method names (e.g.
+    "listMarketBook") and identity endpoints (e.g. "keepAlive") to canned
+    `(status, body)` pairs, and records incoming requests.
+    """
+    def __init__(self, loop):
+        self.loop = loop
+        self.routes = {}
+        self.requests = []
+        app = web.Application()
+        app.router.add_post('/identity/{method}', self.handle_identity)
+        app.router.add_post('/api', self.handle_api)
+        self.server = TestServer(app)
+
+    def add(self, method, body, status=200):
+        self.routes[method] = (status, body)
+
+    def respond(self, method):
+        status, body = self.routes[method]
+        return web.Response(
+            status=status,
+            text=json.dumps(body),
+            content_type='application/json',
+        )
+
+    async def handle_identity(self, request):
+        self.requests.append((request.headers, await request.text()))
+        return self.respond(request.match_info['method'])
+
+    async def handle_api(self, request):
+        payload = await request.json()
+        self.requests.append((request.headers, payload))
+        # Batches are routed by their first request
+        first = payload[0] if isinstance(payload, list) else payload
+        return self.respond(first['method'].split('/')[-1])
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def server(loop, monkeypatch):
+    server = StubServer(loop)
+    loop.run_until_complete(server.server.start_server())
+    monkeypatch.setitem(betfair.IDENTITY_URLS, 'stub', server.url('/identity/'))
+    monkeypatch.setitem(betfair.API_URLS, 'stub', server.url('/api'))
+    yield server
+    loop.run_until_complete(server.server.close())
+
+
+@pytest.fixture
+def client(loop, server):
+    client = AsyncBetfair(app_key='test', cert_file='path/to/cert', locale='stub')
+    client.session_token = 'secret'
+    yield client
+    loop.run_until_complete(client.close())
+
+
+market_book = {
+    'marketId': '1.2',
+    'isMarketDataDelayed': False,
+    'status': 'OPEN',
+    'runners': [{
+        'selectionId': 3,
+        'handicap': 0.0,
+        'status': 'ACTIVE',
+        'ex': {
+            'availableToBack': [{'price': 2.0, 'size': 10.0}],
+            'availableToLay': [{'price': 2.02, 'size': 5.0}],
+            'tradedVolume': [],
+        },
+    }],
+}
+
+
+def test_list_market_book(loop, server, client):
+    server.add('listMarketBook', {'jsonrpc': '2.0', 'result': [market_book], 'id': 1})
+    books = loop.run_until_complete(client.list_market_book(['1.2']))
+    assert len(books) == 1
+    assert isinstance(books[0], models.MarketBook)
+    assert books[0] == models.MarketBook(**market_book)
+    headers, payload = server.requests[0]
+    assert headers['X-Authentication'] == 'secret'
+    assert headers['X-Application'] == 'test'
+    assert payload['method'] == 'SportsAPING/v1.0/listMarketBook'
+    assert payload['params']['marketIds'] == ['1.2']
+
+
+def test_get_account_funds(loop, server, client):
+    server.add('getAccountFunds', {
+        'jsonrpc': '2.0',
+        'result': {'availableToBetBalance': 100.0, 'exposure': -5.0},
+        'id': 1,
+    })
+    funds = loop.run_until_complete(client.get_account_funds())
+    assert isinstance(funds, models.AccountFundsResponse)
+    assert funds.available_to_bet_balance == 100.0
+
+
+def test_place_orders_encodes_models(loop, server, client):
+    server.add('placeOrders', {
+        'jsonrpc': '2.0',
+        'result': {'status': 'SUCCESS', 'marketId': '1.2', 'instructionReports': []},
+        'id': 1,
+    })
+    instruction = models.PlaceInstruction(
+        order_type=constants.OrderType.LIMIT,
+        selection_id=3,
+        side=constants.Side.BACK,
+        limit_order=models.LimitOrder(
+            size=2.0, price=2.0, persistence_type=constants.PersistenceType.LAPSE,
+        ),
+    )
+    report = loop.run_until_complete(client.place_orders('1.2', [instruction]))
+    assert isinstance(report, models.PlaceExecutionReport)
+    _, payload = server.requests[0]
+    assert payload['params']['instructions'][0]['side'] == 'BACK'
+    assert payload['params']['instructions'][0]['limitOrder']['price'] == 2.0
+
+
+def test_api_error(loop, server, client):
+    server.add('cancelOrders', {
+        'jsonrpc': '2.0',
+        'error': {
+            'code': -32099,
+            'data': {'APINGException': {'errorCode': 'INVALID_SESSION_INFORMATION'}},
+        },
+        'id': 1,
+    })
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        loop.run_until_complete(client.cancel_orders('1.2', []))
+    assert excinfo.value.message == 'INVALID_SESSION_INFORMATION'
+    assert excinfo.value.status_code == 200
+
+
+def test_cancel_orders_bulk(loop, server, client):
+    server.add('cancelOrders', {
+        'jsonrpc': '2.0',
+        'result': {'status': 'SUCCESS', 'marketId': '1.2', 'instructionReports': []},
+        'id': 1,
+    })
+    instructions = [models.CancelInstruction(bet_id=str(idx)) for idx in range(61)]
+    result = loop.run_until_complete(client.cancel_orders_bulk('1.2', instructions))
+    sizes = sorted(len(payload['params']['instructions']) for _, payload in server.requests)
+    assert sizes == [1, 60]
+    # Reports missing from the responses are filled in as failures
+    reports = result.report.instruction_reports
+    assert [report.instruction.bet_id for report in reports] == [str(idx) for idx in range(61)]
+    assert set(report.status for report in reports) == {'FAILURE'}
+
+
+def test_api_bad_code(loop, server, client):
+    server.add('listMarketBook', {}, status=503)
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        loop.run_until_complete(client.list_market_book(['1.2']))
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.message == 'UNKNOWN'
+
+
+def test_iter_list_market_book(loop, server, client):
+    server.add('listMarketBook', {'jsonrpc': '2.0', 'result': [market_book], 'id': 1})
+    books = loop.run_until_complete(
+        client.iter_list_market_book(['1.2', '1.3', '1.4'], chunk_size=2)
+    )
+    assert len(books) == 2
+    assert sorted(len(payload['params']['marketIds']) for _, payload in server.requests) == [1, 2]
+
+
+def test_poll_market_cache(loop, server, client):
+    server.add('listMarketBook', {'jsonrpc': '2.0', 'result': [market_book], 'id': 1})
+    cache = MarketCache()
+    changes = loop.run_until_complete(cache.poll(client, ['1.2'], currency_code='GBP'))
+    assert [change.selection_id for change in changes] == [3]
+    assert cache['1.2'] == models.MarketBook(**market_book)
+    _, payload = server.requests[0]
+    assert payload['params']['currencyCode'] == 'GBP'
+
+
+def test_keepalive_and_logout(loop, server, client):
+    server.add('keepAlive', {'status': 'SUCCESS'})
+    server.add('logout', {'status': 'SUCCESS'})
+    loop.run_until_complete(client.keep_alive())
+    loop.run_until_complete(client.logout())
+    assert client.session_token is None
+
+
+def test_keepalive_failure(loop, server, client):
+    server.add('keepAlive', {'status': 'FAIL', 'error': 'NO_SESSION'})
+    with pytest.raises(exceptions.AuthError) as excinfo:
+        loop.run_until_complete(client.keep_alive())
+    assert excinfo.value.message == 'NO_SESSION'
+
+
+def test_requires_login(loop, server, client):
+    client.session_token = None
+    with pytest.raises(exceptions.NotLoggedIn):
+        loop.run_until_complete(client.list_market_book(['1.2']))
+    assert server.requests == []
+
+
+def test_batch(loop, server, client):
+    server.add('listMarketBook', [
+        {'jsonrpc': '2.0', 'result': [market_book], 'id': 1},
+        {
+            'jsonrpc': '2.0',
+            'error': {'data': {'APINGException': {'errorCode': 'TOO_MUCH_DATA'}}},
+            'id': 2,
+        },
+    ])
+
+    async def run():
+        async with client.batch() as batch:
+            books = batch.list_market_book(['1.2'])
+            funds = batch.get_account_funds()
+        return books, funds
+
+    books, funds = loop.run_until_complete(run())
+    assert books.result()[0].market_id == '1.2'
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        funds.result()
+    assert excinfo.value.message == 'TOO_MUCH_DATA'
+    assert len(server.requests) == 1
+
+
+@pytest.mark.parametrize('option', ['pool_connections', 'coalescer'])
+def test_unsupported_options(option):
+    with pytest.raises(ValueError):
+        AsyncBetfair(app_key='test', cert_file='path/to/cert', **{option: 1})
+
+
+def test_session_keeper_unsupported(client):
+    with pytest.raises(ValueError):
+        SessionKeeper(client, 'username', 'password')
+
+
+def test_pool_settings(loop):
+    client = AsyncBetfair(
+        app_key='test', cert_file='path/to/cert', pool_maxsize=3, keep_alive_idle=5,
+    )
+
+    async def run():
+        connector = client.get_session().connector
+        await client.close()
+        return connector
+
+    connector = loop.run_until_complete(run())
+    assert connector.limit_per_host == 3
+    assert connector._keepalive_timeout == 5
+
+
+def test_warm_up(loop, server, client):
+    loop.run_until_complete(client.warm_up(connections=2))
+    # API and identity URLs share a host, so the second round reuses connections
+    assert len(client.session.connector._conns) == 1
+    connections, = client.session.connector._conns.values()
+    assert len(connections) == 2
+
+
+def test_retry_policy(loop, server):
+    server.add('listMarketBook', {}, status=503)
+    client = AsyncBetfair(
+        app_key='test', cert_file='path/to/cert', locale='stub',
+        retry_policy=RetryPolicy(max_retries=2, backoff=0),
+    )
+    client.session_token = 'secret'
+    with pytest.raises(exceptions.ApiError):
+        loop.run_until_complete(client.list_market_book(['1.2']))
+    loop.run_until_complete(client.close())
+    assert len(server.requests) == 3
+    assert client.retry_policy.stats.retries == 2
+
+
+def test_cache(loop, server):
+    server.add('listEventTypes', {
+        'jsonrpc': '2.0',
+        'result': [{'eventType': {'id': '1', 'name': 'Soccer'}, 'marketCount': 3}],
+        'id': 1,
+    })
+    client = AsyncBetfair(
+        app_key='test', cert_file='path/to/cert', locale='stub', cache=MemoryCache(),
+    )
+    client.session_token = 'secret'
+    first = loop.run_until_complete(client.list_event_types())
+    second = loop.run_until_complete(client.list_event_types())
+    loop.run_until_complete(client.close())
+    assert second == first
+    assert len(server.requests) == 1
+    assert client.cache.hits == 1
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+import json
+
+from betfair import models
+from betfair import betfair
+from betfair import exceptions
+
+
+def market_book(market_id):
+    return {'marketId': market_id, 'isMarketDataDelayed': False}
+
+
+@pytest.yield_fixture
+def batch_response():
+    def callback(request):
+        payload = json.loads(request.body)
+        results = {
+            'SportsAPING/v1.0/listMarketBook': lambda params: {
+                'result': [market_book(market_id) for market_id in params['marketIds']],
+            },
+            'AccountAPING/v1.0/getAccountFunds': lambda params: {
+                'result': {'availableToBetBalance': 100.0},
+            },
+            'SportsAPING/v1.0/listCurrentOrders': lambda params: {
+                'error': {
+                    'code': -32099,
+                    'data': {'APINGException': {'errorCode': 'TOO_MUCH_DATA'}},
+                },
+            },
+        }
+        # Respond in reverse order to check matching by id
+        body = [
+            dict(results[part['method']](part['params']), jsonrpc='2.0', id=part['id'])
+            for part in reversed(payload)
+        ]
+        return (200, {}, json.dumps(body))
+    responses.add_callback(responses.POST, betfair.API_URLS[None], callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_batch(logged_in_client, batch_response):
+    with logged_in_client.batch() as batch:
+        books_1 = batch.list_market_book(['1.1', '1.2'])
+        books_2 = batch.list_market_book(['1.3'])
+        funds = batch.get_account_funds()
+        assert len(batch) == 3
+        assert not books_1.done()
+    assert len(batch_response.calls) == 1
+    payload = json.loads(batch_response.calls[0].request.body)
+    assert [part['id'] for part in payload] == [1, 2, 3]
+    assert [book.market_id for book in books_1.result()] == ['1.1', '1.2']
+    assert [book.market_id for book in books_2.result()] == ['1.3']
+    assert isinstance(funds.result(), models.AccountFundsResponse)
+    assert funds.result().available_to_bet_balance == 100.0
+
+
+def test_batch_partial_failure(logged_in_client, batch_response):
+    batch = logged_in_client.batch()
+    orders = batch.list_current_orders()
+    books = batch.list_market_book(['1.1'])
+    assert batch.execute() == [orders, books]
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        orders.result()
+    assert excinfo.value.message == 'TOO_MUCH_DATA'
+    assert books.result()[0].market_id == '1.1'
+
+
+def test_batch_empty(logged_in_client):
+    assert logged_in_client.batch().execute() == []
+
+
+def test_batch_bad_code(logged_in_client):
+    with responses.RequestsMock() as mock:
+        mock.add(responses.POST, betfair.API_URLS[None], status=503, body='{}')
+        batch = logged_in_client.batch()
+        books = batch.list_market_book(['1.1'])
+        with pytest.raises(exceptions.ApiError):
+            batch.execute()
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        books.result()
+    assert excinfo.value.status_code == 503
+
+
+def test_batch_requires_login(client):
+    with pytest.raises(exceptions.NotLoggedIn):
+        client.batch().list_market_book(['1.1'])
+
+
+@pytest.mark.parametrize('method_name', ['login', 'logout', 'iter_list_market_book'])
+def test_batch_unbatchable(logged_in_client, method_name):
+    with pytest.raises(AttributeError):
+        getattr(logged_in_client.batch(), method_name)
@@ -2,11 +2,21 @@
 
 import pytest
 
+import json
+import time
 import inspect
+import threading
 import requests
 import itertools
+import responses
+from concurrent import futures
 
+from betfair import models
+from betfair import lazy
+from betfair import compact
+from betfair import streaming
 from betfair import betfair
+from betfair import constants
 from betfair import exceptions
 
 from tests import utils
@@ -108,3 +118,275 @@ def test_requires_login(method_name, client, logged_in_client, monkeypatch):
         method(*args)
     logged_in_method = getattr(logged_in_client, method_name)
     logged_in_method(*args)
+
+
+@pytest.yield_fixture
+def market_book_echo():
+    """Respond to `listMarketBook` with one book per requested market, with
+    later chunks responding faster than earlier ones.
+    """
+    def callback(request):
+        market_ids = json.loads(request.body)['params']['marketIds']
+        time.sleep(0.05 / int(market_ids[0]))
+        result = [
+            {'marketId': market_id, 'isMarketDataDelayed': False}
+            for market_id in market_ids
+        ]
+        return (200, {}, json.dumps({'jsonrpc': '2.0', 'result': result, 'id': 1}))
+    responses.add_callback(responses.POST, betfair.API_URLS[None], callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+@pytest.mark.parametrize('max_workers', [None, 1, 4])
+def test_iter_list_market_book(logged_in_client, market_book_echo, max_workers):
+    market_ids = [str(idx) for idx in range(1, 11)]
+    books = logged_in_client.iter_list_market_book(
+        market_ids, chunk_size=3, max_workers=max_workers,
+    )
+    assert [book.market_id for book in books] == market_ids
+    assert len(market_book_echo.calls) == 4
+
+
+def test_iter_list_market_book_executor(logged_in_client, market_book_echo):
+    market_ids = [str(idx) for idx in range(1, 11)]
+    executor = futures.ThreadPoolExecutor(max_workers=2)
+    books = logged_in_client.iter_list_market_book(
+        market_ids, chunk_size=2, executor=executor,
+    )
+    assert [book.market_id for book in books] == market_ids
+    executor.shutdown()
+
+
+def test_client_init_pool_settings():
+    client_ = betfair.Betfair(
+        app_key='test', cert_file='path/to/cert',
+        pool_connections=2, pool_maxsize=20, keep_alive_idle=30,
+    )
+    adapter = client_.session.get_adapter(client_.api_url)
+    assert adapter.keep_alive_idle == 30
+    assert adapter.poolmanager.connection_pool_kw['maxsize'] == 20
+    pool = adapter.poolmanager.connection_from_url(client_.api_url)
+    assert pool.idle_timeout == 30
+
+
+def test_client_init_custom_session():
+    session = requests.Session()
+    client_ = betfair.Betfair(
+        app_key='test', cert_file='path/to/cert', session=session, pool_maxsize=20,
+    )
+    assert client_.session is session
+
+
+@pytest.yield_fixture
+def local_server(monkeypatch):
+    server = utils.ConnectionCountingServer()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    monkeypatch.setitem(betfair.IDENTITY_URLS, 'local', server.url)
+    monkeypatch.setitem(betfair.API_URLS, 'local', server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_warm_up(local_server):
+    client_ = betfair.Betfair(
+        app_key='test', cert_file='path/to/cert', locale='local', pool_maxsize=3,
+    )
+    client_.session_token = 'secret'
+    client_.warm_up(connections=3)
+    # API and identity URLs share a host, so the second round reuses connections
+    assert len(local_server.connections) == 3
+    for _ in range(3):
+        client_.session.post(client_.api_url, data='{}').content
+    assert len(local_server.connections) == 3
+
+
+def test_keep_alive_idle(local_server):
+    client_ = betfair.Betfair(
+        app_key='test', cert_file='path/to/cert', locale='local', keep_alive_idle=0.1,
+    )
+    client_.warm_up()
+    client_.session.post(client_.api_url, data='{}').content
+    assert len(local_server.connections) == 1
+    time.sleep(0.2)
+    # The idle connection is replaced rather than reused
+    client_.session.post(client_.api_url, data='{}').content
+    assert len(local_server.connections) == 2
+
+
+@pytest.yield_fixture
+def market_book_limited():
+    """Respond to `listMarketBook` with one book per requested market, or with
+    `TOO_MUCH_DATA` when more than three markets are requested.
+    """
+    def callback(request):
+        market_ids = json.loads(request.body)['params']['marketIds']
+        if len(market_ids) > 3:
+            body = {
+                'jsonrpc': '2.0',
+                'error': {'data': {'APINGException': {'errorCode': 'TOO_MUCH_DATA'}}},
+                'id': 1,
+            }
+        else:
+            result = [
+                {'marketId': market_id, 'isMarketDataDelayed': False}
+                for market_id in market_ids
+            ]
+            body = {'jsonrpc': '2.0', 'result': result, 'id': 1}
+        return (200, {}, json.dumps(body))
+    responses.add_callback(responses.POST, betfair.API_URLS[None], callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_iter_list_market_book_default_chunk_size(logged_in_client, market_book_echo):
+    market_ids = [str(idx) for idx in range(1, 101)]
+    projection = models.PriceProjection(price_data=[constants.PriceData.EX_ALL_OFFERS])
+    books = list(logged_in_client.iter_list_market_book(
+        market_ids, price_projection=projection,
+    ))
+    assert [book.market_id for book in books] == market_ids
+    # 200 // 17 markets per request
+    sizes = [
+        len(json.loads(call.request.body)['params']['marketIds'])
+        for call in market_book_echo.calls
+    ]
+    assert sizes == [11] * 9 + [1]
+
+
+@pytest.mark.parametrize('max_workers', [None, 2])
+def test_iter_list_market_book_split(logged_in_client, market_book_limited, max_workers):
+    market_ids = [str(idx) for idx in range(1, 11)]
+    books = logged_in_client.iter_list_market_book(
+        market_ids, chunk_size=10, max_workers=max_workers,
+    )
+    assert [book.market_id for book in books] == market_ids
+
+
+def test_split_list_market_book_single_market(logged_in_client, monkeypatch):
+    error = exceptions.ApiError(
+        utils.mock_response(200),
+        {'error': {'data': {'APINGException': {'errorCode': 'TOO_MUCH_DATA'}}}},
+    )
+
+    def list_market_book(market_ids, **kwargs):
+        raise error
+    monkeypatch.setattr(logged_in_client, 'list_market_book', list_market_book)
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        logged_in_client.split_list_market_book(['1', '2'])
+    assert excinfo.value is error
+
+
+@pytest.yield_fixture
+def api_error_response():
+    responses.add(
+        responses.POST,
+        betfair.API_URLS[None],
+        body=json.dumps({
+            'jsonrpc': '2.0',
+            'error': {'data': {'APINGException': {'errorCode': 'TOO_MUCH_DATA'}}},
+            'id': 1,
+        }),
+    )
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_api_error_parsed_once(logged_in_client, api_error_response):
+    calls = []
+    loads = logged_in_client.json_loads
+
+    def counting_loads(body):
+        calls.append(body)
+        return loads(body)
+    logged_in_client.json_loads = counting_loads
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        logged_in_client.list_market_book(['1.2'])
+    assert excinfo.value.message == 'TOO_MUCH_DATA'
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('backend', ['json', 'ujson', 'orjson'])
+def test_json_backend(backend, market_book_echo):
+    pytest.importorskip(backend)
+    client_ = betfair.Betfair(app_key='test', cert_file='path/to/cert', json_backend=backend)
+    client_.session_token = 'secret'
+    books = client_.list_market_book(['1', '2'])
+    assert [book.market_id for book in books] == ['1', '2']
+
+
+def test_list_market_book_representation(logged_in_client, market_book_echo):
+    books = logged_in_client.list_market_book(['1', '2'], representation='compact')
+    assert all(isinstance(book, compact.MarketBook) for book in books)
+    assert [book.market_id for book in books] == ['1', '2']
+    params = json.loads(market_book_echo.calls[0].request.body)['params']
+    assert 'representation' not in params
+
+
+def test_client_representation(market_book_echo):
+    client_ = betfair.Betfair(app_key='test', cert_file='path/to/cert', representation='compact')
+    client_.session_token = 'secret'
+    books = client_.list_market_book(['1'])
+    assert isinstance(books[0], compact.MarketBook)
+    books = client_.list_market_book(['1'], representation='model')
+    assert isinstance(books[0], models.MarketBook)
+
+
+def test_client_representation_invalid():
+    with pytest.raises(ValueError):
+        betfair.Betfair(app_key='test', cert_file='path/to/cert', representation='tuple')
+
+
+def test_iter_list_market_book_columnar(logged_in_client, market_book_limited):
+    pytest.importorskip('numpy')
+    market_ids = [str(idx) for idx in range(1, 9)]
+    books = logged_in_client.iter_list_market_book(
+        market_ids, chunk_size=4, representation='columnar',
+    )
+    assert [list(book.market_ids) for book in books] == [[market_id] for market_id in market_ids]
+
+
+@responses.activate
+def test_list_market_catalogue_lazy(logged_in_client):
+    result = [{'marketId': '1.2', 'description': {'bettingType': 'ODDS'}}]
+    responses.add(
+        responses.POST, betfair.API_URLS[None],
+        json={'jsonrpc': '2.0', 'result': result, 'id': 1},
+    )
+    markets = logged_in_client.list_market_catalogue(representation='lazy')
+    assert isinstance(markets[0], lazy.LazyModel)
+    assert markets[0].market_id == '1.2'
+    assert markets[0].description.betting_type == 'ODDS'
+
+
+def test_list_market_book_raw(logged_in_client, market_book_echo):
+    books = logged_in_client.list_market_book(['1'], representation='raw')
+    assert books == [{'marketId': '1', 'isMarketDataDelayed': False}]
+
+
+@responses.activate
+def test_list_market_catalogue_stream(logged_in_client):
+    result = [{'marketId': '1.2'}, {'marketId': '1.3'}]
+    responses.add(
+        responses.POST, betfair.API_URLS[None],
+        json={'jsonrpc': '2.0', 'result': result, 'id': 1},
+    )
+    markets = logged_in_client.list_market_catalogue(stream=True)
+    assert isinstance(markets, streaming.ResultStream)
+    assert [market.market_id for market in markets] == ['1.2', '1.3']
+    params = json.loads(responses.calls[0].request.body)['params']
+    assert 'stream' not in params
+
+
+def test_batch_stream(logged_in_client):
+    with pytest.raises(ValueError):
+        logged_in_client.batch().list_market_catalogue(stream=True)
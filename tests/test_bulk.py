@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from betfair import bulk
+from betfair import exceptions
+
+from tests.utils import FakeClient
+from tests.utils import place_instruction
+
+
+@pytest.fixture
+def fake():
+    """Fake client placing every instruction except those of parts sent with
+    the customer reference "ref-1", which raise.
+    """
+    fake = FakeClient()
+    fake.errors['ref-1'] = exceptions.BetfairError('TIMEOUT')
+    return fake
+
+
+@pytest.fixture
+def client(logged_in_client, fake, monkeypatch):
+    monkeypatch.setattr(logged_in_client, 'place_orders', fake.place_orders)
+    return logged_in_client
+
+
+def test_split_instructions():
+    instructions = [place_instruction(idx) for idx in range(450)]
+    parts = bulk.split_instructions('place_orders', instructions, 'ref')
+    assert [(part.start, len(part.instructions)) for part in parts] == [
+        (0, 200), (200, 200), (400, 50),
+    ]
+    assert [part.customer_ref for part in parts] == ['ref', 'ref-1', 'ref-2']
+    assert bulk.split_instructions('cancel_orders', [None] * 61)[1].start == 60
+
+
+def test_part_customer_ref_length():
+    customer_ref = 'x' * 32
+    assert bulk.get_part_customer_ref(customer_ref, 0) == customer_ref
+    assert bulk.get_part_customer_ref(customer_ref, 1) == 'x' * 30 + '-1'
+    assert bulk.get_part_customer_ref(customer_ref, 12) == 'x' * 29 + '-12'
+    assert bulk.get_part_customer_ref('ref', 1) == 'ref-1'
+
+
+def test_split_instructions_empty():
+    parts = bulk.split_instructions('cancel_orders', None)
+    assert [part.instructions for part in parts] == [None]
+
+
+def test_merge_single_part():
+    report = FakeClient().place_orders('1.1', [place_instruction(1)])
+    part = bulk.BulkPart(0, [place_instruction(1)], None, report, None)
+    result = bulk.merge_parts('place_orders', '1.1', None, [part])
+    assert result.report is report
+    assert result.failed_parts == []
+
+
+def test_merge_status():
+    instructions = [place_instruction(1)]
+    failed = FakeClient(status='FAILURE').place_orders('1.1', instructions)
+    parts = [
+        bulk.BulkPart(0, instructions, None, failed, None),
+        bulk.BulkPart(1, instructions, None, failed, None),
+    ]
+    assert bulk.merge_status(parts) == ('FAILURE', 'MARKET_SUSPENDED')
+    succeeded = FakeClient().place_orders('1.1', instructions)
+    parts.append(bulk.BulkPart(2, instructions, None, succeeded, None))
+    assert bulk.merge_status(parts) == ('PROCESSED_WITH_ERRORS', 'PROCESSED_WITH_ERRORS')
+
+
+@pytest.mark.parametrize('max_workers', [None, 1])
+def test_place_orders_bulk(client, fake, max_workers):
+    instructions = [place_instruction(idx) for idx in range(450)]
+    result = client.place_orders_bulk(
+        '1.1', instructions, customer_ref='ref', max_workers=max_workers,
+    )
+    customer_refs = sorted(customer_ref for _, _, _, customer_ref in fake.calls)
+    assert customer_refs == ['ref', 'ref-1', 'ref-2']
+    report = result.report
+    assert report.status == 'PROCESSED_WITH_ERRORS'
+    assert report.market_id == '1.1'
+    assert report.customer_ref == 'ref'
+    reports = report.instruction_reports
+    assert [each.instruction.selection_id for each in reports] == list(range(450))
+    assert [each.status for each in reports[195:205]] == ['SUCCESS'] * 5 + ['FAILURE'] * 5
+    assert reports[0].bet_id == '1.1-0'
+    assert reports[200].bet_id is None
+
+    failed, = result.failed_parts
+    assert failed.start == 200
+    assert failed.customer_ref == 'ref-1'
+    assert isinstance(failed.error, exceptions.BetfairError)
+    assert failed.report is None
+
+
+def test_place_orders_bulk_single_part(client, fake):
+    instructions = [place_instruction(idx) for idx in range(3)]
+    result = client.place_orders_bulk('1.1', instructions, customer_ref='ref')
+    assert len(fake.calls) == 1
+    assert result.report.status == 'SUCCESS'
+    assert len(result.report.instruction_reports) == 3
+    assert result.failed_parts == []
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+import json
+import time
+
+from betfair import models
+from betfair import betfair
+from betfair.cache import MemoryCache, SqliteCache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmpdir):
+    def make_cache(**kwargs):
+        if request.param == 'memory':
+            return MemoryCache(**kwargs)
+        return SqliteCache(str(tmpdir.join('cache.db')), **kwargs)
+    return make_cache
+
+
+class Counter(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [{'call': self.calls}]
+
+
+def test_call(make_cache):
+    cache = make_cache()
+    func = Counter()
+    assert cache.call('listEventTypes', 'key', func) == [{'call': 1}]
+    assert cache.call('listEventTypes', 'key', func) == [{'call': 1}]
+    assert func.calls == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_call_expired(make_cache):
+    cache = make_cache(ttls={'listEventTypes': 0.02})
+    func = Counter()
+    cache.call('listEventTypes', 'key', func)
+    time.sleep(0.03)
+    assert cache.call('listEventTypes', 'key', func) == [{'call': 2}]
+    assert cache.misses == 2
+
+
+def test_lru_eviction(make_cache):
+    cache = make_cache(max_size=2)
+    cache.set('key-1', 1, 60)
+    time.sleep(0.001)
+    cache.set('key-2', 2, 60)
+    time.sleep(0.001)
+    # Touch the first entry so that the second is least recently used
+    assert cache.get('key-1') == (True, 1)
+    time.sleep(0.001)
+    cache.set('key-3', 3, 60)
+    assert len(cache) == 2
+    assert cache.get('key-2') == (False, None)
+    assert cache.get('key-1') == (True, 1)
+    assert cache.get('key-3') == (True, 3)
+
+
+def test_clear(make_cache):
+    cache = make_cache()
+    cache.set('key', 1, 60)
+    cache.clear()
+    assert cache.get('key') == (False, None)
+
+
+def test_allows(make_cache):
+    cache = make_cache(ttls={'listVenues': 0})
+    assert cache.allows('listMarketCatalogue')
+    assert not cache.allows('listVenues')
+    assert not cache.allows('listMarketBook')
+    assert not cache.allows('placeOrders')
+
+
+@pytest.mark.parametrize('method', ['listMarketBook', 'placeOrders', 'getAccountFunds'])
+def test_invalid_ttls(method):
+    with pytest.raises(ValueError):
+        MemoryCache(ttls={method: 60})
+
+
+def test_sqlite_shared(tmpdir):
+    path = str(tmpdir.join('cache.db'))
+    SqliteCache(path).set('key', {'value': 1}, 60)
+    assert SqliteCache(path).get('key') == (True, {'value': 1})
+
+
+@pytest.yield_fixture
+def api():
+    def callback(request):
+        method = json.loads(request.body)['method'].split('/')[-1]
+        result = {
+            'listEventTypes': [{'eventType': {'id': '1', 'name': 'Soccer'}, 'marketCount': 3}],
+            'listMarketBook': [],
+        }[method]
+        return (200, {}, json.dumps({'jsonrpc': '2.0', 'result': result, 'id': 1}))
+    for url in (betfair.API_URLS[None], betfair.API_URLS['australia']):
+        responses.add_callback(responses.POST, url, callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_client_caches_navigation(logged_in_client, make_cache, api):
+    logged_in_client.cache = make_cache()
+    first = logged_in_client.list_event_types()
+    second = logged_in_client.list_event_types()
+    assert len(api.calls) == 1
+    assert isinstance(second[0], models.EventTypeResult)
+    assert second == first
+    assert second[0] is not first[0]
+
+
+def test_client_cache_key_params(logged_in_client, make_cache, api):
+    logged_in_client.cache = make_cache()
+    logged_in_client.list_event_types(models.MarketFilter(text_query='tennis'))
+    logged_in_client.list_event_types(models.MarketFilter(text_query='golf'))
+    assert len(api.calls) == 2
+
+
+def test_client_cache_key_locale(make_cache, api):
+    cache = make_cache()
+    clients = [
+        betfair.Betfair(app_key='test', cert_file='path/to/cert', locale=locale, cache=cache)
+        for locale in (None, 'australia', 'australia')
+    ]
+    for client in clients:
+        client.session_token = 'secret'
+        client.list_event_types()
+    assert [call.request.url for call in api.calls] == [
+        betfair.API_URLS[None], betfair.API_URLS['australia'],
+    ]
+
+
+def test_client_skips_market_book(logged_in_client, make_cache, api):
+    logged_in_client.cache = make_cache()
+    logged_in_client.list_market_book(['1.2'])
+    logged_in_client.list_market_book(['1.2'])
+    assert len(api.calls) == 2
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+import json
+import time
+import threading
+
+from betfair import betfair
+from betfair.coalesce import Coalescer
+
+
+class SlowCall(object):
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [value, self.calls]
+
+
+def run_concurrently(func, count=5):
+    results = []
+
+    def target():
+        try:
+            results.append(func())
+        except Exception as error:
+            results.append(error)
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_call_concurrent():
+    coalescer = Coalescer()
+    func = SlowCall()
+    results = run_concurrently(lambda: coalescer.call('key', func, 'value'))
+    assert func.calls == 1
+    assert all(result is results[0] for result in results)
+    assert results[0] == ['value', 1]
+    assert coalescer.hits == 4
+    assert coalescer.pending == {}
+
+
+def test_call_concurrent_error():
+    coalescer = Coalescer()
+    error = ValueError()
+    func = SlowCall(error=error)
+    results = run_concurrently(lambda: coalescer.call('key', func, 'value'))
+    assert func.calls == 1
+    assert results == [error] * 5
+    assert coalescer.pending == {}
+    assert coalescer.recent == {}
+
+
+def test_call_distinct_keys():
+    coalescer = Coalescer()
+    func = SlowCall(delay=0)
+    coalescer.call('key-1', func, 'value')
+    coalescer.call('key-2', func, 'value')
+    assert func.calls == 2
+
+
+def test_call_sequential_without_freshness():
+    coalescer = Coalescer()
+    func = SlowCall(delay=0)
+    assert coalescer.call('key', func, 'value') == ['value', 1]
+    assert coalescer.call('key', func, 'value') == ['value', 2]
+
+
+def test_call_freshness():
+    coalescer = Coalescer(freshness=0.05)
+    func = SlowCall(delay=0)
+    first = coalescer.call('key', func, 'value')
+    assert coalescer.call('key', func, 'value') is first
+    time.sleep(0.06)
+    assert coalescer.call('key', func, 'value') == ['value', 2]
+    assert func.calls == 2
+    assert list(coalescer.recent) == ['key']
+
+
+@pytest.yield_fixture
+def slow_api():
+    def callback(request):
+        time.sleep(0.05)
+        body = {
+            'jsonrpc': '2.0',
+            'result': {'status': 'SUCCESS', 'currentOrders': [], 'moreAvailable': False},
+            'id': 1,
+        }
+        return (200, {}, json.dumps(body))
+    responses.add_callback(responses.POST, betfair.API_URLS[None], callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_client_coalesces_reads(logged_in_client, slow_api):
+    logged_in_client.coalescer = Coalescer()
+    results = run_concurrently(lambda: logged_in_client.list_current_orders(market_ids=['1.2']))
+    assert len(slow_api.calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_client_distinct_params(logged_in_client, slow_api):
+    logged_in_client.coalescer = Coalescer()
+    run_concurrently(lambda: logged_in_client.list_current_orders(market_ids=['1.2']), 1)
+    run_concurrently(lambda: logged_in_client.list_current_orders(market_ids=['1.3']), 1)
+    assert len(slow_api.calls) == 2
+
+
+def test_client_skips_orders(logged_in_client, slow_api):
+    logged_in_client.coalescer = Coalescer()
+    run_concurrently(lambda: logged_in_client.place_orders('1.2', []), 3)
+    assert len(slow_api.calls) == 3
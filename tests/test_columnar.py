@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from betfair import utils
+from betfair import price
+from betfair import models
+
+from tests.utils import make_book, make_runner
+from tests.test_models import MARKET_BOOK
+
+np = pytest.importorskip('numpy')
+columnar = pytest.importorskip('betfair.columnar')
+
+
+def make_ladder_book(market_id, ladders):
+    runners = [
+        make_runner(selection_id, back, lay, back, sizes=(1.0, 2.0, 3.0))
+        for selection_id, (back, lay) in enumerate(ladders, 1)
+    ]
+    return make_book(runners, market_id, inplay=False, totalMatched=10.0)
+
+
+@pytest.fixture
+def books():
+    return [
+        make_ladder_book('1.1', [([2.0, 1.99], [2.02]), ([3.0], [3.05, 3.1])]),
+        make_ladder_book('1.2', [([1.5, 1.49, 1.48], [])]),
+    ]
+
+
+def assert_nan_equal(actual, expected):
+    np.testing.assert_array_equal(actual, np.array(expected, dtype=float))
+
+
+def test_unserialize(books):
+    columns = columnar.MarketBookColumns.unserialize(books)
+    assert len(columns) == 2
+    assert list(columns.market_ids) == ['1.1', '1.2']
+    assert list(columns.runner_offsets) == [0, 2, 3]
+    assert list(columns.book_index) == [0, 0, 1]
+    assert list(columns.selection_ids) == [1, 2, 1]
+    assert columns.depth == 3
+    nan = float('nan')
+    assert_nan_equal(columns.back_prices, [[2.0, 1.99, nan], [3.0, nan, nan], [1.5, 1.49, 1.48]])
+    assert_nan_equal(columns.lay_sizes, [[2.0, nan, nan], [2.0, 2.0, nan], [nan, nan, nan]])
+    assert list(columns.traded_offsets) == [0, 2, 3, 6]
+    prices, sizes = columns.traded_volume(1)
+    assert list(prices) == [3.0]
+    assert list(sizes) == [3.0]
+    assert np.isnan(columns.last_price_traded).all()
+
+
+def test_analytics(books):
+    columns = columnar.MarketBookColumns.unserialize(books)
+    assert_nan_equal(columns.best_back_prices(), [2.0, 3.0, 1.5])
+    assert_nan_equal(columns.best_lay_prices(), [2.02, 3.05, float('nan')])
+    assert_nan_equal(columns.weight_of_money(), [0.5, 0.2, 1.0])
+
+
+def test_getitem(books):
+    columns = columnar.MarketBookColumns.unserialize(books)
+    book = columns[-1]
+    assert list(book.market_ids) == ['1.2']
+    assert list(book.runner_offsets) == [0, 1]
+    assert list(book.traded_offsets) == [0, 3]
+    assert list(book.traded_prices) == [1.5, 1.49, 1.48]
+    assert [list(each.market_ids) for each in columns] == [['1.1'], ['1.2']]
+    with pytest.raises(IndexError):
+        columns[2]
+
+
+def test_concatenate(books):
+    columns = columnar.MarketBookColumns.unserialize(books)
+    first = columnar.MarketBookColumns.unserialize(books[:1])
+    second = columnar.MarketBookColumns.unserialize(books[1:])
+    assert first.depth == 2
+    joined = first + second
+    for name in ('runner_offsets', 'traded_offsets', 'selection_ids', 'traded_prices'):
+        assert list(getattr(joined, name)) == list(getattr(columns, name))
+    assert_nan_equal(joined.back_prices, columns.back_prices)
+
+
+def test_unserialize_empty():
+    columns = columnar.MarketBookColumns.unserialize([])
+    assert len(columns) == 0
+    assert columns.back_prices.shape == (0, 0)
+    assert columns.best_back_prices().shape == (0, )
+
+
+def test_process_result():
+    columns = utils.process_result([MARKET_BOOK], models.MarketBook, 'columnar')
+    assert isinstance(columns, columnar.MarketBookColumns)
+    assert list(columns.selection_ids) == [1, 2]
+    assert_nan_equal(columns.back_prices, [[2.5], [float('nan')]])
+    assert utils.process_result([], models.MarketProfitAndLoss, 'columnar') == []
+
+
+def test_unserialize_ticks(books):
+    ticks = columnar.MarketBookTicks.unserialize(books)
+    columns = columnar.MarketBookColumns.unserialize(books)
+    assert ticks.back_ticks.dtype == np.int16
+    assert ticks.back_ticks[2].tolist() == [
+        price.price_to_tick(value) for value in (1.5, 1.49, 1.48)
+    ]
+    assert ticks.lay_ticks[2].tolist() == [-1, -1, -1]
+    assert (ticks.last_traded_ticks == -1).all()
+    for name in ('back_prices', 'lay_prices', 'last_price_traded', 'traded_prices'):
+        assert_nan_equal(getattr(ticks, name), getattr(columns, name))
+    assert_nan_equal(ticks.best_lay_prices(), columns.best_lay_prices())
+    assert ticks.best_back_ticks().tolist() == ticks.back_ticks[:, 0].tolist()
+    assert list(ticks.traded_volume(1)[0]) == [3.0]
+    assert_nan_equal(ticks.to_columns().back_prices, columns.back_prices)
+
+
+def test_ticks_concatenate(books):
+    ticks = columnar.MarketBookTicks.unserialize(books)
+    joined = columnar.MarketBookTicks.unserialize(books[1:]) + ticks[0]
+    assert isinstance(joined, columnar.MarketBookTicks)
+    assert joined.back_ticks.dtype == np.int16
+    assert joined.back_ticks.tolist() == [
+        ticks.back_ticks[2].tolist(),
+        ticks.back_ticks[0].tolist(),
+        ticks.back_ticks[1].tolist(),
+    ]
+    assert joined.lay_ticks[2, 2] == -1
+
+
+def test_ticks_off_ladder(books):
+    books[0]['runners'][0]['ex']['availableToBack'][0]['price'] = 2.01
+    with pytest.raises(ValueError):
+        columnar.MarketBookTicks.unserialize(books)
+
+
+def test_process_result_ticks():
+    columns = utils.process_result([MARKET_BOOK], models.MarketBook, 'columnar_ticks')
+    assert isinstance(columns, columnar.MarketBookTicks)
+    assert columns.back_ticks.tolist() == [[price.price_to_tick(2.5)], [-1]]
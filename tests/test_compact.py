@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from schematics.exceptions import ModelConversionError
+
+from betfair import price
+from betfair import utils
+from betfair import models
+from betfair import compact
+from betfair import constants
+
+from tests.test_models import MARKET_BOOK
+from tests.test_models import assert_identical
+
+
+@pytest.mark.parametrize(('compact_class', 'model'), [
+    (compact.MarketBook, models.MarketBook),
+    (compact.Runner, models.Runner),
+    (compact.ExchangePrices, models.ExchangePrices),
+    (compact.StartingPrices, models.StartingPrices),
+    (compact.PriceSize, models.PriceSize),
+    (compact.Order, models.Order),
+    (compact.Match, models.Match),
+])
+def test_compact_slots(compact_class, model):
+    assert compact.COMPACT_MODELS[model] is compact_class
+    assert set(compact_class.__slots__) == set(model._fields)
+    assert not hasattr(compact_class.unserialize({}), '__dict__')
+
+
+def test_unserialize():
+    book = compact.MarketBook.unserialize(MARKET_BOOK)
+    full = models.MarketBook.unserialize(MARKET_BOOK)
+    assert book.market_id == full.market_id
+    assert book.status == 'OPEN'
+    assert book.runners[0].ex.available_to_lay[0].size == 5.0
+    assert isinstance(book.runners[0].ex.available_to_lay[0].size, float)
+    assert isinstance(book.runners[0].orders[0], compact.Order)
+    assert book.runners[1].selection_id == 2
+    assert book.runners[1].ex is None
+
+
+def test_to_model():
+    book = compact.MarketBook.unserialize(MARKET_BOOK)
+    assert_identical(book.to_model(), models.MarketBook.unserialize(MARKET_BOOK))
+
+
+def test_from_model():
+    full = models.MarketBook.unserialize(MARKET_BOOK)
+    assert compact.MarketBook.from_model(full) == compact.MarketBook.unserialize(MARKET_BOOK)
+    assert compact.from_model([full])[0].runners[0].status == 'ACTIVE'
+
+
+def test_init():
+    price_size = compact.PriceSize(price=2.5)
+    assert price_size.price == 2.5
+    assert price_size.size is None
+    assert price_size == compact.PriceSize(price=2.5, size=None)
+    assert price_size != compact.PriceSize(price=2.5, size=1)
+    assert repr(price_size) == 'PriceSize(price=2.5)'
+
+
+def test_unserialize_enum_member():
+    book = compact.MarketBook.unserialize({'status': constants.MarketStatus.CLOSED})
+    assert book.status == 'CLOSED'
+
+
+def test_unserialize_error():
+    with pytest.raises(ModelConversionError):
+        compact.MarketBook.unserialize({'status': 'UNKNOWN'})
+
+
+def test_tick_classes():
+    assert compact.TICK_MODELS[models.MarketBook] is compact.TickMarketBook
+    assert compact.COMPACT_MODELS[models.MarketBook] is compact.MarketBook
+    assert not hasattr(compact.TickPriceSize.unserialize({}), '__dict__')
+
+
+def test_unserialize_ticks():
+    book = compact.TickMarketBook.unserialize(MARKET_BOOK)
+    runner = book.runners[0]
+    assert isinstance(runner, compact.TickRunner)
+    back, lay = runner.ex.available_to_back[0], runner.ex.available_to_lay[0]
+    assert isinstance(back, compact.TickPriceSize)
+    assert back.price is price.Tick.from_price(back.price.price)
+    assert isinstance(back.size, float)
+    assert lay.price - back.price == price.ticks_difference(lay.price.price, back.price.price)
+    assert runner.orders[0].price is price.Tick.from_price(runner.orders[0].price.price)
+    assert_identical(book.to_model(), models.MarketBook.unserialize(MARKET_BOOK))
+
+
+def test_unserialize_ticks_off_ladder():
+    price_size = compact.TickPriceSize.unserialize({'price': 2.51, 'size': 1})
+    assert price_size.price == 2.51
+    assert not isinstance(price_size.price, price.Tick)
+
+
+def test_from_model_ticks():
+    full = models.MarketBook.unserialize(MARKET_BOOK)
+    book = compact.TickMarketBook.from_model(full)
+    assert book == compact.TickMarketBook.unserialize(MARKET_BOOK)
+    assert isinstance(book.runners[0].ex.available_to_back[0].price, price.Tick)
+
+
+def test_unserialize_ticks_error():
+    with pytest.raises(ModelConversionError):
+        compact.TickPriceSize.unserialize({'price': 'high', 'size': 1})
+
+
+def test_process_result_ticks():
+    books = utils.process_result([MARKET_BOOK], models.MarketBook, 'compact_ticks')
+    assert isinstance(books[0], compact.TickMarketBook)
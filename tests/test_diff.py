@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import random
+
+import pytest
+
+from betfair import models
+from betfair import compact
+from betfair.diff import diff, apply, replace
+
+from tests.utils import make_book, make_runner
+from tests.test_models import MARKET_BOOK
+from benchmarks.payloads import make_market_books
+
+
+@pytest.fixture
+def previous():
+    return make_book([
+        make_runner(1, [(2.0, 10), (1.99, 5)], [(2.02, 8)], [(2.0, 100)], lastPriceTraded=2.0),
+        make_runner(2, [(3.0, 4)], [(3.05, 6), (3.1, 2)], [], lastPriceTraded=3.0),
+    ])
+
+
+def unserialize(book, cls=models.MarketBook):
+    return cls.unserialize(copy.deepcopy(book))
+
+
+def test_diff_equal(previous):
+    assert diff(unserialize(previous), unserialize(previous)) is None
+    assert apply(unserialize(previous), None) == unserialize(previous)
+
+
+def test_diff_ladders(previous):
+    current = copy.deepcopy(previous)
+    current['runners'][0] = make_runner(
+        1, [(1.99, 5), (1.98, 3)], [(2.0, 1), (2.02, 9)], [(1.99, 20), (2.0, 100)],
+        lastPriceTraded=1.99,
+    )
+    delta = diff(unserialize(previous), unserialize(current))
+    assert delta.market_id == '1.1'
+    assert delta.fields == {}
+    assert (delta.added, delta.removed, delta.order) == ([], [], None)
+    runner, = delta.runners
+    assert (runner.selection_id, runner.handicap) == (1, 0.0)
+    assert runner.fields == {'last_price_traded': 1.99}
+    assert sorted(runner.back) == [(1.98, 3), (2.0, 0)]
+    assert sorted(runner.lay) == [(2.0, 1), (2.02, 9)]
+    assert runner.traded == [(1.99, 20, 20)]
+    assert runner.best_back_moved
+    assert runner.best_lay_moved
+
+
+def test_diff_sizes_only(previous):
+    current = copy.deepcopy(previous)
+    current['runners'][1]['ex']['availableToLay'][0]['size'] = 7
+    current['runners'][1]['ex']['tradedVolume'] = [{'price': 3.05, 'size': 1}]
+    delta = diff(unserialize(previous), unserialize(current))
+    runner, = delta.runners
+    assert runner.selection_id == 2
+    assert runner.lay == [(3.05, 7)]
+    assert runner.traded == [(3.05, 1, 1)]
+    assert not runner.best_back_moved
+    assert not runner.best_lay_moved
+
+
+def test_diff_book_fields_and_runners(previous):
+    current = copy.deepcopy(previous)
+    current['status'] = 'SUSPENDED'
+    del current['runners'][0]
+    current['runners'].append(make_runner(3, [], [], []))
+    old, new = unserialize(previous), unserialize(current)
+    delta = diff(old, new)
+    assert delta.fields == {'status': 'SUSPENDED'}
+    assert delta.added == [new.runners[1]]
+    assert delta.removed == [(1, 0.0)]
+    assert delta.order == [(2, 0.0), (3, 0.0)]
+    assert apply(old, delta) == new
+
+
+def test_diff_ex_missing(previous):
+    current = copy.deepcopy(previous)
+    del current['runners'][0]['ex']
+    old, new = unserialize(previous), unserialize(current)
+    delta = diff(old, new)
+    assert delta.runners[0].fields == {'ex': None}
+    assert delta.runners[0].best_back_moved
+    assert apply(old, delta) == new
+
+
+def test_diff_other_market(previous):
+    other = make_book([], market_id='1.2')
+    with pytest.raises(ValueError):
+        diff(unserialize(previous), unserialize(other))
+    delta = diff(unserialize(other), unserialize(dict(other, status='CLOSED')))
+    with pytest.raises(ValueError):
+        apply(unserialize(previous), delta)
+
+
+def test_apply_shares_unchanged(previous):
+    current = copy.deepcopy(previous)
+    current['runners'][0]['ex']['availableToLay'][0]['size'] = 1
+    old = unserialize(previous)
+    new = apply(old, diff(old, unserialize(current)))
+    assert new == unserialize(current)
+    assert new.runners[1] is old.runners[1]
+    assert new.runners[0].ex.available_to_back[0] is old.runners[0].ex.available_to_back[0]
+    # The earlier snapshot is unchanged
+    assert old == unserialize(previous)
+
+
+def mutate(book, rng):
+    book = copy.deepcopy(book)
+    book['totalMatched'] = rng.choice([book.get('totalMatched'), rng.randrange(1000)])
+    for runner in book['runners']:
+        ex = runner['ex']
+        for name in ('availableToBack', 'availableToLay', 'tradedVolume'):
+            levels = dict((level['price'], level['size']) for level in ex[name])
+            for _ in range(rng.randrange(3)):
+                price = rng.choice([1.5, 1.6, 1.7, 2.0, 2.5, 3.0])
+                if rng.random() < 0.3:
+                    levels.pop(price, None)
+                else:
+                    levels[price] = rng.randrange(1, 100)
+            ex[name] = [
+                {'price': price, 'size': size}
+                for price, size in sorted(levels.items(), reverse=name == 'availableToBack')
+            ]
+        if rng.random() < 0.2:
+            runner['status'] = rng.choice(['ACTIVE', 'REMOVED'])
+    return book
+
+
+@pytest.mark.parametrize('cls', [models.MarketBook, compact.MarketBook, compact.TickMarketBook])
+def test_apply_reconstructs(previous, cls):
+    rng = random.Random(0)
+    books = [previous]
+    for _ in range(50):
+        books.append(mutate(books[-1], rng))
+    snapshots = [unserialize(book, cls) for book in books]
+    state = snapshots[0]
+    for old, new in zip(snapshots, snapshots[1:]):
+        state = apply(state, diff(old, new))
+        assert state == new
+
+
+@pytest.mark.parametrize('cls', [models.MarketBook, compact.MarketBook, compact.TickMarketBook])
+def test_apply_reconstructs_payloads(cls):
+    previous = make_market_books(count=3, runners=5, depth=5)
+    current = copy.deepcopy(previous)
+    for book in current:
+        for runner in book['runners']:
+            traded = runner['ex']['tradedVolume']
+            traded[0]['size'] += 10
+            traded[-1]['size'] += 5
+            del traded[len(traded) // 2]
+            runner['ex']['availableToBack'][0]['size'] += 1
+    for old, new in zip(previous, current):
+        old, new = unserialize(old, cls), unserialize(new, cls)
+        assert apply(old, diff(old, new)) == new
+
+
+def test_apply_market_book_fixture():
+    old = unserialize(MARKET_BOOK)
+    current = copy.deepcopy(MARKET_BOOK)
+    current['runners'][0]['ex']['availableToBack'][0]['size'] += 1
+    current['runners'][0]['orders'] = []
+    new = unserialize(current)
+    delta = diff(old, new)
+    assert delta.runners[0].fields == {'orders': []}
+    assert apply(old, delta) == new
+
+
+def test_replace():
+    price_size = models.PriceSize(price=2.0, size=1.0)
+    assert replace(price_size, size=2.0) == models.PriceSize(price=2.0, size=2.0)
+    assert price_size.size == 1.0
+    compact_size = compact.PriceSize(price=2.0, size=1.0)
+    assert replace(compact_size, size=2.0) == compact.PriceSize(price=2.0, size=2.0)
+    with pytest.raises(TypeError):
+        replace({'price': 2.0})
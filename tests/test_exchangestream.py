@@ -0,0 +1,535 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+
+from betfair import models
+from betfair import compact
+from betfair import constants
+from betfair import exceptions
+from betfair.exchangestream import MarketStream, OrderStream, get_stream_filter
+
+from tests.utils import FakeStreamServer
+
+
+MARKET_DEFINITION = {
+    'status': 'OPEN',
+    'betDelay': 0,
+    'inPlay': False,
+    'numberOfWinners': 1,
+    'numberOfActiveRunners': 2,
+    'bspReconciled': False,
+    'complete': True,
+    'crossMatching': True,
+    'runnersVoidable': False,
+    'version': 123,
+    'runners': [
+        {'id': 2, 'sortPriority': 2, 'status': 'ACTIVE'},
+        {'id': 1, 'sortPriority': 1, 'status': 'ACTIVE', 'adjustmentFactor': 54.2},
+    ],
+}
+
+
+def make_image(market_id='1.1', clk='AAA', **kwargs):
+    return dict({
+        'op': 'mcm',
+        'ct': 'SUB_IMAGE',
+        'initialClk': 'INIT',
+        'clk': clk,
+        'pt': 1000,
+        'mc': [{
+            'id': market_id,
+            'img': True,
+            'tv': 150.0,
+            'marketDefinition': MARKET_DEFINITION,
+            'rc': [
+                {
+                    'id': 1,
+                    'atb': [[2.0, 10.0], [1.99, 5.0]],
+                    'atl': [[2.02, 8.0]],
+                    'trd': [[2.0, 100.0]],
+                    'ltp': 2.0,
+                    'tv': 100.0,
+                },
+                {'id': 2, 'atb': [[3.0, 4.0]], 'atl': [[3.05, 6.0]]},
+            ],
+        }],
+    }, **kwargs)
+
+
+def make_delta(changes, market_id='1.1', clk='BBB', **kwargs):
+    return dict({
+        'op': 'mcm',
+        'clk': clk,
+        'pt': 2000,
+        'mc': [dict({'id': market_id}, **changes)],
+    }, **kwargs)
+
+
+@pytest.yield_fixture
+def server():
+    with FakeStreamServer(on_subscribe=lambda request: [make_image()]) as server:
+        yield server
+
+
+@pytest.yield_fixture
+def stream(logged_in_client, server):
+    stream = MarketStream(logged_in_client, host='127.0.0.1', port=server.port, secure=False,
+                          timeout=5, retry_delay=0.05)
+    yield stream
+    stream.stop()
+
+
+def subscribe(stream, server):
+    stream.subscribe(models.MarketFilter(market_ids=['1.1']))
+    stream.receive()
+
+
+def test_subscribe(stream, server):
+    status = stream.subscribe(
+        models.MarketFilter(event_type_ids=['7'], market_countries=['GB']),
+        fields=[constants.MarketDataField.EX_ALL_OFFERS, constants.MarketDataField.EX_MARKET_DEF],
+        ladder_levels=3,
+        conflate_ms=500,
+        heartbeat_ms=1000,
+    )
+    assert status['statusCode'] == 'SUCCESS'
+    assert stream.connection_id == '002-000000000001'
+    authentication, = server.wait_for('authentication')
+    assert (authentication['appKey'], authentication['session']) == ('test', 'secret')
+    subscription, = server.wait_for('marketSubscription')
+    assert subscription['marketFilter'] == {'eventTypeIds': ['7'], 'countryCodes': ['GB']}
+    assert subscription['marketDataFilter'] == {
+        'fields': ['EX_ALL_OFFERS', 'EX_MARKET_DEF'],
+        'ladderLevels': 3,
+    }
+    assert (subscription['conflateMs'], subscription['heartbeatMs']) == (500, 1000)
+    assert subscription['segmentationEnabled'] is True
+
+
+def test_image(stream, server):
+    subscribe(stream, server)
+    assert '1.1' in stream
+    assert (stream.initial_clk, stream.clk, stream.publish_time) == ('INIT', 'AAA', 1000)
+    book = stream.get_market_book('1.1')
+    assert isinstance(book, models.MarketBook)
+    assert book.market_id == '1.1'
+    assert book.status == 'OPEN'
+    assert book.inplay is False
+    assert book.version == 123
+    assert book.total_matched == 150.0
+    assert book.number_of_runners == 2
+    # Runners are ordered by sort priority
+    assert [runner.selection_id for runner in book.runners] == [1, 2]
+    runner = book.runners[0]
+    assert runner.adjustment_factor == 54.2
+    assert runner.last_price_traded == 2.0
+    assert [(level.price, level.size) for level in runner.ex.available_to_back] == [
+        (2.0, 10.0), (1.99, 5.0),
+    ]
+    assert runner.ex.available_to_lay[0].price == 2.02
+    assert runner.ex.traded_volume[0].size == 100.0
+    assert stream.get_market_book('1.1') is book
+
+
+def test_deltas(stream, server):
+    subscribe(stream, server)
+    server.send(make_delta({
+        'tv': 175.0,
+        'rc': [{
+            'id': 1,
+            'atb': [[2.0, 0], [1.98, 3.0]],
+            'atl': [[2.0, 1.0]],
+            'trd': [[1.99, 25.0]],
+            'ltp': 1.99,
+        }],
+    }))
+    stream.receive()
+    assert stream.clk == 'BBB'
+    book = stream.get_market_book('1.1')
+    assert book.total_matched == 175.0
+    runner = book.runners[0]
+    assert runner.last_price_traded == 1.99
+    assert [level.price for level in runner.ex.available_to_back] == [1.99, 1.98]
+    assert [level.price for level in runner.ex.available_to_lay] == [2.0, 2.02]
+    assert [level.price for level in runner.ex.traded_volume] == [1.99, 2.0]
+    assert book.runners[1].ex.available_to_back[0].price == 3.0
+
+
+def test_best_offer_levels(stream, server):
+    server.on_subscribe = lambda request: [make_image(mc=[{
+        'id': '1.1',
+        'img': True,
+        'rc': [{'id': 1, 'batb': [[0, 2.0, 10.0], [1, 1.99, 5.0]], 'batl': [[0, 2.02, 8.0]]}],
+    }])]
+    subscribe(stream, server)
+    server.send(make_delta({'rc': [{'id': 1, 'batb': [[0, 2.02, 1.0], [1, 2.0, 10.0]]}]}))
+    stream.receive()
+    server.send(make_delta({'rc': [{'id': 1, 'batb': [[1, 0, 0]]}]}))
+    stream.receive()
+    runner, = stream.get_market_book('1.1').runners
+    assert [(level.price, level.size) for level in runner.ex.available_to_back] == [(2.02, 1.0)]
+    assert runner.ex.available_to_lay[0].price == 2.02
+    assert runner.ex.traded_volume == []
+    # Without a market definition, runners are active
+    assert runner.status == 'ACTIVE'
+
+
+def test_starting_prices(stream, server):
+    subscribe(stream, server)
+    server.send(make_delta({'rc': [{'id': 2, 'spn': 3.1, 'spf': 3.2, 'spb': [[3.0, 20.0]]}]}))
+    stream.receive()
+    runner = stream.get_market_book('1.1').runners[1]
+    assert (runner.sp.near_price, runner.sp.far_price) == (3.1, 3.2)
+    assert runner.sp.back_stake_taken[0].size == 20.0
+    assert stream.get_market_book('1.1').runners[0].sp is None
+
+
+def test_market_definition(stream, server):
+    subscribe(stream, server)
+    definition = dict(MARKET_DEFINITION, status='SUSPENDED', inPlay=True, runners=[
+        {'id': 1, 'sortPriority': 1, 'status': 'WINNER'},
+        {'id': 2, 'sortPriority': 2, 'status': 'LOSER'},
+        {'id': 3, 'sortPriority': 3, 'status': 'REMOVED'},
+    ])
+    server.send(make_delta({'marketDefinition': definition}))
+    stream.receive()
+    book = stream.get_market_book('1.1')
+    assert book.status == 'SUSPENDED'
+    assert book.inplay is True
+    assert [(runner.selection_id, runner.status) for runner in book.runners] == [
+        (1, 'WINNER'), (2, 'LOSER'), (3, 'REMOVED'),
+    ]
+    assert book.runners[2].ex is None
+
+
+def test_new_image_replaces_market(stream, server):
+    subscribe(stream, server)
+    server.send(make_image(mc=[{'id': '1.1', 'img': True, 'rc': [{'id': 5, 'atb': [[4.0, 1.0]]}]}]))
+    stream.receive()
+    book = stream.get_market_book('1.1')
+    assert [runner.selection_id for runner in book.runners] == [5]
+    assert book.status is None
+
+
+def test_segments_and_listeners(stream, server):
+    received = []
+    stream.add_listener(received.append)
+    subscribe(stream, server)
+    assert received == [['1.1']]
+    server.send(make_delta({'rc': [{'id': 1, 'ltp': 2.02}]}, segmentType='SEG_START'))
+    server.send(make_delta({'rc': []}, market_id='1.2', segmentType='SEG'))
+    server.send(make_delta({'rc': [{'id': 2, 'ltp': 3.0}]}, segmentType='SEG_END'))
+    stream.receive()
+    stream.receive()
+    assert received == [['1.1']]
+    assert stream.get_market_book('1.1').runners[0].last_price_traded == 2.02
+    stream.receive()
+    assert received == [['1.1'], ['1.1', '1.2']]
+    stream.remove_listener(received.append)
+    server.send(make_delta({'rc': [{'id': 1, 'ltp': 2.04}]}))
+    stream.receive()
+    assert len(received) == 2
+
+
+def test_heartbeat(stream, server):
+    received = []
+    stream.add_listener(received.append)
+    subscribe(stream, server)
+    book = stream.get_market_book('1.1')
+    server.send({'op': 'mcm', 'ct': 'HEARTBEAT', 'clk': 'CCC', 'pt': 3000})
+    stream.receive()
+    assert stream.clk == 'CCC'
+    assert stream.initial_clk == 'INIT'
+    assert received == [['1.1']]
+    assert stream.get_market_book('1.1') is book
+    assert stream.heartbeat()['statusCode'] == 'SUCCESS'
+
+
+def test_conflation(stream, server):
+    subscribe(stream, server)
+    assert not stream.markets['1.1'].conflated
+    server.send(make_delta({'con': True, 'rc': [{'id': 1, 'ltp': 2.02}]}, conflateMs=500))
+    stream.receive()
+    assert stream.markets['1.1'].conflated
+    assert stream.conflate_ms == 500
+
+
+def test_remove(stream, server):
+    subscribe(stream, server)
+    stream.remove('1.1')
+    assert len(stream) == 0
+    with pytest.raises(KeyError):
+        stream.get_market_book('1.1')
+
+
+def test_compact_representation(logged_in_client, server):
+    stream = MarketStream(
+        logged_in_client, representation='compact', host='127.0.0.1', port=server.port,
+        secure=False,
+    )
+    with stream:
+        subscribe(stream, server)
+        book = stream.get_market_book('1.1')
+        assert isinstance(book, compact.MarketBook)
+        assert book.runners[0].ex.available_to_back[0].price == 2.0
+        assert stream.market_books() == [book]
+
+
+def test_background_thread_resubscribes(stream, server):
+    updated = threading.Event()
+    stream.add_listener(lambda market_ids: updated.set())
+    stream.subscribe(models.MarketFilter(market_ids=['1.1']))
+    stream.start()
+    assert updated.wait(5)
+    updated.clear()
+    server.send(make_delta({'rc': [{'id': 1, 'ltp': 2.02}]}))
+    assert updated.wait(5)
+    assert stream.get_market_book('1.1').runners[0].last_price_traded == 2.02
+    resubscribed = make_delta({'rc': [{'id': 1, 'ltp': 2.04}]}, clk='DDD', ct='RESUB_DELTA')
+    server.on_subscribe = lambda request: [resubscribed]
+    updated.clear()
+    server.disconnect()
+    first, second = server.wait_for('marketSubscription', count=2)
+    assert 'clk' not in first
+    assert (second['initialClk'], second['clk']) == ('INIT', 'BBB')
+    assert second['marketFilter'] == {'marketIds': ['1.1']}
+    assert updated.wait(5)
+    assert stream.clk == 'DDD'
+    book = stream.get_market_book('1.1')
+    assert book.runners[0].last_price_traded == 2.04
+    assert book.runners[1].ex.available_to_back[0].price == 3.0
+    # Requests from other threads wait for the reading thread
+    assert stream.heartbeat()['statusCode'] == 'SUCCESS'
+    stream.stop()
+    assert not stream.connected
+
+
+def test_resubscribe_failure_stops(stream, server):
+    stream.subscribe(models.MarketFilter(market_ids=['1.1']))
+    stream.start()
+    server.session_token = 'expired'
+    server.disconnect()
+    stream.thread.join(5)
+    assert not stream.thread.is_alive()
+    assert stream.error.message == 'INVALID_SESSION_INFORMATION'
+
+
+def test_listener_error(stream, server):
+    received = []
+
+    def failing(market_ids):
+        raise RuntimeError('listener failed')
+    stream.add_listener(failing)
+    stream.add_listener(received.append)
+    stream.subscribe(models.MarketFilter(market_ids=['1.1']))
+    stream.start()
+    server.send(make_delta({'rc': [{'id': 1, 'ltp': 2.02}]}))
+    deadline = time.time() + 5
+    while len(received) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert received == [['1.1'], ['1.1']]
+    assert stream.thread.is_alive()
+    assert stream.error is None
+
+
+def test_unexpected_error_stops(stream, server):
+    stream.subscribe(models.MarketFilter(market_ids=['1.1']))
+    stream.start()
+    server.send({'op': 'mcm', 'clk': 'BBB', 'mc': [{'rc': []}]})
+    assert stream.stopped.wait(5)
+    stream.thread.join(5)
+    assert not stream.thread.is_alive()
+    assert isinstance(stream.error, KeyError)
+    assert not stream.connected
+
+
+def test_authentication_failure(logged_in_client, server):
+    logged_in_client.session_token = 'wrong'
+    stream = MarketStream(logged_in_client, host='127.0.0.1', port=server.port, secure=False)
+    with pytest.raises(exceptions.StreamError) as error:
+        stream.subscribe()
+    assert error.value.message == 'INVALID_SESSION_INFORMATION'
+    assert error.value.connection_closed
+    assert not stream.connected
+
+
+def test_not_logged_in(client, server):
+    stream = MarketStream(client, host='127.0.0.1', port=server.port, secure=False)
+    with pytest.raises(exceptions.NotLoggedIn):
+        stream.start()
+
+
+def test_get_stream_filter():
+    assert get_stream_filter() == {}
+    assert get_stream_filter({'raceTypes': ['Flat']}) == {'raceTypes': ['Flat']}
+    market_filter = models.MarketFilter(
+        market_ids=['1.1'],
+        venues=['Ascot'],
+        bsp_only=True,
+        turn_in_play_enabled=False,
+        market_betting_types=[constants.MarketBettingType.ODDS],
+        market_type_codes=['WIN'],
+    )
+    assert get_stream_filter(market_filter) == {
+        'marketIds': ['1.1'],
+        'venues': ['Ascot'],
+        'bspMarket': True,
+        'turnInPlayEnabled': False,
+        'bettingTypes': ['ODDS'],
+        'marketTypes': ['WIN'],
+    }
+    with pytest.raises(ValueError):
+        get_stream_filter(models.MarketFilter(text_query='tennis'))
+
+
+@pytest.mark.parametrize('representation', ['columnar', 'tuple'])
+def test_invalid_representation(logged_in_client, representation):
+    with pytest.raises(ValueError):
+        MarketStream(logged_in_client, representation=representation)
+
+
+def make_order(bet_id='1', **kwargs):
+    return dict({
+        'id': bet_id,
+        'p': 2.0,
+        's': 10.0,
+        'bsp': 0,
+        'side': 'B',
+        'status': 'E',
+        'pt': 'L',
+        'ot': 'L',
+        'pd': 1451649600000,
+        'sm': 0,
+        'sr': 10.0,
+        'sl': 0,
+        'sc': 0,
+        'sv': 0,
+        'rac': '',
+        'rc': 'REG_GGC',
+    }, **kwargs)
+
+
+def make_order_change(orders, market_id='1.1', selection_id=1, clk='BBB', **kwargs):
+    return {
+        'op': 'ocm',
+        'clk': clk,
+        'pt': 2000,
+        'oc': [dict({'id': market_id, 'orc': [{'id': selection_id, 'uo': orders}]}, **kwargs)],
+    }
+
+
+@pytest.yield_fixture
+def order_stream(logged_in_client, server):
+    server.on_subscribe = lambda request: [dict(
+        make_order_change([make_order('1'), make_order('2', side='L', p=3.0)]),
+        ct='SUB_IMAGE',
+        initialClk='INIT',
+    )]
+    stream = OrderStream(logged_in_client, host='127.0.0.1', port=server.port, secure=False)
+    stream.subscribe()
+    stream.receive()
+    yield stream
+    stream.stop()
+
+
+def test_order_subscribe(order_stream, server):
+    subscription, = server.wait_for('orderSubscription')
+    assert subscription['orderFilter'] == {
+        'includeOverallPosition': True,
+        'partitionMatchedByStrategyRef': False,
+    }
+    order_stream.subscribe(customer_strategy_refs=['ref'], heartbeat_ms=500)
+    subscription = server.wait_for('orderSubscription', count=2)[-1]
+    assert subscription['orderFilter']['customerStrategyRefs'] == ['ref']
+    assert subscription['heartbeatMs'] == 500
+    # A new subscription clears the cache
+    assert len(order_stream) == 0
+
+
+def test_order_image(order_stream):
+    assert len(order_stream) == 2
+    assert '1' in order_stream
+    order = order_stream.get_order('1')
+    assert isinstance(order, models.CurrentOrderSummary)
+    assert (order.bet_id, order.market_id, order.selection_id, order.handicap) == (
+        '1', '1.1', 1, 0.0,
+    )
+    assert (order.price_size.price, order.price_size.size) == (2.0, 10.0)
+    assert (order.side, order.status) == ('BACK', 'EXECUTABLE')
+    assert (order.persistence_type, order.order_type) == ('LAPSE', 'LIMIT')
+    assert order.placed_date.isoformat() == '2016-01-01T12:00:00'
+    assert order.size_remaining == 10.0
+    assert order_stream.get_order('2').side == 'LAY'
+    assert order_stream.get_orders('1.1', 1) == [order, order_stream.get_order('2')]
+    assert order_stream.get_orders('1.1', 2) == []
+    assert order_stream.get_orders('1.2') == []
+
+
+def test_order_events(order_stream, server):
+    received = []
+    fills = []
+    order_stream.add_order_listener(received.append)
+    order_stream.add_order_listener(fills.append, events=['fill'])
+    previous = order_stream.get_order('1')
+    server.send(make_order_change([
+        make_order('1', sm=4.0, sr=6.0, avp=2.0, md=1451649601000),
+        make_order('2', p=3.0, side='L', status='EC', sc=10.0, sr=0),
+    ]))
+    order_stream.receive()
+    fill, cancel = received
+    assert (fill.event, fill.size, fill.previous) == ('fill', 4.0, previous)
+    assert fill.order is order_stream.get_order('1')
+    assert fill.order.size_matched == 4.0
+    assert fill.order.average_price_matched == 2.0
+    assert fill.order.matched_date.isoformat() == '2016-01-01T12:00:01'
+    assert (cancel.event, cancel.size) == ('cancel', 10.0)
+    assert cancel.order.status == 'EXECUTION_COMPLETE'
+    assert fills == [fill]
+    # Unchanged orders do not fire events
+    server.send(make_order_change([make_order('1', sm=4.0, sr=6.0, avp=2.0, md=1451649601000)]))
+    server.send(make_order_change([make_order('1', status='EC', sm=4.0, sl=6.0, sr=0)]))
+    order_stream.receive()
+    order_stream.receive()
+    assert [change.event for change in received] == ['fill', 'cancel', 'lapse']
+    order_stream.remove_order_listener(received.append)
+    server.send(make_order_change([make_order('3', sm=10.0, sr=0)]))
+    order_stream.receive()
+    assert len(received) == 3
+    assert len(fills) == 2
+    with pytest.raises(ValueError):
+        order_stream.add_order_listener(received.append, events=['match'])
+
+
+def test_order_matched(order_stream, server):
+    change = make_order_change([])
+    change['oc'][0]['orc'][0].update({'mb': [[2.0, 4.0], [2.02, 1.0]], 'ml': [[3.0, 2.0]]})
+    server.send(change)
+    order_stream.receive()
+    change['oc'][0]['orc'][0].update({'mb': [[2.02, 0]], 'ml': []})
+    server.send(change)
+    order_stream.receive()
+    assert order_stream.get_matched('1.1', 1) == ({2.0: 4.0}, {3.0: 2.0})
+
+
+def test_order_full_image_and_closed(order_stream, server):
+    change = make_order_change([make_order('3', p=5.0)])
+    change['oc'][0]['orc'][0]['fullImage'] = True
+    server.send(change)
+    order_stream.receive()
+    assert [order.bet_id for order in order_stream.get_orders()] == ['3']
+    assert '1' not in order_stream
+    server.send(make_order_change([make_order('4')], market_id='1.2'))
+    server.send(make_order_change([], closed=True))
+    order_stream.receive()
+    order_stream.receive()
+    assert [order.bet_id for order in order_stream.get_orders()] == ['4']
+    with pytest.raises(KeyError):
+        order_stream.get_order('3')
+
+
+def test_order_invalid_representation(logged_in_client):
+    with pytest.raises(ValueError):
+        OrderStream(logged_in_client, representation='compact')
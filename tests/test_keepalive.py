@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import responses
+
+import json
+import time
+import threading
+
+from betfair import betfair
+from betfair import exceptions
+from betfair.keepalive import SessionKeeper
+
+
+class FakeLogin(object):
+    """Stand-in for `Betfair.login` issuing sequential session tokens."""
+    def __init__(self, client, delay=0):
+        self.client = client
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, username, password):
+        self.calls.append((username, password))
+        time.sleep(self.delay)
+        self.client.session_token = 'token-{0}'.format(len(self.calls))
+
+
+@pytest.fixture
+def fake_login(logged_in_client, monkeypatch):
+    login = FakeLogin(logged_in_client)
+    monkeypatch.setattr(logged_in_client, 'login', login)
+    return login
+
+
+@pytest.fixture
+def keeper(logged_in_client, fake_login):
+    return SessionKeeper(logged_in_client, 'name', 'pass', interval=0.01)
+
+
+@pytest.yield_fixture
+def session_checking_api():
+    """Respond to API requests with a result only for the token `token-1`."""
+    def callback(request):
+        if request.headers['X-Authentication'] == 'token-1':
+            body = {'jsonrpc': '2.0', 'result': {'availableToBetBalance': 1.0}, 'id': 1}
+        else:
+            body = {
+                'jsonrpc': '2.0',
+                'error': {
+                    'data': {'APINGException': {'errorCode': 'INVALID_SESSION_INFORMATION'}},
+                },
+                'id': 1,
+            }
+        return (200, {}, json.dumps(body))
+    responses.add_callback(responses.POST, betfair.API_URLS[None], callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_relogin(keeper, fake_login):
+    assert keeper.relogin('secret') == 'token-1'
+    assert fake_login.calls == [('name', 'pass')]
+
+
+def test_relogin_already_replaced(keeper, fake_login):
+    keeper.relogin('secret')
+    assert keeper.relogin('secret') == 'token-1'
+    assert len(fake_login.calls) == 1
+
+
+def test_relogin_concurrent(keeper, fake_login):
+    fake_login.delay = 0.05
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(keeper.relogin('secret')))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tokens == ['token-1'] * 5
+    assert len(fake_login.calls) == 1
+
+
+def test_retry_invalid_session(logged_in_client, keeper, session_checking_api):
+    logged_in_client.session_keeper = keeper
+    funds = logged_in_client.get_account_funds()
+    assert funds.available_to_bet_balance == 1.0
+    tokens = [call.request.headers['X-Authentication'] for call in session_checking_api.calls]
+    assert tokens == ['secret', 'token-1']
+
+
+def test_retry_once(logged_in_client, keeper, fake_login, session_checking_api):
+    logged_in_client.session_keeper = keeper
+    # Every login yields a token the API rejects
+    fake_login.calls.append(None)
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        logged_in_client.get_account_funds()
+    assert excinfo.value.message == 'INVALID_SESSION_INFORMATION'
+    assert len(session_checking_api.calls) == 2
+
+
+def test_no_retry_without_keeper(logged_in_client, fake_login, session_checking_api):
+    with pytest.raises(exceptions.ApiError):
+        logged_in_client.get_account_funds()
+    assert len(session_checking_api.calls) == 1
+    assert fake_login.calls == []
+
+
+def test_refresh(logged_in_client, keeper, fake_login, monkeypatch):
+    calls = []
+    monkeypatch.setattr(logged_in_client, 'keep_alive', lambda: calls.append(1))
+    keeper.refresh()
+    assert calls == [1]
+    assert fake_login.calls == []
+
+
+def test_refresh_expired(logged_in_client, keeper, fake_login, keepalive_failure):
+    keeper.refresh()
+    assert logged_in_client.session_token == 'token-1'
+
+
+def test_start_stop(logged_in_client, keeper, monkeypatch):
+    calls = []
+    monkeypatch.setattr(logged_in_client, 'keep_alive', lambda: calls.append(1))
+    with keeper:
+        assert logged_in_client.session_keeper is keeper
+        time.sleep(0.1)
+    assert logged_in_client.session_keeper is None
+    assert keeper.thread is None
+    count = len(calls)
+    assert count > 1
+    time.sleep(0.05)
+    assert len(calls) == count
+
+
+def test_start_logs_in(client, monkeypatch):
+    login = FakeLogin(client)
+    monkeypatch.setattr(client, 'login', login)
+    keeper = SessionKeeper(client, 'name', 'pass', interval=60)
+    keeper.start()
+    keeper.stop()
+    assert client.session_token == 'token-1'
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from schematics.exceptions import ConversionError
+from schematics.exceptions import ModelValidationError
+
+from betfair import lazy
+from betfair import utils
+from betfair import models
+
+from tests.test_models import MARKET_BOOK
+from tests.test_models import assert_identical
+
+
+def assert_equivalent(lazy_value, value):
+    if isinstance(value, models.BetfairModel):
+        assert isinstance(lazy_value, lazy.get_lazy_class(type(value)))
+        for name in value._fields:
+            assert_equivalent(getattr(lazy_value, name), getattr(value, name))
+    elif isinstance(value, list):
+        assert len(lazy_value) == len(value)
+        for lazy_item, item in zip(lazy_value, value):
+            assert_equivalent(lazy_item, item)
+    else:
+        assert type(lazy_value) is type(value)
+        assert lazy_value == value
+
+
+def test_lazy_equivalent():
+    book = utils.process_result(MARKET_BOOK, models.MarketBook, 'lazy')
+    assert_equivalent(book, models.MarketBook.unserialize(MARKET_BOOK))
+
+
+def test_lazy_class_cached():
+    cls = lazy.get_lazy_class(models.MarketCatalogue)
+    assert lazy.get_lazy_class(models.MarketCatalogue) is cls
+    assert issubclass(cls, lazy.LazyModel)
+    assert cls.model is models.MarketCatalogue
+
+
+def test_lazy_converts_on_access():
+    book = lazy.get_lazy_class(models.MarketBook).unserialize(MARKET_BOOK)
+    assert 'runners' not in vars(book)
+    runners = book.runners
+    assert vars(book)['runners'] is runners
+    assert book.runners is runners
+    assert 'ex' not in vars(runners[0])
+
+
+def test_lazy_conversion_error_on_access():
+    book = lazy.get_lazy_class(models.MarketBook).unserialize({'marketId': '1.2', 'status': 'NEW'})
+    assert book.market_id == '1.2'
+    with pytest.raises(ConversionError):
+        book.status
+
+
+def test_lazy_deferred_validation():
+    book = lazy.get_lazy_class(models.MarketBook).unserialize({'status': 'OPEN'})
+    assert book.status == 'OPEN'
+    with pytest.raises(ModelValidationError):
+        book.validate()
+
+
+def test_lazy_to_model():
+    book = lazy.get_lazy_class(models.MarketBook)(**MARKET_BOOK)
+    assert_identical(book.to_model(), models.MarketBook.unserialize(MARKET_BOOK))
+    assert book.serialize() == book.to_model().serialize()
+
+
+def test_lazy_attribute_assignment():
+    book = lazy.get_lazy_class(models.MarketBook).unserialize(MARKET_BOOK)
+    book.market_id = '1.999'
+    assert book.market_id == '1.999'
+
+
+def test_lazy_assignment_to_model():
+    book = lazy.get_lazy_class(models.MarketBook).unserialize(MARKET_BOOK)
+    book.status = 'CLOSED'
+    book.runners[0].status = 'WINNER'
+    assert book.to_model().status == 'CLOSED'
+    assert book.to_model().runners[0].status == 'WINNER'
+    assert book.serialize()['status'] == 'CLOSED'
+    assert book.serialize()['runners'][0]['status'] == 'WINNER'
+    # Unmodified fields are unchanged
+    assert book.serialize()['marketId'] == MARKET_BOOK['marketId']
+    book.status = 'NEW'
+    with pytest.raises(ModelValidationError):
+        book.validate()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import json
+import responses
+
+from betfair import models
+from betfair import compact
+from betfair import betfair
+from betfair import constants
+from betfair import exceptions
+from betfair.marketcache import MarketCache
+
+from tests.utils import make_book, make_runner
+
+
+def projection(*price_data):
+    return models.PriceProjection(price_data=list(price_data))
+
+
+@pytest.fixture
+def cache():
+    return MarketCache()
+
+
+def test_update(cache):
+    changes = cache.update([make_book([make_runner(1, [2.0], [2.02]), make_runner(2, [3.0])])])
+    assert '1.1' in cache
+    assert len(cache) == 1
+    book = cache['1.1']
+    assert isinstance(book, models.MarketBook)
+    assert book.status == 'OPEN'
+    assert [runner.selection_id for runner in book.runners] == [1, 2]
+    assert book.runners[0].ex.available_to_lay[0].price == 2.02
+    assert [(change.selection_id, change.previous) for change in changes] == [(1, None), (2, None)]
+
+
+def test_update_unchanged_runners_reused(cache):
+    cache.update(make_book([make_runner(1, [2.0]), make_runner(2, [3.0])]))
+    first = cache['1.1']
+    changes = cache.update(make_book([make_runner(1, [2.0]), make_runner(2, [3.05])]))
+    second = cache['1.1']
+    assert [change.selection_id for change in changes] == [2]
+    assert changes[0].previous is first.runners[1]
+    assert changes[0].runner is second.runners[1]
+    assert second.runners[0] is first.runners[0]
+    assert second.runners[1].ex.available_to_back[0].price == 3.05
+
+
+def test_update_unchanged_book(cache):
+    cache.update(make_book([make_runner(1, [2.0])]))
+    book = cache['1.1']
+    assert cache.update(make_book([make_runner(1, [2.0])])) == []
+    assert cache['1.1'] is book
+
+
+def test_update_book_fields(cache):
+    cache.update(make_book([make_runner(1, [2.0])]))
+    runner = cache['1.1'].runners[0]
+    assert cache.update(make_book([make_runner(1, [2.0])], status='SUSPENDED')) == []
+    assert cache['1.1'].status == 'SUSPENDED'
+    assert cache['1.1'].runners[0] is runner
+
+
+def test_update_merges_projections(cache):
+    cache.update(
+        make_book([make_runner(1, [2.0], [2.02], [])]),
+        projection(constants.PriceData.EX_BEST_OFFERS, constants.PriceData.EX_TRADED),
+    )
+    sp = {'backStakeTaken': [{'price': 1.01, 'size': 2.0}], 'nearPrice': 2.1}
+    changes = cache.update(
+        make_book([make_runner(1, sp=sp)]),
+        projection(constants.PriceData.SP_AVAILABLE),
+    )
+    assert len(changes) == 1
+    runner = cache['1.1'].runners[0]
+    assert runner.ex.available_to_back[0].price == 2.0
+    assert runner.sp.back_stake_taken[0].size == 2.0
+    assert runner.sp.near_price == 2.1
+    # Covered prices missing from a result are cleared
+    cache.update(make_book([make_runner(1, [2.0])]), projection(constants.PriceData.EX_BEST_OFFERS))
+    runner = cache['1.1'].runners[0]
+    assert runner.ex.available_to_back[0].price == 2.0
+    assert runner.ex.available_to_lay is None
+    assert runner.ex.traded_volume == []
+    assert runner.sp.back_stake_taken[0].size == 2.0
+
+
+def test_update_without_projection_keeps_prices(cache):
+    cache.update(make_book([make_runner(1, [2.0], [2.02])]))
+    cache.update(make_book([make_runner(1, [2.04])]))
+    runner = cache['1.1'].runners[0]
+    assert runner.ex.available_to_back[0].price == 2.04
+    assert runner.ex.available_to_lay[0].price == 2.02
+
+
+@pytest.mark.parametrize(('cached', 'update'), [
+    ({'version': 2}, {'version': 1}),
+    (
+        {'lastMatchTime': '2016-01-01T12:00:01.000Z'},
+        {'lastMatchTime': '2016-01-01T12:00:00.000Z'},
+    ),
+])
+def test_update_stale(cache, cached, update):
+    cache.update(make_book([make_runner(1, [2.0])], **cached))
+    book = cache['1.1']
+    assert cache.update(make_book([make_runner(1, [3.0])], **update)) == []
+    assert cache['1.1'] is book
+
+
+def test_update_runners_removed(cache):
+    cache.update(make_book([make_runner(1, [2.0]), make_runner(2, [3.0])]))
+    assert cache.update(make_book([make_runner(1, [2.0])], version=2)) == []
+    assert [runner.selection_id for runner in cache['1.1'].runners] == [1]
+
+
+def test_listeners(cache):
+    received = []
+    cache.add_listener(received.append)
+    changes = cache.update(make_book([make_runner(1, [2.0])]))
+    assert received == changes
+    cache.remove_listener(received.append)
+    cache.update(make_book([make_runner(1, [2.02])]))
+    assert received == changes
+
+
+def test_remove(cache):
+    cache.update([make_book([], market_id='1.1'), make_book([], market_id='1.2')])
+    cache.remove('1.1')
+    assert cache.get('1.1') is None
+    assert cache.get('1.2').runners == []
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_compact_representation():
+    cache = MarketCache(representation='compact')
+    cache.update(make_book([make_runner(1, [2.0])]))
+    assert isinstance(cache['1.1'], compact.MarketBook)
+    assert isinstance(cache['1.1'].runners[0], compact.Runner)
+
+
+@pytest.mark.parametrize('representation', ['columnar', 'tuple'])
+def test_invalid_representation(representation):
+    with pytest.raises(ValueError):
+        MarketCache(representation=representation)
+
+
+@pytest.yield_fixture
+def market_book_api():
+    """Respond to `listMarketBook` with one book per requested market, or with
+    `TOO_MUCH_DATA` when more than three markets are requested.
+    """
+    def callback(request):
+        market_ids = json.loads(request.body)['params']['marketIds']
+        if len(market_ids) > 3:
+            body = {
+                'jsonrpc': '2.0',
+                'error': {'data': {'APINGException': {'errorCode': 'TOO_MUCH_DATA'}}},
+                'id': 1,
+            }
+        else:
+            result = [
+                make_book([make_runner(1, [2.0])], market_id=market_id)
+                for market_id in market_ids
+            ]
+            body = {'jsonrpc': '2.0', 'result': result, 'id': 1}
+        return (200, {}, json.dumps(body))
+    responses.add_callback(responses.POST, betfair.API_URLS[None], callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_poll(cache, logged_in_client, market_book_api):
+    market_ids = [str(idx) for idx in range(5)]
+    price_projection = projection(constants.PriceData.EX_ALL_OFFERS)
+    changes = cache.poll(logged_in_client, market_ids, price_projection, currency_code='GBP')
+    assert len(changes) == 5
+    assert sorted(cache.books) == market_ids
+    assert isinstance(cache['0'], models.MarketBook)
+    # EX_ALL_OFFERS has a weight of 17, so 11 markets fit in a request; the
+    # rejected request is split in half
+    params = [json.loads(call.request.body)['params'] for call in market_book_api.calls]
+    assert [len(each['marketIds']) for each in params] == [5, 2, 3]
+    assert set(each['currencyCode'] for each in params) == {'GBP'}
+    assert params[0]['priceProjection']['priceData'] == ['EX_ALL_OFFERS']
+
+
+def test_poll_requires_login(cache, client):
+    with pytest.raises(exceptions.NotLoggedIn):
+        cache.poll(client, ['1.1'])
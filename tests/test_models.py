@@ -1,13 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import datetime
+
 import pytest
 
 from enum import Enum
 from schematics.models import Model
+from schematics.exceptions import ModelConversionError
 from schematics.types import StringType
 from schematics.types.compound import ModelType
 from six import with_metaclass
 
+from betfair import price
+from betfair import models
+from betfair import constants
 from betfair.meta.types import EnumType
 from betfair.meta.models import BetfairModel
 from betfair.meta.models import BetfairModelMeta
@@ -93,3 +99,123 @@ def test_nested_model():
 
 def test_nested_model_unserialize_rogue():
     Parent(parent_name='dad', child=dict(child_name='kid', rogue='rogue'))
+
+
+def assert_identical(left, right):
+    assert type(left) is type(right)
+    if isinstance(left, BetfairModel):
+        assert left._initial == right._initial
+        assert list(left._data) == list(right._data)
+        for key in left._data:
+            assert_identical(left._data[key], right._data[key])
+    elif isinstance(left, list):
+        assert len(left) == len(right)
+        for left_item, right_item in zip(left, right):
+            assert_identical(left_item, right_item)
+    else:
+        assert left == right
+
+
+MARKET_BOOK = {
+    'marketId': '1.234',
+    'isMarketDataDelayed': False,
+    'status': 'OPEN',
+    'betDelay': 0,
+    'inplay': True,
+    'lastMatchTime': '2017-01-01T12:00:00.000Z',
+    'totalMatched': 100,
+    'version': 123456,
+    'runners': [
+        {
+            'selectionId': 1,
+            'handicap': 0.0,
+            'status': 'ACTIVE',
+            'lastPriceTraded': 2.5,
+            'removalDate': None,
+            'ex': {
+                'availableToBack': [{'price': 2.5, 'size': 10.0}],
+                'availableToLay': [{'price': 2.52, 'size': 5}],
+                'tradedVolume': [],
+            },
+            'sp': {'nearPrice': 2.4, 'backStakeTaken': None, 'actualSP': 2.46},
+            'orders': [{
+                'betId': '1',
+                'orderType': 'LIMIT',
+                'status': 'EXECUTABLE',
+                'persistenceType': 'LAPSE',
+                'side': 'BACK',
+                'price': 2.5,
+                'size': 2,
+                'bspLiability': 0,
+                'placedDate': '2017-01-01T11:59:58.5',
+            }],
+        },
+        {'selectionId': '2', 'handicap': '0', 'status': 'REMOVED'},
+    ],
+}
+
+
+@pytest.mark.parametrize('data', [
+    MARKET_BOOK,
+    {},
+    {'marketId': '1.234', 'market_id': '1.567'},
+    {'marketId': '1.234', 'market_id': None},
+    {'marketId': 1234, 'version': '12'},
+    {'complete': 'true', 'crossMatching': 1},
+    {'status': constants.MarketStatus.CLOSED},
+    {'runners': {'1': {'selectionId': 2}, '0': {'selectionId': 1}}},
+    {'runners': [None]},
+    {'lastMatchTime': '2017-01-01T12:00:00'},
+    {'lastMatchTime': '2017-01-01T12:00:00.123456'},
+    {'lastMatchTime': '2017-1-1T12:00:00.1Z'},
+    {'rogue': 'rogue'},
+])
+def test_unserialize_identical(data):
+    assert_identical(
+        models.MarketBook.unserialize(data),
+        models.MarketBook(**data),
+    )
+
+
+@pytest.mark.parametrize('data', [
+    {'status': 'UNKNOWN'},
+    {'betDelay': 'soon'},
+    {'complete': 'maybe'},
+    {'lastMatchTime': '2017-01-01T12:00:00Z'},
+    {'lastMatchTime': '2017-02-30T12:00:00.000Z'},
+    {'runners': [{'status': 'ACTIVE', 'ex': 'invalid'}]},
+])
+def test_unserialize_errors_identical(data):
+    with pytest.raises(ModelConversionError) as expected:
+        models.MarketBook(**data)
+    with pytest.raises(ModelConversionError) as actual:
+        models.MarketBook.unserialize(data)
+    assert actual.value.messages == expected.value.messages
+
+
+def test_unserialize_deserialize_from():
+    time_range = models.TimeRange.unserialize({'from': '2017-01-01T12:00:00.000Z'})
+    assert time_range.from_ == datetime.datetime(2017, 1, 1, 12)
+    assert time_range.to is None
+
+
+def test_unserialize_nested():
+    parent = Parent.unserialize({'parentName': 'mom', 'firstChild': {'childName': 'kid'}})
+    assert_identical(parent, Parent(parent_name='mom', first_child={'child_name': 'kid'}))
+    assert parent.first_child.child_name == 'kid'
+
+
+def test_price_type_tick():
+    tick = price.Tick.from_price(3.05)
+    order = models.LimitOrder(
+        size=2, price=tick, persistence_type=constants.PersistenceType.LAPSE,
+    )
+    assert type(order.price) is float
+    assert order.price == 3.05
+    assert order.price - 1 == 2.05
+    assert order.serialize()['price'] == 3.05
+    assert models.PriceSize.unserialize({'price': tick, 'size': 1}).price == 3.05
+    order.price = price.Tick.from_price(2.0)
+    assert type(order.price) is float
+    assert order.price == 2.0
+    assert models.PriceSize.unserialize({'price': 3, 'size': 1}).price == 3.0
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from betfair import models
+from betfair.ordermanager import OrderManager, Exposure
+
+from tests.utils import FakeClient
+from tests.utils import place_instruction
+
+
+def place_report(instruction, bet_id, size_matched=0.0, status='SUCCESS'):
+    return {
+        'status': status,
+        'instruction': instruction.serialize(),
+        'betId': bet_id,
+        'placedDate': '2016-01-01T12:00:00.000Z',
+        'averagePriceMatched': instruction.limit_order.price if size_matched else 0.0,
+        'sizeMatched': size_matched,
+    }
+
+
+def current_order(bet_id, selection_id=1, side='BACK', price=2.0, size=10.0, status='EXECUTABLE',
+                  matched=0.0, remaining=10.0, lapsed=0.0, cancelled=0.0):
+    return {
+        'betId': bet_id,
+        'marketId': '1.1',
+        'selectionId': selection_id,
+        'handicap': 0.0,
+        'priceSize': {'price': price, 'size': size},
+        'bspLiability': 0.0,
+        'side': side,
+        'status': status,
+        'persistenceType': 'LAPSE',
+        'orderType': 'LIMIT',
+        'placedDate': '2016-01-01T12:00:00.000Z',
+        'averagePriceMatched': price if matched else 0.0,
+        'sizeMatched': matched,
+        'sizeRemaining': remaining,
+        'sizeLapsed': lapsed,
+        'sizeCancelled': cancelled,
+        'sizeVoided': 0.0,
+    }
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def manager(client):
+    back, lay = place_instruction(), place_instruction(2, 'LAY', 3.0, 5.0)
+    client.reports.append([place_report(back, '1', 4.0), place_report(lay, '2')])
+    manager = OrderManager(client)
+    manager.place_orders('1.1', [back, lay], customer_ref='ref')
+    return manager
+
+
+def test_place(manager, client):
+    assert client.calls[0][0] == 'place_orders'
+    assert len(manager) == 2
+    order = manager.get_order('1')
+    assert (order.market_id, order.selection_id, order.handicap) == ('1.1', 1, 0.0)
+    assert (order.side, order.price, order.size) == ('BACK', 2.0, 10.0)
+    assert (order.size_matched, order.size_remaining) == (4.0, 6.0)
+    assert order.status == 'EXECUTABLE'
+    assert order.customer_ref == 'ref'
+    assert [order.bet_id for order in manager.get_orders('1.1')] == ['1', '2']
+    assert [order.bet_id for order in manager.get_open_orders('1.1', 2)] == ['2']
+    assert manager.get_exposure('1.1', 1) == Exposure(4.0, -4.0, 6.0, 0.0)
+    assert manager.get_exposure('1.1', 2) == Exposure(0.0, 0.0, 0.0, 10.0)
+    assert manager.get_exposure('1.1', 3) == Exposure(0.0, 0.0, 0.0, 0.0)
+
+
+def test_place_failure_and_fully_matched(manager, client):
+    instructions = [place_instruction(3), place_instruction(3, size=2.0)]
+    client.reports.append([
+        dict(place_report(instructions[0], None, status='FAILURE'), errorCode='INVALID_BET_SIZE'),
+        place_report(instructions[1], '4', 2.0),
+    ])
+    manager.place_orders('1.1', instructions)
+    assert '4' in manager
+    assert manager.get_order('4').status == 'EXECUTION_COMPLETE'
+    assert manager.get_open_orders('1.1', 3) == []
+    assert manager.get_exposure('1.1', 3) == Exposure(2.0, -2.0, 0.0, 0.0)
+
+
+def test_cancel(manager, client):
+    client.reports.append([
+        {'status': 'SUCCESS', 'instruction': {'betId': '1', 'sizeReduction': 2.0},
+         'sizeCancelled': 2.0},
+        {'status': 'SUCCESS', 'instruction': {'betId': '2'}, 'sizeCancelled': 5.0},
+    ])
+    manager.cancel_orders('1.1', [
+        models.CancelInstruction(bet_id='1', size_reduction=2.0),
+        models.CancelInstruction(bet_id='2'),
+    ])
+    order = manager.get_order('1')
+    assert (order.size_cancelled, order.size_remaining, order.status) == (2.0, 4.0, 'EXECUTABLE')
+    assert manager.get_order('2').status == 'EXECUTION_COMPLETE'
+    assert [order.bet_id for order in manager.get_open_orders()] == ['1']
+    assert manager.get_exposure('1.1', 1).unmatched_back == 4.0
+    assert manager.get_exposure('1.1', 2) == Exposure(0.0, 0.0, 0.0, 0.0)
+
+
+def test_cancel_failure_marks_stale(manager, client):
+    client.reports.append([{
+        'status': 'FAILURE', 'errorCode': 'BET_TAKEN_OR_LAPSED',
+        'instruction': {'betId': '2'}, 'sizeCancelled': 0.0,
+    }])
+    manager.cancel_orders('1.1', [models.CancelInstruction(bet_id='2')])
+    assert manager.stale == {'2'}
+    assert manager.get_order('2').is_open
+
+
+def test_cancel_all(manager, client):
+    client.reports.append([])
+    manager.cancel_orders('1.1')
+    assert manager.stale == {'1', '2'}
+    client.current_orders['1'] = current_order(
+        '1', status='EXECUTION_COMPLETE', matched=4.0, remaining=0.0, cancelled=6.0)
+    client.current_orders['2'] = current_order(
+        '2', 2, 'LAY', 3.0, 5.0, 'EXECUTION_COMPLETE', remaining=0.0, cancelled=5.0)
+    assert manager.reconcile() == 2
+    assert manager.stale == set()
+    assert manager.get_open_orders() == []
+    assert manager.get_order('1').size_cancelled == 6.0
+
+
+def test_replace(manager, client):
+    new = place_instruction(2, 'LAY', 3.5, 5.0)
+    client.reports.append([{
+        'status': 'SUCCESS',
+        'cancelInstructionReport': {
+            'status': 'SUCCESS', 'instruction': {'betId': '2'}, 'sizeCancelled': 5.0,
+        },
+        'placeInstructionReport': place_report(new, '3'),
+    }])
+    manager.replace_orders('1.1', [models.ReplaceInstruction(bet_id='2', new_price=3.5)])
+    assert manager.get_order('2').status == 'EXECUTION_COMPLETE'
+    assert manager.get_order('3').price == 3.5
+    assert [order.bet_id for order in manager.get_open_orders('1.1', 2)] == ['3']
+    assert manager.get_exposure('1.1', 2).unmatched_lay_liability == 12.5
+
+
+def test_update(manager, client):
+    client.reports.append([{
+        'status': 'SUCCESS', 'instruction': {'betId': '1', 'newPersistenceType': 'PERSIST'},
+    }])
+    manager.update_orders('1.1', [
+        models.UpdateInstruction(bet_id='1', new_persistence_type='PERSIST'),
+    ])
+    assert manager.get_order('1').persistence_type == 'PERSIST'
+
+
+def test_reconcile(manager, client):
+    client.current_orders['1'] = current_order('1', matched=10.0, remaining=0.0,
+                                               status='EXECUTION_COMPLETE')
+    # Bet 2 lapsed and is no longer current
+    assert manager.reconcile() == 2
+    assert client.calls[-1] == ('list_current_orders', ['1', '2'])
+    order = manager.get_order('1')
+    assert (order.size_matched, order.status, order.customer_ref) == (
+        10.0, 'EXECUTION_COMPLETE', 'ref',
+    )
+    assert manager.get_order('2').status == 'EXECUTION_COMPLETE'
+    assert manager.get_open_orders() == []
+    assert manager.get_exposure('1.1', 1) == Exposure(10.0, -10.0, 0.0, 0.0)
+    assert manager.get_exposure('1.1', 2) == Exposure(0.0, 0.0, 0.0, 0.0)
+    # Only open orders are requested
+    assert manager.reconcile() == 0
+
+
+def test_market_exposure(manager, client):
+    # Back 4 matched at 2.0 on 1 with 6 unmatched; lay 5 unmatched at 3.0 on 2,
+    # so the worst outcome is 2 winning with all bets matched
+    assert manager.get_market_exposure('1.1') == -20.0
+    assert manager.get_exposure('1.1', 1).worst_case == -10.0
+    assert manager.get_market_exposure('1.2') == 0.0
+
+
+def test_remove(manager):
+    manager.remove('1.1')
+    assert len(manager) == 0
+    assert manager.get_orders('1.1') == []
+    with pytest.raises(KeyError):
+        manager.get_order('1')
+
+
+def test_apply_invalid(manager):
+    with pytest.raises(TypeError):
+        manager.apply(models.CurrentOrderSummaryReport(current_orders=[], more_available=False))
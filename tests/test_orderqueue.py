@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from betfair import models
+from betfair import exceptions
+from betfair.orderqueue import OrderQueue
+
+from tests.utils import FakeClient
+from tests.utils import place_instruction
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+def test_batches_per_market(client):
+    with OrderQueue(client, window=0.05) as queue:
+        results = [
+            queue.place('1.1', place_instruction(1)),
+            queue.place('1.2', place_instruction(2)),
+            queue.place('1.1', place_instruction(3)),
+            queue.cancel('1.1', models.CancelInstruction(bet_id='1')),
+        ]
+        reports = [future.result(timeout=5) for future in results]
+    assert [report.bet_id for report in reports[:3]] == ['1.1-1', '1.2-2', '1.1-3']
+    assert reports[3].size_cancelled == 2.0
+    calls = sorted((method, market_id, len(instructions))
+                   for method, market_id, instructions, _ in client.calls)
+    assert calls == [('cancel_orders', '1.1', 1), ('place_orders', '1.1', 2),
+                     ('place_orders', '1.2', 1)]
+    assert queue.requests == 3
+
+
+def test_threshold_sends_immediately(client):
+    queue = OrderQueue(client, window=60, max_instructions=2)
+    first = queue.place('1.1', place_instruction(1))
+    second = queue.place('1.1', place_instruction(2))
+    third = queue.place('1.1', place_instruction(3))
+    assert second.result(timeout=5).bet_id == '1.1-2'
+    assert first.done()
+    assert not third.done()
+    queue.close()
+    assert third.result(timeout=5).bet_id == '1.1-3'
+    assert [len(instructions) for _, _, instructions, _ in client.calls] == [2, 1]
+
+
+def test_threshold_limited_by_betfair():
+    queue = OrderQueue(FakeClient(), max_instructions=1000)
+    assert queue.get_max_instructions('place_orders') == 200
+    assert queue.get_max_instructions('cancel_orders') == 60
+    queue.close()
+
+
+def test_concurrent_submissions(client):
+    with OrderQueue(client, window=0.05) as queue:
+        results = {}
+
+        def submit(selection_id):
+            results[selection_id] = queue.place('1.1', place_instruction(selection_id))
+
+        threads = [threading.Thread(target=submit, args=(idx, )) for idx in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for selection_id, future in results.items():
+            report = future.result(timeout=5)
+            assert report.instruction.selection_id == selection_id
+    assert len(client.calls) < 20
+    assert sum(len(instructions) for _, _, instructions, _ in client.calls) == 20
+
+
+def test_request_error():
+    error = exceptions.BetfairError('TIMEOUT')
+    with OrderQueue(FakeClient(error=error)) as queue:
+        futures = [queue.place('1.1', place_instruction(idx)) for idx in range(2)]
+    for future in futures:
+        assert future.exception(timeout=5) is error
+
+
+def test_missing_instruction_reports():
+    with OrderQueue(FakeClient(status='FAILURE')) as queue:
+        future = queue.place('1.1', place_instruction(1))
+    error = future.exception(timeout=5)
+    assert isinstance(error, exceptions.ExecutionError)
+    assert error.message == 'MARKET_SUSPENDED'
+    assert error.report.market_id == '1.1'
+
+
+def test_closed(client):
+    queue = OrderQueue(client)
+    queue.close()
+    with pytest.raises(RuntimeError):
+        queue.place('1.1', place_instruction(1))
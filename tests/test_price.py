@@ -2,6 +2,10 @@
 
 import pytest
 
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+from betfair import price as price_module
 from betfair.price import nearest_price, price_ticks_away, ticks_difference
 
 
@@ -35,3 +39,108 @@ def test_ticks_difference(price_1, price_2, expected):
 ])
 def test_price_ticks_away(price, n_ticks, expected):
     assert price_ticks_away(price, n_ticks) == expected
+
+
+def legacy_nearest_price(price, cutoffs=price_module.CUTOFFS):
+    if price <= price_module.MIN_PRICE:
+        return price_module.MIN_PRICE
+    if price > price_module.MAX_PRICE:
+        return price_module.MAX_PRICE
+    price = price_module.as_dec(price)
+    for cutoff, step in cutoffs:
+        if price < cutoff:
+            break
+    step = price_module.as_dec(step)
+    return float((price * step).quantize(2, ROUND_HALF_UP) / step)
+
+
+def sample_prices():
+    rng = random.Random(0)
+    prices = [float(value) for value in price_module.PRICES]
+    prices += [(low + high) / 2 for low, high in zip(prices, prices[1:])]
+    prices += [rng.uniform(1, 1001) for _ in range(5000)]
+    prices += [round(rng.uniform(1, 1001), rng.randrange(4)) for _ in range(5000)]
+    prices += list(range(1, 1001))
+    return prices
+
+
+def test_nearest_price_matches_decimal():
+    for value in sample_prices():
+        assert nearest_price(value) == legacy_nearest_price(value), value
+
+
+def test_nearest_price_custom_cutoffs():
+    cutoffs = ((1000, 1), )
+    assert nearest_price(2.5, cutoffs) == legacy_nearest_price(2.5, cutoffs) == 3.0
+
+
+@pytest.mark.parametrize('value', [1.01, 2, 2.0, '2.02', Decimal('3.05'), Decimal('1000')])
+def test_price_to_tick(value):
+    expected = price_module.PRICES.index(price_module.as_dec(value))
+    assert price_module.price_to_tick(value) == expected
+
+
+@pytest.mark.parametrize('value', [1.015, 1.0100000000000002, 0.5, 1001, '2.03'])
+def test_price_to_tick_invalid(value):
+    with pytest.raises(ValueError):
+        price_module.price_to_tick(value)
+
+
+def test_tick_to_price():
+    for tick, value in enumerate(price_module.PRICES):
+        assert price_module.tick_to_price(tick) == float(value)
+        assert price_module.price_to_tick(float(value)) == tick
+    for tick in (-1, len(price_module.PRICES)):
+        with pytest.raises(IndexError):
+            price_module.tick_to_price(tick)
+
+
+@pytest.mark.parametrize(('value', 'up', 'down'), [
+    (1.01, 1.01, 1.01), (1.015, 1.02, 1.01), (2.01, 2.02, 2.0),
+    (2.02, 2.02, 2.02), (99.9, 100, 95), (1000, 1000, 1000),
+])
+def test_round_price(value, up, down):
+    assert price_module.round_price_up(value) == up
+    assert price_module.round_price_down(value) == down
+
+
+def test_round_price_out_of_range():
+    assert price_module.round_price_up(0.5) == 1.01
+    assert price_module.round_price_down(2000) == 1000
+    with pytest.raises(ValueError):
+        price_module.round_price_up(1000.5)
+    with pytest.raises(ValueError):
+        price_module.round_price_down(1.0)
+
+
+def test_price_ticks_away_out_of_range():
+    with pytest.raises(IndexError):
+        price_ticks_away(1.01, -1)
+    with pytest.raises(IndexError):
+        price_ticks_away(1000, 1)
+
+
+def test_tick():
+    tick = price_module.Tick.from_price(2.5)
+    assert tick is price_module.Tick.from_price('2.5')
+    assert tick == price_module.price_to_tick(2.5)
+    assert tick.price == 2.5
+    assert repr(tick) == 'Tick(2.5)'
+    assert price_module.Tick.from_price(2.54) - tick == 2
+    assert price_module.price_to_tick(tick) == tick
+    assert price_ticks_away(tick, 1) == 2.52
+    with pytest.raises(ValueError):
+        price_module.Tick.from_price(2.51)
+
+
+@pytest.mark.parametrize(('value', 'expected'), [
+    (2.5, price_module.Tick.from_price(2.5)),
+    (3, price_module.Tick.from_price(3)),
+    (2.51, 2.51),
+    (price_module.Tick.from_price(5), price_module.Tick.from_price(5)),
+])
+def test_to_tick(value, expected):
+    result = price_module.to_tick(value)
+    assert result == expected
+    assert type(result) is type(expected)
+    assert price_module.from_tick(result) == price_module.from_tick(expected)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from betfair import price
+
+np = pytest.importorskip('numpy')
+price_array = pytest.importorskip('betfair.price_array')
+
+
+def sample_prices():
+    rng = random.Random(0)
+    prices = list(price.FLOAT_PRICES)
+    prices += [(low + high) / 2 for low, high in zip(prices, prices[1:])]
+    prices += [rng.uniform(0.5, 1100) for _ in range(2000)]
+    prices += [round(rng.uniform(1, 1001), rng.randrange(4)) for _ in range(2000)]
+    prices += [2.675, 1.015, 2.03, 1000.05, 0, -1]
+    return prices
+
+
+def test_nearest_price_matches_scalar():
+    prices = sample_prices()
+    expected = [price.nearest_price(value) for value in prices]
+    assert price_array.nearest_price(prices).tolist() == expected
+
+
+def test_nearest_price_custom_cutoffs():
+    cutoffs = ((10, 3), (1000, 1))
+    prices = sample_prices()
+    expected = [price.nearest_price(value, cutoffs) for value in prices]
+    assert price_array.nearest_price(prices, cutoffs).tolist() == expected
+
+
+def test_nearest_price_shape():
+    prices = np.array([[1.234, 5.67], [np.nan, 2000]])
+    result = price_array.nearest_price(prices)
+    assert result.shape == (2, 2)
+    assert result[0].tolist() == [1.23, 5.7]
+    assert np.isnan(result[1, 0])
+    assert result[1, 1] == price.MAX_PRICE
+
+
+def test_clamp_price():
+    result = price_array.clamp_price([0.5, 3.3, 1001])
+    assert result.tolist() == [price.MIN_PRICE, 3.3, price.MAX_PRICE]
+
+
+def test_price_to_tick():
+    ticks = price_array.price_to_tick(price.FLOAT_PRICES)
+    assert ticks.tolist() == list(range(len(price.FLOAT_PRICES)))
+    assert price_array.tick_to_price(ticks).tolist() == price.FLOAT_PRICES
+
+
+@pytest.mark.parametrize('prices', [[1.01, 1.015], [0.5], [1001], [np.nan]])
+def test_price_to_tick_invalid(prices):
+    with pytest.raises(ValueError):
+        price_array.price_to_tick(prices)
+
+
+@pytest.mark.parametrize('ticks', [[-1], [len(price.PRICES)]])
+def test_tick_to_price_invalid(ticks):
+    with pytest.raises(IndexError):
+        price_array.tick_to_price(ticks)
+
+
+def test_round_price():
+    prices = sample_prices()
+    below = [value for value in prices if value <= price.MAX_PRICE]
+    assert price_array.round_price_up(below).tolist() == [
+        price.round_price_up(value) for value in below
+    ]
+    above = [value for value in prices if value >= price.MIN_PRICE]
+    assert price_array.round_price_down(above).tolist() == [
+        price.round_price_down(value) for value in above
+    ]
+
+
+def test_round_price_out_of_range():
+    with pytest.raises(ValueError):
+        price_array.round_price_up([2.0, 1000.5])
+    with pytest.raises(ValueError):
+        price_array.round_price_down([1.0, 2.0])
+
+
+def test_ticks_difference():
+    prices_1 = [1.01, 2.0, 3.5, 1000]
+    prices_2 = [1.02, 1.99, 3.5, 990]
+    expected = [
+        price.ticks_difference(*pair) for pair in zip(prices_1, prices_2)
+    ]
+    assert price_array.ticks_difference(prices_1, prices_2).tolist() == expected
+    assert price_array.ticks_difference(prices_1, 2.0).tolist() == [
+        price.ticks_difference(value, 2.0) for value in prices_1
+    ]
+
+
+def test_price_ticks_away():
+    prices = [1.01, 2.0, 3.5, 990]
+    assert price_array.price_ticks_away(prices, 1).tolist() == [
+        price.price_ticks_away(value, 1) for value in prices
+    ]
+    assert price_array.price_ticks_away(prices, [1, -1, 2, 0]).tolist() == [
+        1.02, 1.99, 3.6, 990,
+    ]
+
+
+def test_price_ticks_away_clamp():
+    with pytest.raises(IndexError):
+        price_array.price_ticks_away([1.01, 1000], [-1, 1])
+    result = price_array.price_ticks_away([1.01, 1000], [-1, 1], clamp=True)
+    assert result.tolist() == [price.MIN_PRICE, price.MAX_PRICE]
+
+
+def test_encode_ticks():
+    prices = [[1.01, 2.5], [np.nan, 1000]]
+    ticks = price_array.encode_ticks(prices)
+    assert ticks.dtype == price_array.TICK_DTYPE
+    assert ticks.tolist() == [[0, price.price_to_tick(2.5)], [-1, len(price.PRICES) - 1]]
+    decoded = price_array.decode_ticks(ticks)
+    assert decoded[0].tolist() == [1.01, 2.5]
+    assert np.isnan(decoded[1, 0])
+    with pytest.raises(ValueError):
+        price_array.encode_ticks([2.51])
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import requests
+import responses
+
+import json
+import time
+
+from betfair import betfair
+from betfair import exceptions
+from betfair.retry import RetryPolicy
+
+from tests import utils
+
+
+def api_error(status_code=200, code='UNKNOWN'):
+    return exceptions.ApiError(
+        utils.mock_response(status_code),
+        {'error': {'data': {'APINGException': {'errorCode': code}}}},
+    )
+
+
+class Flaky(object):
+    """Callable raising each of `errors` in turn, then returning `result`."""
+    def __init__(self, errors, result='ok'):
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(max_retries=3, backoff=0.001, max_backoff=0.002)
+
+
+@pytest.mark.parametrize(('method', 'params', 'expected'), [
+    ('listMarketBook', {}, True),
+    ('listCurrentOrders', {}, True),
+    ('getAccountFunds', {}, True),
+    ('placeOrders', {'customer_ref': None}, False),
+    ('placeOrders', {'customer_ref': 'abc'}, True),
+    ('cancelOrders', {'customer_ref': None}, False),
+    ('replaceOrders', {'customer_ref': None}, False),
+    ('replaceOrders', {'customer_ref': 'abc'}, True),
+    ('transferFunds', {}, False),
+])
+def test_allows(policy, method, params, expected):
+    assert policy.allows(method, params) == expected
+
+
+@pytest.mark.parametrize(('error', 'expected'), [
+    (api_error(503), True),
+    (api_error(500), True),
+    (api_error(code='TOO_MANY_REQUESTS'), True),
+    (api_error(code='SERVICE_BUSY'), True),
+    (api_error(code='INVALID_INPUT_DATA'), False),
+    (api_error(400), False),
+    (requests.Timeout(), True),
+    (requests.ConnectionError(), True),
+    (ValueError(), False),
+])
+def test_should_retry(policy, error, expected):
+    assert policy.should_retry(error) == expected
+
+
+def test_get_delay():
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.5, jitter=0.5)
+    for retry, ceiling in [(0, 0.1), (1, 0.2), (2, 0.4), (3, 0.5), (10, 0.5)]:
+        delay = policy.get_delay(retry)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_get_delay_no_jitter():
+    policy = RetryPolicy(backoff=0.1, max_backoff=1, jitter=0)
+    assert [policy.get_delay(retry) for retry in range(3)] == [0.1, 0.2, 0.4]
+
+
+def test_call_success(policy):
+    func = Flaky([api_error(503), requests.Timeout()])
+    assert policy.call(func) == 'ok'
+    assert func.calls == 3
+    assert policy.stats.calls == 1
+    assert policy.stats.retries == 2
+    assert policy.stats.retry_time > 0
+
+
+def test_call_no_retries(policy):
+    assert policy.call(Flaky([])) == 'ok'
+    assert policy.stats.calls == 0
+    assert policy.stats.retries == 0
+
+
+def test_call_exhausted(policy):
+    errors = [api_error(503) for _ in range(5)]
+    func = Flaky(errors)
+    with pytest.raises(exceptions.ApiError):
+        policy.call(func)
+    assert func.calls == 4
+    assert policy.stats.retries == 3
+
+
+def test_call_not_retryable(policy):
+    func = Flaky([api_error(code='INVALID_INPUT_DATA')])
+    with pytest.raises(exceptions.ApiError):
+        policy.call(func)
+    assert func.calls == 1
+
+
+def test_call_budget():
+    policy = RetryPolicy(max_retries=10, backoff=0.05, max_backoff=0.05, jitter=0, budget=0.12)
+    func = Flaky([api_error(503) for _ in range(10)])
+    with pytest.raises(exceptions.ApiError):
+        policy.call(func)
+    assert func.calls == 3
+
+
+def test_next_delay():
+    policy = RetryPolicy(max_retries=2, backoff=0.1, jitter=0)
+    start = time.time()
+    assert policy.next_delay(0, start, start, api_error(503)) == 0.1
+    assert policy.next_delay(1, start, start, api_error(503)) == 0.2
+    assert policy.next_delay(2, start, start, api_error(503)) is None
+    assert policy.stats.retries == 2
+    assert policy.next_delay(0, start, start, api_error(code='INVALID_INPUT_DATA')) is None
+    assert policy.next_delay(0, start, start, ValueError(), retryable=True) == 0.1
+
+
+@pytest.yield_fixture
+def flaky_api():
+    """Respond to the first two API requests with HTTP 503 errors."""
+    def callback(request):
+        if len(responses.calls) < 2:
+            return (503, {}, '<html>Service Unavailable</html>')
+        body = {'jsonrpc': '2.0', 'result': {'status': 'SUCCESS'}, 'id': 1}
+        return (200, {}, json.dumps(body))
+    responses.add_callback(responses.POST, betfair.API_URLS[None], callback=callback)
+    responses.start()
+    yield responses
+    responses.stop()
+    responses.reset()
+
+
+def test_client_retries_reads(logged_in_client, policy, flaky_api):
+    logged_in_client.retry_policy = policy
+    logged_in_client.list_current_orders()
+    assert len(flaky_api.calls) == 3
+    assert policy.stats.retries == 2
+
+
+def test_client_skips_orders_without_ref(logged_in_client, policy, flaky_api):
+    logged_in_client.retry_policy = policy
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        logged_in_client.place_orders('1.2', [])
+    assert excinfo.value.status_code == 503
+    assert len(flaky_api.calls) == 1
+
+
+def test_client_retries_orders_with_ref(logged_in_client, policy, flaky_api):
+    logged_in_client.retry_policy = policy
+    logged_in_client.place_orders('1.2', [], customer_ref='abc')
+    assert len(flaky_api.calls) == 3
+
+
+def test_client_no_policy(logged_in_client, flaky_api):
+    with pytest.raises(exceptions.ApiError):
+        logged_in_client.list_current_orders()
+    assert len(flaky_api.calls) == 1
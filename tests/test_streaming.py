@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import json
+
+from betfair import models
+from betfair import streaming
+from betfair import exceptions
+
+from tests.test_models import MARKET_BOOK
+
+
+def split(body, size):
+    return [body[idx:idx + size] for idx in range(0, len(body), size)]
+
+
+class StreamedResponse(object):
+
+    def __init__(self, body, chunk_size=7):
+        self.status_code = 200
+        self.chunks = split(json.dumps(body).encode('utf-8'), chunk_size)
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_reader_stream(chunk_size):
+    body = {
+        'jsonrpc': '2.0',
+        'result': [{'a': 12345, 'b': u'héllo ☃'}, [1.5e10, None], 'x', True, {}],
+        'id': 1,
+    }
+    text = json.dumps(body, ensure_ascii=False, indent=2).encode('utf-8')
+    rest = {}
+    reader = streaming.JsonReader(split(text, chunk_size))
+    assert list(reader.stream(('result', ), rest)) == body['result']
+    assert rest == {'jsonrpc': '2.0', 'result': [], 'id': 1}
+
+
+def test_reader_stream_nested_path():
+    body = {'result': {'moreAvailable': True, 'orders': [{'id': 1}, {'id': 2}], 'x': []}}
+    rest = {}
+    reader = streaming.JsonReader(split(json.dumps(body).encode('utf-8'), 5))
+    assert list(reader.stream(('result', 'orders'), rest)) == [{'id': 1}, {'id': 2}]
+    assert rest == {'result': {'moreAvailable': True, 'orders': [], 'x': []}}
+
+
+def test_reader_empty_array():
+    reader = streaming.JsonReader([b'{"result": [ ]}'])
+    assert list(reader.stream(('result', ), {})) == []
+
+
+@pytest.mark.parametrize('text', [b'{"result": [1, 2', b'{"result": [1 2]}', b'[1]'])
+def test_reader_invalid(text):
+    reader = streaming.JsonReader(split(text, 2))
+    with pytest.raises(ValueError):
+        list(reader.stream(('result', ), {}))
+
+
+def test_result_stream():
+    response = StreamedResponse({'jsonrpc': '2.0', 'result': [MARKET_BOOK] * 3, 'id': 1})
+    stream = streaming.ResultStream(response, models.MarketBook)
+    books = iter(stream)
+    book = next(books)
+    assert isinstance(book, models.MarketBook)
+    assert book == models.MarketBook.unserialize(MARKET_BOOK)
+    assert response.read < len(response.chunks) / 2
+    assert len(list(books)) == 2
+    assert response.closed
+    assert stream.result is None
+    with pytest.raises(RuntimeError):
+        list(stream)
+
+
+def test_result_stream_report():
+    body = {
+        'jsonrpc': '2.0',
+        'result': {'clearedOrders': [{'betId': '1'}, {'betId': '2'}], 'moreAvailable': True},
+        'id': 1,
+    }
+    stream = streaming.ResultStream(StreamedResponse(body), models.ClearedOrderSummaryReport)
+    orders = list(stream)
+    assert [order.bet_id for order in orders] == ['1', '2']
+    assert isinstance(orders[0], models.ClearedOrderSummary)
+    assert stream.result.more_available is True
+    assert stream.result.cleared_orders == []
+
+
+def test_result_stream_representation():
+    body = {'jsonrpc': '2.0', 'result': [MARKET_BOOK], 'id': 1}
+    stream = streaming.ResultStream(StreamedResponse(body), models.MarketBook, 'lazy')
+    assert [book.market_id for book in stream] == ['1.234']
+
+
+def test_result_stream_error():
+    body = {
+        'jsonrpc': '2.0',
+        'error': {'data': {'APINGException': {'errorCode': 'TOO_MUCH_DATA'}}},
+        'id': 1,
+    }
+    response = StreamedResponse(body)
+    with pytest.raises(exceptions.ApiError) as excinfo:
+        list(streaming.ResultStream(response, models.MarketCatalogue))
+    assert excinfo.value.message == 'TOO_MUCH_DATA'
+    assert response.closed
@@ -7,10 +7,18 @@ import datetime
 
 from schematics.exceptions import ValidationError
 
+from betfair import price
 from betfair import models
 from betfair import constants
 from betfair.utils import BetfairEncoder
+from betfair.utils import parse_json
 from betfair.utils import make_payload
+from betfair.utils import JSON_BACKENDS
+from betfair.utils import get_json_loads
+from betfair.utils import get_market_book_chunk_size
+from betfair.utils import get_price_projection_weight
+
+from tests.utils import mock_response
 
 
 def test_encode_enum():
@@ -45,3 +53,95 @@ def test_make_payload():
         'params': {'someParam': 123},
         'id': 1,
     }
+
+
+def test_make_payload_request_id():
+    result = make_payload('Account', 'getAccountFunds', {}, request_id=3)
+    assert result['id'] == 3
+    assert result['method'] == 'AccountAPING/v1.0/getAccountFunds'
+
+
+def make_projection(price_data, depth=None):
+    overrides = models.ExBestOffersOverrides(best_prices_depth=depth) if depth else None
+    return models.PriceProjection(
+        price_data=[getattr(constants.PriceData, name) for name in price_data],
+        ex_best_offers_overrides=overrides,
+    )
+
+
+@pytest.mark.parametrize(('price_data', 'depth', 'expected'), [
+    ([], None, 2),
+    (['SP_AVAILABLE'], None, 3),
+    (['SP_TRADED'], None, 7),
+    (['EX_BEST_OFFERS'], None, 5),
+    (['EX_BEST_OFFERS'], 3, 5),
+    (['EX_BEST_OFFERS'], 6, 10),
+    (['EX_ALL_OFFERS'], None, 17),
+    (['EX_TRADED'], None, 17),
+    (['EX_BEST_OFFERS', 'EX_TRADED'], None, 20),
+    (['EX_ALL_OFFERS', 'EX_TRADED'], None, 32),
+    (['EX_ALL_OFFERS', 'EX_BEST_OFFERS'], None, 17),
+    (['SP_AVAILABLE', 'SP_TRADED', 'EX_BEST_OFFERS'], None, 15),
+])
+def test_get_price_projection_weight(price_data, depth, expected):
+    projection = make_projection(price_data, depth)
+    assert get_price_projection_weight(projection) == expected
+
+
+def test_get_price_projection_weight_none():
+    assert get_price_projection_weight(None) == 2
+
+
+@pytest.mark.parametrize(('price_data', 'depth', 'expected'), [
+    ([], None, 100),
+    (['EX_BEST_OFFERS'], None, 40),
+    (['EX_BEST_OFFERS'], 10, 12),
+    (['EX_ALL_OFFERS', 'EX_TRADED'], None, 6),
+])
+def test_get_market_book_chunk_size(price_data, depth, expected):
+    assert get_market_book_chunk_size(make_projection(price_data, depth)) == expected
+
+
+@pytest.mark.parametrize('backend', JSON_BACKENDS)
+def test_get_json_loads(backend):
+    try:
+        loads = get_json_loads(backend)
+    except ImportError:
+        pytest.skip('{0} is not installed'.format(backend))
+    assert loads(b'{"result": [1.5, "a"]}') == {'result': [1.5, 'a']}
+
+
+def test_get_json_loads_default():
+    assert get_json_loads() is not None
+
+
+def test_get_json_loads_missing():
+    with pytest.raises(ImportError):
+        get_json_loads('not_a_json_library')
+
+
+def test_parse_json():
+    response = mock_response()
+    response._content = b'{"result": 1}'
+    assert parse_json(response) == {'result': 1}
+
+
+def test_parse_json_invalid():
+    response = mock_response(503)
+    response._content = b'<html>Service Unavailable</html>'
+    assert parse_json(response) == {}
+
+
+def test_encode_ticks():
+    tick = price.Tick.from_price(2.5)
+    raw = {
+        'tick': tick,
+        'ticks': (tick, [tick]),
+        'model': models.LimitOrder(
+            size=2, price=tick, persistence_type=constants.PersistenceType.LAPSE,
+        ),
+    }
+    encoded = json.loads(json.dumps(raw, cls=BetfairEncoder))
+    assert encoded['tick'] == 2.5
+    assert encoded['ticks'] == [2.5, [2.5]]
+    assert encoded['model']['price'] == 2.5
@@ -1,14 +1,29 @@
 # -*- coding: utf-8 -*-
 
 import pytest
+import requests
 import responses
 
 import json
+import time
+import socket
+import threading
+
+from six.moves import socketserver
+from six.moves import BaseHTTPServer
+
+from betfair import models
 
 
 noop = lambda *args, **kwargs: None
 
 
+def mock_response(status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
 def response_fixture_factory(url, data=None, status=200):
     @pytest.yield_fixture
     def fixture():
@@ -24,3 +39,306 @@ def response_fixture_factory(url, data=None, status=200):
         responses.stop()
         responses.reset()
     return fixture
+
+
+class ConnectionCountingServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Local keep-alive HTTP server that records the address of each accepted
+    connection.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), EmptyJsonHandler)
+        self.connections = []
+
+    def get_request(self):
+        request, address = BaseHTTPServer.HTTPServer.get_request(self)
+        self.connections.append(address)
+        return request, address
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}/'.format(*self.server_address)
+
+
+class EmptyJsonHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def respond(self, body=b'{}'):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self.respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.wfile.write(self.respond())
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeStreamServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Local stand-in for the Exchange Stream API over plain TCP. Checks
+    credentials, acknowledges and records requests, and sends the messages
+    returned by `on_subscribe` after each subscription; tests push change
+    messages to connected clients with `send`.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, app_key='test', session_token='secret', on_subscribe=None):
+        socketserver.TCPServer.__init__(self, ('127.0.0.1', 0), StreamHandler)
+        self.app_key = app_key
+        self.session_token = session_token
+        self.on_subscribe = on_subscribe
+        self.requests = []
+        self.handlers = []
+        self.received = threading.Condition()
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, args=(0.05, ))
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disconnect()
+        self.shutdown()
+        self.server_close()
+
+    def record(self, request):
+        with self.received:
+            self.requests.append(request)
+            self.received.notify_all()
+
+    def wait_for(self, op, count=1, timeout=5):
+        """Wait until `count` requests with `op` have been received, and
+        return them.
+        """
+        deadline = time.time() + timeout
+        with self.received:
+            while True:
+                requests = [request for request in self.requests if request.get('op') == op]
+                if len(requests) >= count or time.time() > deadline:
+                    return requests
+                self.received.wait(0.05)
+
+    def send(self, message):
+        for handler in list(self.handlers):
+            handler.send(message)
+
+    def disconnect(self):
+        """Close all client connections."""
+        for handler in list(self.handlers):
+            handler.close()
+
+
+class StreamHandler(socketserver.StreamRequestHandler):
+
+    def setup(self):
+        socketserver.StreamRequestHandler.setup(self)
+        self.lock = threading.Lock()
+        self.authenticated = False
+
+    def handle(self):
+        self.server.handlers.append(self)
+        try:
+            self.send({'op': 'connection', 'connectionId': '002-000000000001'})
+            for line in iter(self.rfile.readline, b''):
+                request = json.loads(line.decode('utf-8'))
+                self.server.record(request)
+                self.respond(request)
+        except (socket.error, ValueError):
+            pass
+        finally:
+            self.server.handlers.remove(self)
+
+    def respond(self, request):
+        op = request.get('op')
+        if op == 'authentication':
+            credentials = (request.get('appKey'), request.get('session'))
+            if credentials != (self.server.app_key, self.server.session_token):
+                return self.fail(request, 'INVALID_SESSION_INFORMATION', closed=True)
+            self.authenticated = True
+        elif not self.authenticated:
+            return self.fail(request, 'NO_SESSION', closed=True)
+        elif op not in ('heartbeat', 'marketSubscription', 'orderSubscription'):
+            return self.fail(request, 'INVALID_INPUT')
+        self.send({'op': 'status', 'id': request['id'], 'statusCode': 'SUCCESS'})
+        if op.endswith('Subscription') and self.server.on_subscribe is not None:
+            for message in self.server.on_subscribe(request):
+                self.send(message)
+
+    def fail(self, request, error_code, closed=False):
+        self.send({
+            'op': 'status',
+            'id': request.get('id'),
+            'statusCode': 'FAILURE',
+            'errorCode': error_code,
+            'connectionClosed': closed,
+        })
+        if closed:
+            self.close()
+
+    def send(self, message):
+        with self.lock:
+            self.wfile.write(json.dumps(message).encode('utf-8') + b'\r\n')
+            self.wfile.flush()
+
+    def close(self):
+        try:
+            self.request.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+
+
+def make_levels(levels, size):
+    """Price ladder JSON from `(price, size)` pairs, or from prices with sizes
+    of `size`.
+    """
+    return [
+        {'price': level[0], 'size': level[1]} if isinstance(level, tuple)
+        else {'price': level, 'size': size}
+        for level in levels
+    ]
+
+
+def make_runner(selection_id, back=None, lay=None, traded=None, sp=None,
+                sizes=(10.0, 10.0, 5.0), **kwargs):
+    """Runner JSON of a `listMarketBook` result. Ladders that are `None` are
+    omitted; prices without sizes take the back, lay and traded sizes in
+    `sizes`.
+    """
+    runner = dict({'selectionId': selection_id, 'handicap': 0.0, 'status': 'ACTIVE'}, **kwargs)
+    ladders = zip(('availableToBack', 'availableToLay', 'tradedVolume'), (back, lay, traded), sizes)
+    ex = dict(
+        (key, make_levels(levels, size))
+        for key, levels, size in ladders
+        if levels is not None
+    )
+    if ex:
+        runner['ex'] = ex
+    if sp is not None:
+        runner['sp'] = sp
+    return runner
+
+
+def make_book(runners, market_id='1.1', version=1, **kwargs):
+    """Market book JSON of a `listMarketBook` result."""
+    return dict(
+        {
+            'marketId': market_id,
+            'isMarketDataDelayed': False,
+            'status': 'OPEN',
+            'version': version,
+            'runners': runners,
+        },
+        **kwargs
+    )
+
+
+def place_instruction(selection_id=1, side='BACK', price=2.0, size=10.0):
+    return models.PlaceInstruction(
+        order_type='LIMIT',
+        selection_id=selection_id,
+        side=side,
+        limit_order=models.LimitOrder(size=size, price=price, persistence_type='LAPSE'),
+    )
+
+
+# Execution report models and default instruction reports of order methods
+ORDER_REPORTS = {
+    'place_orders': (
+        models.PlaceExecutionReport,
+        lambda market_id, instruction: {
+            'instruction': instruction.serialize(),
+            'betId': '{0}-{1}'.format(market_id, instruction.selection_id),
+            'sizeMatched': 0.0,
+        },
+    ),
+    'cancel_orders': (
+        models.CancelExecutionReport,
+        lambda market_id, instruction: {
+            'instruction': instruction.serialize(),
+            'sizeCancelled': instruction.size_reduction or 2.0,
+        },
+    ),
+    'replace_orders': (models.ReplaceExecutionReport, lambda market_id, instruction: {}),
+    'update_orders': (
+        models.UpdateExecutionReport,
+        lambda market_id, instruction: {'instruction': instruction.serialize()},
+    ),
+}
+
+
+class FakeClient(object):
+    """Stand-in for the order methods of `Betfair`, recording calls.
+
+    Order methods return the next queued list of instruction reports in
+    `reports` if any; otherwise every instruction succeeds, or the request
+    fails without instruction reports if `status` is not "SUCCESS". Requests
+    raise `error`, or the exception in `errors` for their customer reference.
+
+    :param str status: Status of default execution reports
+    :param Exception error: Optional exception raised by every order request
+    """
+    def __init__(self, status='SUCCESS', error=None):
+        self.status = status
+        self.error = error
+        self.errors = {}
+        self.reports = []
+        self.current_orders = {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def execute(self, method, market_id, instructions, customer_ref):
+        with self.lock:
+            self.calls.append((method, market_id, instructions, customer_ref))
+            reports = self.reports.pop(0) if self.reports else None
+        error = self.errors.get(customer_ref, self.error)
+        if error is not None:
+            raise error
+        model, make_report = ORDER_REPORTS[method]
+        if reports is None and self.status == 'SUCCESS':
+            reports = [
+                dict(make_report(market_id, instruction), status='SUCCESS')
+                for instruction in instructions
+            ]
+        return model.unserialize({
+            'status': self.status,
+            'errorCode': None if self.status == 'SUCCESS' else 'MARKET_SUSPENDED',
+            'marketId': market_id,
+            'customerRef': customer_ref,
+            'instructionReports': reports,
+        })
+
+    def place_orders(self, market_id, instructions, customer_ref=None):
+        return self.execute('place_orders', market_id, instructions, customer_ref)
+
+    def cancel_orders(self, market_id, instructions, customer_ref=None):
+        return self.execute('cancel_orders', market_id, instructions, customer_ref)
+
+    def replace_orders(self, market_id, instructions, customer_ref=None):
+        return self.execute('replace_orders', market_id, instructions, customer_ref)
+
+    def update_orders(self, market_id, instructions, customer_ref=None):
+        return self.execute('update_orders', market_id, instructions, customer_ref)
+
+    def list_current_orders(self, bet_ids=None):
+        self.calls.append(('list_current_orders', bet_ids))
+        return models.CurrentOrderSummaryReport.unserialize({
+            'currentOrders': [
+                self.current_orders[bet_id] for bet_id in bet_ids if bet_id in self.current_orders
+            ],
+            'moreAvailable': False,
+        })